@@ -0,0 +1,76 @@
+import os
+import sys
+import time
+import random
+import tempfile
+from datetime import datetime, timedelta
+
+import xlsxwriter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from subuhjayafarm_core import IMPORT_COLUMNS, FarmRepository, PostingEngine, close_all_db_connections, read_import_file
+
+ROW_COUNTS = [1_000, 10_000]
+START_DATE = datetime(2025, 1, 1)
+OPENING_STOCK = 10_000
+
+def build_import_workbook(path, n_rows):
+    rng = random.Random(42)
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+    worksheet = workbook.add_worksheet("Transaksi")
+    date_format = workbook.add_format({"num_format": "yyyy-mm-dd"})
+    worksheet.write_row(0, 0, IMPORT_COLUMNS)
+    for row in range(1, n_rows + 1):
+        waktu = START_DATE + timedelta(days=rng.randrange(365))
+        jenis = rng.choices(["Penjualan", "Pembelian", "Lain-lain"], weights=[0.35, 0.25, 0.40])[0]
+        if jenis == "Lain-lain":
+            values = [jenis, f"Pakan {row}", None, None, None, "Beban pakan ternak", "Kas", rng.randint(1, 40) * 25_000, 1]
+        else:
+            values = [
+                jenis, f"{jenis} {row}", rng.choice(["Tunai", "Kredit"]), f"Mitra {rng.randrange(200)}",
+                rng.choice(["Jantan", "Betina"]), None, None, rng.randint(15, 40) * 100_000, rng.randint(1, 5)
+            ]
+        worksheet.write_datetime(row, 0, waktu, date_format)
+        for col, value in enumerate(values, start=1):
+            if value is not None:
+                worksheet.write(row, col, value)
+    workbook.close()
+
+def build_database(db_path):
+    repository = FarmRepository(db_path)
+    repository.setup()
+    posting = PostingEngine(repository)
+    posting.append_rows([
+        ("Inventory_Data", [START_DATE - timedelta(days=1), "SALDO AWAL", kategori, 2_000_000, OPENING_STOCK, 2_000_000 * OPENING_STOCK])
+        for kategori in ["Jantan", "Betina"]
+    ])
+    return posting
+
+def main():
+    row_counts = [int(n) for n in sys.argv[1:]] or ROW_COUNTS
+    print(f"{'rows':>10} {'baca s':>10} {'impor s':>10} {'baris/s':>12}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_rows in row_counts:
+            input_path = os.path.join(tmp_dir, f"impor_{n_rows}.xlsx")
+            db_path = os.path.join(tmp_dir, f"impor_{n_rows}_transaksi.db")
+            build_import_workbook(input_path, n_rows)
+            posting = build_database(db_path)
+
+            start = time.perf_counter()
+            frame = read_import_file(input_path, input_path)
+            read_s = time.perf_counter() - start
+            start = time.perf_counter()
+            report = posting.import_transactions(frame)
+            import_s = time.perf_counter() - start
+            close_all_db_connections(db_path=db_path)
+
+            failed = (report["Status"] == "Gagal").sum()
+            if failed:
+                print(f"{n_rows:>10,} {failed:,} baris gagal: {report.loc[report['Status'] == 'Gagal', 'Keterangan'].iloc[0]}")
+                continue
+            print(f"{n_rows:>10,} {read_s:>10.2f} {import_s:>10.2f} {n_rows / (read_s + import_s):>12,.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import os
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from subuhjayafarm_core import (
+    TABLE_NAME, MAIN_SHEETS, setup_user_database, safe_float_conversion, fetch_transactions_frame,
+    transactions_frame_to_records
+)
+
+ROW_COUNTS = [1_000, 10_000, 50_000]
+
+def build_database(db_path, n_rows):
+    setup_user_database(db_path)
+    rng = random.Random(42)
+    rows = []
+    for i in range(n_rows):
+        nominal = float(rng.randint(1, 500) * 10_000)
+        hpp = float(rng.randint(1, 400) * 10_000)
+        sheet = rng.choice(["Penjualan", "Pembelian", "Lain-lain", "Saldo_Awal"])
+        rows.append((
+            f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}", f"Transaksi {i}", "Tunai", sheet,
+            "Kas", nominal, "HPP" if sheet == "Penjualan" else None, hpp if sheet == "Penjualan" else None,
+            "Penjualan", nominal, "Persediaan kambing jantan" if sheet == "Penjualan" else None, hpp if sheet == "Penjualan" else None,
+            f"Customer {rng.randint(1, 200)}", "Jantan", nominal, 1.0, nominal
+        ))
+    conn = sqlite3.connect(db_path)
+    conn.executemany(f"""
+        INSERT INTO {TABLE_NAME} (
+            Waktu, Deskripsi, Metode, Source_Sheet,
+            D1_Akun, D1_Nominal, D2_Akun, D2_Nominal,
+            K1_Akun, K1_Nominal, K2_Akun, K2_Nominal,
+            Customer_Supplier, Kategori_Ternak, Harga_Satuan, Jumlah_Unit, Total_Nilai
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+    conn.commit()
+    conn.close()
+
+def load_transactions_iterrows(db_path, sheet_names):
+    conn = sqlite3.connect(db_path)
+    placeholders = ', '.join(['?' for _ in sheet_names])
+    df = pd.read_sql_query(f"SELECT * FROM {TABLE_NAME} WHERE Source_Sheet IN ({placeholders}) ORDER BY Waktu", conn, params=sheet_names)
+    conn.close()
+
+    all_transactions = []
+    for index, row in df.iterrows():
+        all_transactions.append({
+            "id": row['id'],
+            "Waktu": str(row['Waktu']).split(' ')[0],
+            "Deskripsi": row['Deskripsi'],
+            "Metode": row['Metode'] if row['Source_Sheet'] != "Saldo_Awal" else "SALDO AWAL",
+            "D1_Akun": row['D1_Akun'], "D1_Nominal": safe_float_conversion(row['D1_Nominal']),
+            "D2_Akun": row['D2_Akun'], "D2_Nominal": safe_float_conversion(row['D2_Nominal']),
+            "K1_Akun": row['K1_Akun'], "K1_Nominal": safe_float_conversion(row['K1_Nominal']),
+            "K2_Akun": row['K2_Akun'], "K2_Nominal": safe_float_conversion(row['K2_Nominal']),
+            "Customer": row['Customer_Supplier'],
+            "Source_Sheet": row['Source_Sheet'],
+            "Total_Nilai": safe_float_conversion(row['Total_Nilai']),
+            "Row_Index": row['id']
+        })
+    return all_transactions
+
+def time_call(func, *args, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    row_counts = [int(n) for n in sys.argv[1:]] or ROW_COUNTS
+    print(f"{'rows':>10} {'iterrows rows/s':>18} {'frame rows/s':>15} {'frame+records rows/s':>22}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_rows in row_counts:
+            db_path = os.path.join(tmp_dir, f"bench_{n_rows}_transaksi.db")
+            build_database(db_path, n_rows)
+
+            t_before = time_call(load_transactions_iterrows, db_path, MAIN_SHEETS)
+            t_frame = time_call(fetch_transactions_frame, db_path, MAIN_SHEETS)
+            t_records = time_call(lambda: transactions_frame_to_records(fetch_transactions_frame(db_path, MAIN_SHEETS)))
+
+            print(f"{n_rows:>10,} {n_rows / t_before:>18,.0f} {n_rows / t_frame:>15,.0f} {n_rows / t_records:>22,.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import os
+import sys
+import gc
+import time
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from subuhjayafarm_core import (
+    MAIN_SHEETS, fetch_transactions_frame, transactions_frame_to_records, build_transaction_store,
+    store_account_totals, store_ledger_lines
+)
+from bench_load_transactions import build_database
+
+ROW_COUNTS = [100_000]
+
+def measure_retained(build):
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak
+
+def time_call(func, *args, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    row_counts = [int(n) for n in sys.argv[1:]] or ROW_COUNTS
+    print(f"{'rows':>10} {'records MB':>12} {'store MB':>10} {'records B/row':>15} {'store B/row':>13} {'totals ms':>10} {'ledger ms':>10}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_rows in row_counts:
+            db_path = os.path.join(tmp_dir, f"bench_{n_rows}_transaksi.db")
+            build_database(db_path, n_rows)
+            frame = fetch_transactions_frame(db_path, MAIN_SHEETS)
+
+            records, records_bytes, _ = measure_retained(lambda: transactions_frame_to_records(frame))
+            del records
+            store, store_bytes, _ = measure_retained(lambda: build_transaction_store(frame))
+
+            t_totals = time_call(store_account_totals, store)
+            t_ledger = time_call(store_ledger_lines, store, "Kas")
+
+            print(
+                f"{n_rows:>10,} {records_bytes / 1e6:>12.1f} {store_bytes / 1e6:>10.1f} "
+                f"{records_bytes / n_rows:>15,.0f} {store_bytes / n_rows:>13,.0f} {t_totals * 1000:>10.1f} {t_ledger * 1000:>10.1f}"
+            )
+
+if __name__ == "__main__":
+    main()
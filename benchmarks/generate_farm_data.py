@@ -0,0 +1,144 @@
+import os
+import sys
+import random
+import argparse
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from subuhjayafarm_core import (
+    AKUN_BEBAN, INVENTORY_ACCOUNT_CHOICES, FarmRepository, PostingEngine, build_purchase_rows, build_sale_rows,
+    close_all_db_connections, get_inventory_kategori
+)
+
+ROW_COUNTS = [1_000, 10_000, 100_000, 1_000_000]
+START_DATE = date(2024, 1, 1)
+SPAN_DAYS = 730
+INSERT_BATCH_SIZE = 20_000
+SHEET_WEIGHTS = {"Penjualan": 0.35, "Pembelian": 0.25, "Lain-lain": 0.40}
+LAIN_LAIN_WEIGHTS = {"beban": 0.45, "pelunasan_piutang": 0.25, "pembayaran_utang": 0.20, "pendapatan_lain": 0.10}
+BEBAN_KAS = [akun for akun in AKUN_BEBAN if akun not in ("HPP", "Beban penyusutan")]
+
+def get_database_path(data_dir, n_rows, seed=42):
+    return os.path.join(data_dir, f"farm_{n_rows}_s{seed}_transaksi.db")
+
+def jurnal_row(waktu, deskripsi, metode, d1_akun, k1_akun, nominal, customer=None):
+    return [
+        waktu, deskripsi, metode,
+        d1_akun, nominal, None, None,
+        k1_akun, nominal, None, None,
+        customer, None,
+        nominal, 1, nominal
+    ]
+
+def generate_saldo_awal_rows(rng, waktu, customers, suppliers):
+    rows = [
+        ("Saldo_Awal", [waktu, "Saldo Awal Kas", "SALDO AWAL", "Kas", 2_000_000_000, None, None, None, None, None, None, None, None, None, None, 2_000_000_000]),
+        ("Saldo_Awal", [waktu, "Saldo Awal Modal", "SALDO AWAL", None, None, None, None, "Modal", 2_000_000_000, None, None, None, None, None, None, 2_000_000_000]),
+    ]
+    for customer in rng.sample(customers, min(len(customers), 20)):
+        nominal = rng.randint(1, 50) * 100_000
+        rows.append(("Saldo_Awal", [waktu, f"Saldo Awal Piutang dari {customer}", "SALDO AWAL PIUTANG", "Piutang usaha", nominal, None, None, None, None, None, None, customer, None, None, None, nominal]))
+    for supplier in rng.sample(suppliers, min(len(suppliers), 5)):
+        nominal = rng.randint(1, 50) * 100_000
+        rows.append(("Saldo_Awal", [waktu, f"Saldo Awal Utang dari {supplier}", "SALDO AWAL UTANG", None, None, None, None, "Utang usaha", nominal, None, None, supplier, None, None, None, nominal]))
+    return rows
+
+def generate_farm_rows(n_rows, seed=42):
+    rng = random.Random(seed)
+    customers = [f"Customer {i:05d}" for i in range(max(20, n_rows // 100))]
+    suppliers = [f"Supplier {i:04d}" for i in range(max(5, n_rows // 1000))]
+    stock = {akun: [0, 0] for akun in INVENTORY_ACCOUNT_CHOICES}
+    piutang = {}
+    utang = {}
+
+    first_day = START_DATE.isoformat()
+    rows = generate_saldo_awal_rows(rng, first_day, customers, suppliers)
+    n_jurnal = len(rows)
+    for akun in INVENTORY_ACCOUNT_CHOICES:
+        ekor, harga = rng.randint(20, 40), rng.randint(15, 30) * 100_000
+        stock[akun] = [ekor, ekor * harga]
+        rows.append(("Inventory_Data", [first_day, "SALDO AWAL", get_inventory_kategori(akun), harga, ekor, ekor * harga]))
+        rows.append(("Saldo_Awal", [first_day, f"Saldo Awal {akun}", "SALDO AWAL INVENTORY", akun, ekor * harga, None, None, None, None, None, None, None, get_inventory_kategori(akun), harga, ekor, ekor * harga]))
+        n_jurnal += 1
+
+    day_offsets = sorted(rng.randrange(1, SPAN_DAYS) for _ in range(max(0, n_rows - n_jurnal)))
+    sheets = rng.choices(list(SHEET_WEIGHTS), weights=list(SHEET_WEIGHTS.values()), k=len(day_offsets))
+    for i, (offset, sheet) in enumerate(zip(day_offsets, sheets)):
+        waktu = (START_DATE + timedelta(days=offset)).isoformat()
+        akun = rng.choice(INVENTORY_ACCOUNT_CHOICES)
+        metode = "Kredit" if rng.random() < 0.3 else "Tunai"
+        jumlah = rng.randint(1, 5)
+
+        if sheet == "Penjualan" and stock[akun][0] < jumlah:
+            sheet = "Pembelian"
+
+        if sheet == "Pembelian":
+            supplier = rng.choice(suppliers)
+            harga = rng.randint(15, 30) * 100_000
+            rows.extend(build_purchase_rows(waktu, f"Beli {i}", metode, supplier, akun, harga, jumlah))
+            stock[akun][0] += jumlah
+            stock[akun][1] += harga * jumlah
+            if metode == "Kredit":
+                utang[supplier] = utang.get(supplier, 0) + harga * jumlah
+        elif sheet == "Penjualan":
+            customer = rng.choice(customers)
+            harga = rng.randint(20, 40) * 100_000
+            sale_rows = build_sale_rows(waktu, f"Jual {i}", metode, customer, akun, harga, jumlah, *stock[akun])
+            rows.extend(sale_rows)
+            stock[akun][0] -= jumlah
+            stock[akun][1] -= sale_rows[1][1][5]
+            if metode == "Kredit":
+                piutang[customer] = piutang.get(customer, 0) + harga * jumlah
+        else:
+            jenis = rng.choices(list(LAIN_LAIN_WEIGHTS), weights=list(LAIN_LAIN_WEIGHTS.values()))[0]
+            if jenis == "pelunasan_piutang" and piutang:
+                customer = rng.choice(list(piutang))
+                nominal = piutang.pop(customer)
+                rows.append(("Lain-lain", jurnal_row(waktu, f"Pelunasan piutang {customer}", "Jurnal Umum", "Kas", "Piutang usaha", nominal, customer)))
+            elif jenis == "pembayaran_utang" and utang:
+                supplier = rng.choice(list(utang))
+                nominal = utang.pop(supplier)
+                rows.append(("Lain-lain", jurnal_row(waktu, f"Pembayaran utang {supplier}", "Jurnal Umum", "Utang usaha", "Kas", nominal, supplier)))
+            elif jenis == "pendapatan_lain":
+                rows.append(("Lain-lain", jurnal_row(waktu, f"Pendapatan lain {i}", "Jurnal Umum", "Kas", "Pendapatan lain-lain", rng.randint(1, 20) * 50_000)))
+            else:
+                beban = rng.choice(BEBAN_KAS)
+                rows.append(("Lain-lain", jurnal_row(waktu, f"{beban} {i}", "Jurnal Umum", beban, "Kas", rng.randint(1, 40) * 25_000)))
+
+    return rows
+
+def build_farm_database(db_path, n_rows, seed=42):
+    repository = FarmRepository(db_path)
+    repository.setup()
+    posting = PostingEngine(repository)
+    rows = generate_farm_rows(n_rows, seed)
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        posting.append_rows(rows[start:start + INSERT_BATCH_SIZE])
+    return db_path
+
+def ensure_farm_database(data_dir, n_rows, seed=42):
+    db_path = get_database_path(data_dir, n_rows, seed)
+    if not os.path.exists(db_path):
+        os.makedirs(data_dir, exist_ok=True)
+        tmp_path = db_path + ".tmp"
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(tmp_path + suffix):
+                os.remove(tmp_path + suffix)
+        build_farm_database(tmp_path, n_rows, seed)
+        close_all_db_connections(db_path=tmp_path)
+        os.replace(tmp_path, db_path)
+    return db_path
+
+def main():
+    parser = argparse.ArgumentParser(description="Buat database *_transaksi.db sintetis untuk benchmark.")
+    parser.add_argument("row_counts", nargs="*", type=int, default=ROW_COUNTS, help="Jumlah baris jurnal per database.")
+    parser.add_argument("--data-dir", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+    parser.add_argument("--seed", type=int, default=42)
+    options = parser.parse_args()
+
+    for n_rows in options.row_counts:
+        print(ensure_farm_database(options.data_dir, n_rows, options.seed))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import os
+import sys
+import gc
+import json
+import time
+import platform
+import argparse
+import sqlite3
+import subprocess
+import tempfile
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from subuhjayafarm_core import (
+    GENERAL_LEDGER_ACCOUNTS, MAIN_SHEETS, FarmRepository, ReportEngine, close_all_db_connections, get_period_before,
+    make_period, write_full_books_workbook
+)
+from generate_farm_data import ROW_COUNTS, START_DATE, SPAN_DAYS, ensure_farm_database
+
+def trial_balance(reports):
+    balances = reports.account_balances(MAIN_SHEETS)
+    return [reports.account_balance(akun, balances) for akun in GENERAL_LEDGER_ACCOUNTS]
+
+def laba_rugi(reports, period):
+    return reports.laba_rugi(reports.account_balances(MAIN_SHEETS, period=period))
+
+def posisi_keuangan(reports, period):
+    balances = reports.account_balances(MAIN_SHEETS, period=make_period(None, period[1]))
+    laba_ditahan = reports.laba_rugi(reports.account_balances(MAIN_SHEETS, period=get_period_before(period)))[2]
+    return [reports.account_balance(akun, balances) for akun in GENERAL_LEDGER_ACCOUNTS], laba_ditahan
+
+def full_books(reports):
+    with tempfile.TemporaryFile() as output:
+        return write_full_books_workbook(reports, output)
+
+def get_hot_paths(reports):
+    last_year = make_period(START_DATE + pd.Timedelta(days=SPAN_DAYS - 365), START_DATE + pd.Timedelta(days=SPAN_DAYS))
+    return {
+        "load_transactions_data": lambda: reports.repository.transactions_records(MAIN_SHEETS),
+        "neraca_saldo": lambda: trial_balance(reports),
+        "laba_rugi": lambda: laba_rugi(reports, last_year),
+        "posisi_keuangan": lambda: posisi_keuangan(reports, last_year),
+        "buku_besar_kas": lambda: reports.account_ledger("Kas"),
+        "buku_besar_umum": lambda: reports.general_ledger(),
+        "kartu_stok": lambda: reports.stock_cards(),
+        "kartu_piutang": lambda: reports.partner_subledgers("BB_PIUTANG"),
+        "kartu_utang": lambda: reports.partner_subledgers("BB_UTANG"),
+        "tren_harian_365": lambda: reports.daily_trends(last_year),
+        "halaman_jurnal_pertama": lambda: reports.journal_page(["Penjualan"]),
+        "halaman_buku_besar_kas": lambda: reports.ledger_page("Kas", balance=reports.ledger_header("Kas")[1]),
+        "buku_lengkap_xlsx": lambda: full_books(reports),
+    }
+
+def run_cold(reports, func):
+    reports.repository.invalidate()
+    gc.collect()
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+def measure_peak(reports, func):
+    reports.repository.invalidate()
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+def benchmark_database(db_path, n_rows, repeat, path_names=None):
+    repository = FarmRepository(db_path)
+    repository.setup()
+    reports = ReportEngine(repository)
+    results = []
+    for name, func in get_hot_paths(reports).items():
+        if path_names and name not in path_names:
+            continue
+        timings = [run_cold(reports, func) for _ in range(repeat)]
+        peak = measure_peak(reports, func)
+        results.append({
+            "rows": n_rows, "path": name,
+            "best_s": min(timings), "median_s": float(np.median(timings)), "timings_s": timings,
+            "peak_mb": peak / 1e6,
+        })
+        print(f"{n_rows:>10,} {name:<24} {min(timings) * 1000:>10.1f} ms {float(np.median(timings)) * 1000:>10.1f} ms {peak / 1e6:>9.1f} MB")
+    return results
+
+def get_git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)), stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare_results(baseline_path, results):
+    with open(baseline_path) as f:
+        baseline = {(r["rows"], r["path"]): r for r in json.load(f)["results"]}
+
+    print(f"\nDibandingkan dengan {baseline_path}")
+    print(f"{'rows':>10} {'path':<24} {'waktu':>10} {'memori':>10}")
+    for result in results:
+        base = baseline.get((result["rows"], result["path"]))
+        if base is None:
+            continue
+        time_ratio = result["best_s"] / base["best_s"] if base["best_s"] else float("nan")
+        memory_ratio = result["peak_mb"] / base["peak_mb"] if base["peak_mb"] else float("nan")
+        print(f"{result['rows']:>10,} {result['path']:<24} {time_ratio:>9.2f}x {memory_ratio:>9.2f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark jalur laporan utama pada database sintetis.")
+    parser.add_argument("row_counts", nargs="*", type=int, default=ROW_COUNTS, help="Jumlah baris jurnal per database.")
+    parser.add_argument("--data-dir", default=None, help="Folder database sintetis (dipakai ulang antar commit). Default: folder sementara.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--paths", nargs="*", default=None, help="Hanya jalankan jalur tertentu.")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", default=None, help="File JSON hasil sebelumnya untuk dibandingkan.")
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = options.data_dir or tmp_dir
+        print(f"{'rows':>10} {'path':<24} {'best':>13} {'median':>13} {'peak':>12}")
+        results = []
+        for n_rows in options.row_counts:
+            db_path = ensure_farm_database(data_dir, n_rows)
+            results.extend(benchmark_database(db_path, n_rows, options.repeat, options.paths))
+            close_all_db_connections(db_path=db_path)
+
+    report = {
+        "meta": {
+            "commit": get_git_commit(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "repeat": options.repeat,
+        },
+        "results": results,
+    }
+    with open(options.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nHasil disimpan ke {options.output}")
+
+    if options.compare:
+        compare_results(options.compare, results)
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,26 @@
 import os
+import sys
 import sqlite3
+import tempfile
 from datetime import datetime
 import streamlit as st
 from PIL import Image
 import base64
 import pandas as pd
-import hashlib 
+import altair as alt
 from io import BytesIO 
 
-MASTER_DB = "accounts.db"
-TABLE_NAME = "jurnal"
-INVENTORY_TABLE_NAME = "inventory"
+from subuhjayafarm_core import (
+    AGING_BUCKETS, CLI_COMMANDS, DEBIT_CHOICES, FarmRepository, GENERAL_LEDGER_ACCOUNTS, IMPORT_COLUMNS,
+    INVENTORY_ACCOUNT_CHOICES, MAIN_SHEETS, PAGE_SIZE_CHOICES, PROFILING_LOG_ENV_VAR, PostingEngine, RAW_EXPORT_FORMATS, RAW_EXPORT_TABLES,
+    ReportEngine, SUBLEDGER_SPECS, build_general_journal_rows, build_inventory_stock_cards, build_inventory_store,
+    close_period, export_raw_table, fetch_inventory_frame, fetch_inventory_state_as_of, fetch_keyset_page, finish_profile,
+    format_period_date, get_balance_sheet_export_frame, get_master_db_connection,
+    get_moving_average_hpp, get_period_before, get_period_end_date, get_profiling_admins, hash_password,
+    is_profiling_enabled_by_env, load_period_closings, make_period, profile_section, profiled, read_import_file, register_user,
+    reopen_period, restore_raw_tables, setup_master_database, setup_user_database, slice_frame_page, start_profile,
+    to_rupiah, write_full_books_workbook
+)
 
 BG_PAGE = "#FDF6E3"
 DARK_HEADER = "#3A4F35"
@@ -18,26 +28,9 @@ NAV_COLOR = "#4F7942"
 ACCENT_GOLD = "#6B8E23"
 TEXT_COLOR = "#3E2F24"
 BUTTON_COLOR = "#4F7942"
+PROFILING_HISTORY_LENGTH = 10
 
-AKUN_ASET = [
-    "Kas", "Piutang usaha", "Persediaan kambing jantan", "Persediaan kambing betina",
-    "Aset biologis - kambing kecil", "Persediaan pakan", "Persediaan obat & vitamin",
-    "Bangunan kandang", "Kendaraan"
-]
-AKUN_KEWAJIBAN = [ "Utang usaha", "Utang lain-lain" ]
-AKUN_EKUITAS = [ "Modal", "Prive" ]
-AKUN_PENDAPATAN = [ "Penjualan", "Pendapatan lain-lain" ]
-AKUN_BEBAN = [
-    "HPP", "Beban gaji", "Beban reparasi kandang", "Beban listrik & air",
-    "Beban pakan ternak", "Beban obat & vitamin", "Beban penyusutan"
-]
-AKUN_KONTRA = [ "Akumulasi penyusutan" ]
-
-DEBIT_CHOICES = AKUN_ASET + AKUN_KEWAJIBAN + AKUN_EKUITAS + AKUN_PENDAPATAN + AKUN_BEBAN + AKUN_KONTRA
-GENERAL_LEDGER_ACCOUNTS = DEBIT_CHOICES
-INVENTORY_ACCOUNT_CHOICES = ["Persediaan kambing jantan", "Persediaan kambing betina"]
-MAIN_SHEETS = ["Penjualan", "Pembelian", "Lain-lain", "Inventory_Data", "Saldo_Awal"]
-
+@profiled
 def to_excel(df, sheet_name="Sheet1"):
     output = BytesIO()
     with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
@@ -45,552 +38,238 @@ def to_excel(df, sheet_name="Sheet1"):
     processed_data = output.getvalue()
     return processed_data
 
-def add_download_button(df, filename, label="⬇️ Unduh Data (.xlsx)", key_suffix=""):
-    if df.empty:
-        st.warning("Data kosong, tidak bisa diunduh.")
-        return
-
+def prepare_excel_frame(df):
     df_clean = df.copy()
 
-    for col in df_clean.columns:
-        if df_clean[col].dtype == 'object':
-            if 'Rp.' in str(df_clean[col].iloc[0] if not df_clean.empty else ''):
-                try:
-                    df_clean[col] = df_clean[col].astype(str).str.replace('Rp. ', '', regex=False).str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
-                    df_clean[col] = df_clean[col].str.replace('(', '-', regex=False).str.replace(')', '', regex=False)
-                    df_clean[col] = pd.to_numeric(df_clean[col], errors='coerce').fillna(0.0).round(2)
-                except Exception:
-                    pass
-            
-            if col in ['Keterangan', 'Deskripsi']:
-                 df_clean[col] = df_clean[col].astype(str).str.replace('**', '', regex=False).str.replace('    ', '', regex=False).str.strip()
+    for col in ['Keterangan', 'Deskripsi']:
+        if col in df_clean.columns:
+            df_clean[col] = df_clean[col].astype(str).str.replace('**', '', regex=False).str.replace('    ', '', regex=False).str.strip()
 
     if 'Waktu' in df_clean.columns:
-        try:
-             df_clean['Waktu'] = pd.to_datetime(df_clean['Waktu'], errors='coerce').dt.date.astype(str)
-        except:
-             pass
+        tanggal = pd.to_datetime(df_clean['Waktu'].astype(str).str.slice(0, 10), format="%Y-%m-%d", errors='coerce')
+        df_clean['Waktu'] = df_clean['Waktu'].where(tanggal.isna(), tanggal.dt.strftime("%Y-%m-%d"))
+
+    return df_clean
+
+def get_cached_excel(repository, cache_key, data):
+    build = lambda: to_excel(prepare_excel_frame(data() if callable(data) else data))
+    return repository.cached_excel(cache_key, build)
+
+def add_download_button(data, filename, label="⬇️ Unduh Data (.xlsx)", key_suffix="", report_params=()):
+    if isinstance(data, pd.DataFrame) and data.empty:
+        st.warning("Data kosong, tidak bisa diunduh.")
+        return
 
-    excel_data = to_excel(df_clean)
+    repository = get_repository()
+    cache_key = (filename, key_suffix) + tuple(report_params)
     st.download_button(
         label=label,
-        data=excel_data,
+        data=lambda: get_cached_excel(repository, cache_key, data),
         file_name=filename,
         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        key=f"download_{key_suffix}"
+        key=f"download_{key_suffix}",
+        on_click="ignore"
     )
 
-def hash_password(password):
-    return hashlib.sha224(password.encode()).hexdigest()
-
-def get_master_db_connection():
-    conn = sqlite3.connect(MASTER_DB)
-    conn.row_factory = sqlite3.Row 
-    return conn
-
-def setup_master_database():
-    conn = get_master_db_connection()
-    c = conn.cursor()
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            username TEXT PRIMARY KEY,
-            password_hash TEXT NOT NULL,
-            db_path TEXT NOT NULL
-        )
-    """)
-    conn.commit()
-    conn.close()
-
-def get_db_connection(db_path):
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row 
-    return conn
-
-def setup_user_database(db_path):
-    conn = get_db_connection(db_path)
-    c = conn.cursor()
-
-    c.execute(f"""
-        CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            Waktu TEXT,
-            Deskripsi TEXT,
-            Metode TEXT,
-            Source_Sheet TEXT, 
-            D1_Akun TEXT,
-            D1_Nominal REAL DEFAULT 0.0, 
-            D2_Akun TEXT DEFAULT NULL,
-            D2_Nominal REAL DEFAULT 0.0, 
-            K1_Akun TEXT,
-            K1_Nominal REAL DEFAULT 0.0, 
-            K2_Akun TEXT DEFAULT NULL,
-            K2_Nominal REAL DEFAULT 0.0, 
-            Customer_Supplier TEXT,
-            Kategori_Ternak TEXT,
-            Harga_Satuan REAL DEFAULT 0.0,
-            Jumlah_Unit REAL DEFAULT 0.0,
-            Total_Nilai REAL DEFAULT 0.0
-        )
-    """)
-
-    c.execute(f"""
-        CREATE TABLE IF NOT EXISTS {INVENTORY_TABLE_NAME} (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            Waktu TEXT,
-            Tipe TEXT,
-            Kategori TEXT,
-            Harga REAL DEFAULT 0.0,
-            Jumlah INTEGER DEFAULT 0,
-            Total REAL DEFAULT 0.0
-        )
-    """)
-    conn.commit()
-    conn.close()
+def add_full_books_download_button(period):
+    reports = get_report_engine()
 
-def register_user(username, password):
-    if not username or not password:
-        return False, "Username dan password tidak boleh kosong."
+    def build():
+        with tempfile.TemporaryFile() as output:
+            write_full_books_workbook(reports, output, period)
+            output.seek(0)
+            return output.read()
 
-    conn_master = get_master_db_connection()
-    c_master = conn_master.cursor()
-    
-    c_master.execute("SELECT username FROM users WHERE username = ?", (username,))
-    if c_master.fetchone():
-        conn_master.close()
-        return False, "Username sudah terdaftar. Silakan pilih yang lain."
-
-    db_path = f"{username}_transaksi.db"
-    hashed_pass = hash_password(password)
-
-    try:
-        c_master.execute("INSERT INTO users (username, password_hash, db_path) VALUES (?, ?, ?)", 
-                             (username, hashed_pass, db_path))
-        conn_master.commit()
-        conn_master.close()
-
-        setup_user_database(db_path)
+    st.download_button(
+        label="📚 Unduh Buku Lengkap (.xlsx)",
+        data=build,
+        file_name="Buku_Lengkap.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        key="download_buku_lengkap",
+        on_click="ignore"
+    )
 
-        return True, "Registrasi berhasil! Silakan login."
-    except Exception as e:
-        return False, f"Gagal menyimpan data: {e}"
+RAW_EXPORT_MIME_TYPES = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
 
-def append_row_to_sheet(sheet_name, row_data):
+def add_raw_export_download_buttons(fmt):
     db_path = st.session_state.get('db_path')
-    if not db_path: raise ConnectionError("DB path tidak ditemukan.")
-    
-    conn = get_db_connection(db_path)
-    c = conn.cursor()
-    
-    if sheet_name == "Inventory_Data":
-        table_name = INVENTORY_TABLE_NAME
-        columns = ["Waktu", "Tipe", "Kategori", "Harga", "Jumlah", "Total"]
-        data = tuple(row_data)
+    cols = st.columns(len(RAW_EXPORT_TABLES))
+    for col, table_name in zip(cols, RAW_EXPORT_TABLES):
+        def build(table_name=table_name):
+            output = BytesIO()
+            export_raw_table(db_path, table_name, output, fmt)
+            return output.getvalue()
+
+        with col:
+            st.download_button(
+                label=f"🗄️ Unduh {table_name}.{fmt}",
+                data=build,
+                file_name=f"{table_name}.{fmt}",
+                mime=RAW_EXPORT_MIME_TYPES[fmt],
+                key=f"download_raw_{table_name}",
+                on_click="ignore"
+            )
 
-        if len(data) != len(columns):
-             conn.close()
-             raise ValueError("Jumlah kolom untuk Inventory_Data tidak sesuai.")
+def render_data_editor(data, **kwargs):
+    with profile_section("st.data_editor"):
+        return st.data_editor(data, **kwargs)
 
-        placeholders = ', '.join(['?' for _ in columns])
-        c.execute(f"INSERT INTO {table_name} ({','.join(columns)}) VALUES ({placeholders})", data)
-        
-    else:
-        table_name = TABLE_NAME
-        columns = [
-            "Waktu", "Deskripsi", "Metode", "Source_Sheet",
-            "D1_Akun", "D1_Nominal", "D2_Akun", "D2_Nominal",
-            "K1_Akun", "K1_Nominal", "K2_Akun", "K2_Nominal",
-            "Customer_Supplier", "Kategori_Ternak", "Harga_Satuan",
-            "Jumlah_Unit", "Total_Nilai"
-        ]
-        
-        data_to_insert = [
-             row_data[0], row_data[1], row_data[2], 
-             sheet_name,
-             row_data[3], row_data[4], row_data[5], row_data[6],
-             row_data[7], row_data[8], row_data[9], row_data[10],
-             row_data[11], row_data[12], row_data[13], row_data[14],
-             row_data[15]
-        ]
-        
-        if len(data_to_insert) != len(columns):
-            conn.close()
-            raise ValueError("Jumlah kolom untuk Jurnal/Transaksi tidak sesuai.")
+def get_repository():
+    return FarmRepository(st.session_state.get('db_path'), on_warning=st.warning)
+
+def get_posting_engine():
+    return PostingEngine(get_repository())
 
-        placeholders = ', '.join(['?' for _ in columns])
-        c.execute(f"INSERT INTO {table_name} ({','.join(columns)}) VALUES ({placeholders})", tuple(data_to_insert))
+def get_report_engine():
+    return ReportEngine(get_repository())
 
-    conn.commit()
-    conn.close()
-    return True
+def append_rows_to_sheet(rows):
+    return get_posting_engine().append_rows(rows)
 
 def delete_rows_from_sheet(sheet_name, ids_to_delete):
-    db_path = st.session_state.get('db_path')
-    if not db_path: return 0
-    
-    if not ids_to_delete: return 0
-    
-    ids_to_delete_int = [int(i) for i in ids_to_delete]
-    
-    conn = get_db_connection(db_path)
-    c = conn.cursor()
-    deleted_count = 0
-    
     try:
-        if sheet_name == "Inventory_Data":
-            table_name = INVENTORY_TABLE_NAME
-        else:
-            table_name = TABLE_NAME
-            
-        placeholders = ', '.join(['?' for _ in ids_to_delete_int])
-        c.execute(f"DELETE FROM {table_name} WHERE id IN ({placeholders})", ids_to_delete_int)
-        deleted_count = c.rowcount
-        
-        conn.commit()
-        
+        return get_posting_engine().delete_rows(sheet_name, ids_to_delete)
     except Exception as e:
-        st.error(f"Gagal menghapus data dari {table_name}: {e}")
-        deleted_count = 0
-    finally:
-        conn.close()
+        st.error(str(e))
+        return 0
+
+def period_selector(key_suffix, show_start=True):
+    if show_start:
+        col_start, col_end = st.columns(2)
+        with col_start:
+            start_date = st.date_input("Dari Tanggal", value=None, key=f"period_start_{key_suffix}", help="Kosongkan untuk mulai dari transaksi pertama.")
+    else:
+        col_end = st.container()
+        start_date = None
+    with col_end:
+        end_date = st.date_input("Sampai Tanggal", value=None, key=f"period_end_{key_suffix}", help="Kosongkan untuk sampai transaksi terakhir.")
+
+    if start_date and end_date and start_date > end_date:
+        st.warning("Tanggal awal melewati tanggal akhir, periode ditukar.")
+        start_date, end_date = end_date, start_date
+
+    return make_period(start_date, end_date)
+
+def get_pager_state(pager_key, period):
+    version = get_repository().data_version()
+    state = st.session_state.get(pager_key)
+    if state is None or state["period"] != period or state["version"] != version:
+        state = {"period": period, "version": version, "key": None, "direction": "next", "balance": None, "jump": None, "selected": set(), "bases": {}}
+        st.session_state[pager_key] = state
+    return state
+
+def render_pager_options(pager_key, period):
+    state = get_pager_state(pager_key, period)
+    col_jump, col_size = st.columns([3, 1])
+    with col_jump:
+        jump_date = st.date_input("Lompat ke Tanggal", value=None, key=f"{pager_key}_jump", help="Kosongkan untuk kembali ke halaman pertama.")
+    with col_size:
+        page_size = st.selectbox("Transaksi per Halaman", PAGE_SIZE_CHOICES, index=1, key=f"{pager_key}_size")
+
+    if jump_date != state["jump"]:
+        state.update(jump=jump_date, key=(jump_date.isoformat(), 0) if jump_date else None, direction="next", balance=None)
+    return state, page_size
+
+def render_pager_navigation(pager_key, page):
+    state = st.session_state[pager_key]
+    col_first, col_prev, col_info, col_next = st.columns([1, 1, 2, 1])
+    with col_first:
+        if st.button("⏮️ Awal", key=f"{pager_key}_first", disabled=not page["has_prev"], use_container_width=True):
+            state.update(key=None, direction="next", balance=None)
+            st.rerun()
+    with col_prev:
+        if st.button("◀️ Sebelumnya", key=f"{pager_key}_prev", disabled=not page["has_prev"], use_container_width=True):
+            state.update(key=page["first_key"], direction="prev", balance=page.get("opening"))
+            st.rerun()
+    with col_info:
+        if len(page["rows"]):
+            st.caption(f"Transaksi {format_period_date(page['first_key'][0])} s.d. {format_period_date(page['last_key'][0])}")
+        else:
+            st.caption("Tidak ada transaksi pada atau setelah tanggal tersebut.")
+    with col_next:
+        if st.button("Berikutnya ▶️", key=f"{pager_key}_next", disabled=not page["has_next"], use_container_width=True):
+            state.update(key=page["last_key"], direction="next", balance=page.get("closing"))
+            st.rerun()
 
-    return deleted_count
+def get_pager_editor_key(editor_key, state, page_size):
+    return f"{editor_key}_{state['key']}_{state['direction']}_{page_size}"
 
-def safe_float_conversion(value):
-    if value is None: return 0.0
-    try: 
-        if isinstance(value, str):
-            return float(value.replace('.', '').replace(',', '.').strip()) 
-        return float(value)
-    except (ValueError, TypeError): return 0.0
-
-def safe_int_conversion(value):
-    if value is None: return 0
-    try: 
-        if isinstance(value, str):
-            return int(float(value.replace('.', '').replace(',', '.').strip()))
-        return int(float(value))
-    except (ValueError, TypeError): return 0
-
-def load_transactions_data(sheet_names):
-    db_path = st.session_state.get('db_path')
-    if not db_path: return []
+def get_selection_base(state, editor_key):
+    return state["bases"].setdefault(editor_key, frozenset(state["selected"]))
 
-    all_transactions = []
-    
-    try:
-        conn = get_db_connection(db_path)
-    except Exception:
-        return []
-    
-    placeholders = ', '.join(['?' for _ in sheet_names])
-    query_base = f"""
-        SELECT * FROM {TABLE_NAME} 
-        WHERE Source_Sheet IN ({placeholders})
-        ORDER BY Waktu
-    """
-    
-    try:
-        df = pd.read_sql_query(query_base, conn, params=sheet_names)
-        
-        for index, row in df.iterrows():
-            
-            waktu_str = str(row['Waktu']).split(' ')[0] 
-            
-            transaction = {
-                "id": row['id'], 
-                "Waktu": waktu_str, 
-                "Deskripsi": row['Deskripsi'], 
-                "Metode": row['Metode'] if row['Source_Sheet'] != "Saldo_Awal" else "SALDO AWAL",
-                
-                "D1_Akun": row['D1_Akun'], 
-                "D1_Nominal": safe_float_conversion(row['D1_Nominal']),
-                "D2_Akun": row['D2_Akun'], 
-                "D2_Nominal": safe_float_conversion(row['D2_Nominal']),
-                "K1_Akun": row['K1_Akun'], 
-                "K1_Nominal": safe_float_conversion(row['K1_Nominal']),
-                "K2_Akun": row['K2_Akun'], 
-                "K2_Nominal": safe_float_conversion(row['K2_Nominal']),
-                
-                "Customer": row['Customer_Supplier'], 
-                "Source_Sheet": row['Source_Sheet'],
-                "Total_Nilai": safe_float_conversion(row['Total_Nilai']),
-                "Row_Index": row['id'] 
-            }
-            all_transactions.append(transaction)
-            
-    except Exception as e:
-        if "no such table" not in str(e):
-             st.warning(f"Gagal memuat data transaksi: {e}")
-    finally:
-        conn.close()
+def is_row_selected(items, base):
+    return bool(items) and all(item in base for item in items)
 
-    return all_transactions
+def get_selection_column(row_items, base, index):
+    return pd.Series([is_row_selected(items, base) for items in row_items], index=index, dtype=bool)
 
-def get_last_average_cost(kategori_name):
-    db_path = st.session_state.get('db_path')
-    if not db_path: return 0, 0.0
+def apply_grid_selection(state, row_items, base, was_checked, is_checked):
+    selected = state["selected"]
+    page_items = {item for items in row_items for item in items}
+    selected.difference_update(page_items)
+    selected.update(page_items & base)
+    for items, before, after in zip(row_items, was_checked, is_checked):
+        if bool(before) != bool(after):
+            if after:
+                selected.update(items)
+            else:
+                selected.difference_update(items)
 
-    saldo_ekor = 0
-    saldo_total = 0.0
-    
-    conn = get_db_connection(db_path)
-    try:
-        query = f"""
-            SELECT Tipe, Jumlah, Total 
-            FROM {INVENTORY_TABLE_NAME} 
-            WHERE Kategori = ? 
-            ORDER BY Waktu ASC
-        """
-        df = pd.read_sql_query(query, conn, params=[kategori_name])
-        
-        for index, row in df.iterrows():
-            tipe = row['Tipe']
-            jumlah = safe_int_conversion(row['Jumlah'])
-            total = safe_float_conversion(row['Total'])
-            
-            if tipe == "Pembelian" or tipe == "SALDO AWAL":
-                saldo_ekor += jumlah
-                saldo_total += total
-            elif tipe == "Penjualan":
-                saldo_ekor -= jumlah
-                saldo_total -= total 
-                
-        if saldo_ekor > 0:
-            avg_cost = saldo_total / saldo_ekor
-            return saldo_ekor, avg_cost
-        else:
-            return 0, 0.0
-            
-    except Exception:
-        return 0, 0.0
-    finally:
-        conn.close()
+def get_rows_to_delete_map(selected):
+    rows_to_delete_map = {}
+    for sheet_name, row_id in sorted(selected):
+        rows_to_delete_map.setdefault(sheet_name, []).append(row_id)
+    return rows_to_delete_map
+
+def render_selection_summary(pager_key):
+    state = st.session_state[pager_key]
+    if state["selected"]:
+        col_info, col_clear = st.columns([3, 1])
+        col_info.caption(f"{len(state['selected'])} transaksi terpilih di semua halaman.")
+        if col_clear.button("Batalkan Pilihan", key=f"{pager_key}_clear", use_container_width=True):
+            state["selected"].clear()
+            state["bases"].clear()
+            st.rerun()
+
+def load_transactions_frame(sheet_names, period=None):
+    return get_repository().transactions_frame(sheet_names, period)
+
+def get_inventory_balance(kategori_name):
+    return get_repository().inventory_balance(kategori_name)
 
 def get_customer_supplier_list():
-    transactions = load_transactions_data(MAIN_SHEETS)  
-    all_parties = set()
-    for t in transactions:
-        if t.get("Customer"):
-            all_parties.add(t["Customer"])
-    return sorted(list(all_parties))
-
-def calculate_account_balance(akun_name):
-    transactions = load_transactions_data(MAIN_SHEETS)
-    
-    total_debit = 0.0
-    total_kredit = 0.0
-    
-    for trx in transactions:
-        if trx["D1_Akun"] == akun_name: total_debit += trx["D1_Nominal"]
-        if trx["D2_Akun"] == akun_name: total_debit += trx["D2_Nominal"]
-        
-        if trx["K1_Akun"] == akun_name: total_kredit += trx["K1_Nominal"]
-        if trx["K2_Akun"] == akun_name: total_kredit += trx["K2_Nominal"]
-    
-    if akun_name in AKUN_ASET or akun_name in AKUN_BEBAN or akun_name == "Prive":
-        saldo = total_debit - total_kredit 
-    elif akun_name in AKUN_KEWAJIBAN or akun_name in AKUN_PENDAPATAN or akun_name == "Modal" or akun_name in AKUN_KONTRA:
-        saldo = total_kredit - total_debit 
-    else:
-        saldo = total_debit - total_kredit 
-    
-    return saldo
+    return get_report_engine().customer_supplier_list()
 
-def calculate_account_balance_non_sa(akun_name):
-    transactions = load_transactions_data(["Penjualan", "Pembelian", "Lain-lain"]) 
-    
-    total_debit = 0.0
-    total_kredit = 0.0
-    
-    for trx in transactions:
-        if trx["D1_Akun"] == akun_name: total_debit += trx["D1_Nominal"]
-        if trx["D2_Akun"] == akun_name: total_debit += trx["D2_Nominal"]
-        
-        if trx["K1_Akun"] == akun_name: total_kredit += trx["K1_Nominal"]
-        if trx["K2_Akun"] == akun_name: total_kredit += trx["K2_Nominal"]
-    
-    if akun_name in AKUN_ASET or akun_name in AKUN_BEBAN or akun_name == "Prive":
-        saldo = total_debit - total_kredit 
-    elif akun_name in AKUN_KEWAJIBAN or akun_name in AKUN_PENDAPATAN or akun_name == "Modal" or akun_name in AKUN_KONTRA:
-        saldo = total_kredit - total_debit 
-    else:
-        saldo = total_debit - total_kredit
-    
-    return saldo
+def calculate_all_account_balances(sheet_names=MAIN_SHEETS, transactions=None, period=None):
+    return get_report_engine().account_balances(sheet_names, transactions, period)
 
-def get_formatted_journal_data(sheet_names):
-    raw_data = load_transactions_data(sheet_names)
-    formatted_journal = []
+def calculate_account_balance(akun_name, balances=None):
+    return get_report_engine().account_balance(akun_name, balances)
 
-    for transaction in raw_data:
-        if transaction["Source_Sheet"] == "Saldo_Awal":
-            continue
-            
-        waktu = transaction["Waktu"]
-        deskripsi = transaction["Deskripsi"]
-        sort_key = str(waktu)
-        row_index = transaction["Row_Index"] 
-
-        if transaction["D1_Nominal"] > 0 and transaction["D1_Akun"]:
-            keterangan = f"{transaction['D1_Akun']} ({deskripsi})"
-            formatted_journal.append({
-                "Waktu": waktu,
-                "Keterangan": keterangan,
-                "Debit": transaction["D1_Nominal"],
-                "Kredit": 0.0,
-                "Sort_Key": sort_key,
-                "Row_Index": row_index
-            })
-
-        if transaction["D2_Nominal"] > 0 and transaction["D2_Akun"]:
-            formatted_journal.append({
-                "Waktu": "",
-                "Keterangan": transaction["D2_Akun"],
-                "Debit": transaction["D2_Nominal"],
-                "Kredit": 0.0,
-                "Sort_Key": sort_key,
-                "Row_Index": row_index
-            })
-
-        if transaction["K1_Nominal"] > 0 and transaction["K1_Akun"]:
-            keterangan = f"    {transaction['K1_Akun']}"
-            formatted_journal.append({
-                "Waktu": "",
-                "Keterangan": keterangan,  
-                "Debit": 0.0,
-                "Kredit": transaction["K1_Nominal"],
-                "Sort_Key": sort_key,
-                "Row_Index": row_index
-            })
-        
-        if transaction["K2_Nominal"] > 0 and transaction["K2_Akun"]:
-            formatted_journal.append({
-                "Waktu": "",
-                "Keterangan": f"    {transaction['K2_Akun']}",  
-                "Debit": 0.0,
-                "Kredit": transaction["K2_Nominal"],
-                "Sort_Key": sort_key,
-                "Row_Index": row_index
-            })
-            
-    formatted_journal.sort(key=lambda x: str(x["Sort_Key"]))
-    return formatted_journal
+def calculate_account_balance_non_sa(akun_name, balances=None):
+    return get_report_engine().account_balance_non_sa(akun_name, balances)
 
-def get_ledger_data_for_display(akun_name, all_transactions):
-    ledger_entries = []
-    
-    saldo_awal = 0.0
-    if akun_name in AKUN_ASET or akun_name in AKUN_BEBAN or akun_name == "Prive":
-        saldo_normal_multiplier = 1
-    else:
-        saldo_normal_multiplier = -1
-        
-    saldo_awal_entries = [t for t in all_transactions if t["Source_Sheet"] == "Saldo_Awal"]
-    
-    initial_balance_ids = []
-    total_debit_sa = 0.0
-    total_kredit_sa = 0.0
-    
-    for t in saldo_awal_entries:
-        debit_sa = t["D1_Nominal"] if t["D1_Akun"] == akun_name else 0.0
-        debit_sa += t["D2_Nominal"] if t["D2_Akun"] == akun_name else 0.0
-        
-        kredit_sa = t["K1_Nominal"] if t["K1_Akun"] == akun_name else 0.0
-        kredit_sa += t["K2_Nominal"] if t["K2_Akun"] == akun_name else 0.0
-        
-        if debit_sa > 0.01 or kredit_sa > 0.01:
-            if saldo_normal_multiplier == 1:
-                saldo_awal += (debit_sa - kredit_sa)
-            else:
-                saldo_awal += (kredit_sa - debit_sa)
-            
-            if debit_sa > 0.01: 
-                total_debit_sa += debit_sa
-                initial_balance_ids.append({"id": t["id"], "is_debit": True, "nominal": debit_sa})
-            if kredit_sa > 0.01:
-                total_kredit_sa += kredit_sa
-                initial_balance_ids.append({"id": t["id"], "is_debit": False, "nominal": kredit_sa})
-
-    if abs(saldo_awal) > 0.01:
-        sa_ids_string = ",".join([str(d["id"]) for d in initial_balance_ids])
-        
-        ledger_entries.append({
-            "Waktu": "Awal Periode",  
-            "Deskripsi": "Saldo Awal",
-            "Debit": total_debit_sa,  
-            "Kredit": total_kredit_sa,
-            "Saldo Akhir": saldo_awal,
-            "Source_Sheet": "Saldo_Awal",
-            "Row_Index": -1, 
-            "Tipe_Entry": "Saldo Awal Total",
-            "SA_Detail_IDs": sa_ids_string 
-        })
-        
-    saldo_berjalan = saldo_awal
-    
-    for t in all_transactions:
-        if t["Source_Sheet"] == "Saldo_Awal": continue
+def get_formatted_journal_data(sheet_names, period=None):
+    return get_report_engine().formatted_journal(sheet_names, period)
 
-        debit = 0.0
-        kredit = 0.0
-        
-        if t["D1_Akun"] == akun_name: debit += t["D1_Nominal"]
-        if t["D2_Akun"] == akun_name: debit += t["D2_Nominal"]
-        if t["K1_Akun"] == akun_name: kredit += t["K1_Nominal"]
-        if t["K2_Akun"] == akun_name: kredit += t["K2_Nominal"]
-            
-        if debit > 0 or kredit > 0:
-            if saldo_normal_multiplier == 1:
-                saldo_berjalan += (debit - kredit)
-            else:
-                saldo_berjalan += (kredit - debit)  
-                
-            ledger_entries.append({
-                "Waktu": t["Waktu"],  
-                "Deskripsi": t["Deskripsi"],
-                "Debit": debit,  
-                "Kredit": kredit,  
-                "Saldo Akhir": saldo_berjalan,
-                "Source_Sheet": t["Source_Sheet"],
-                "Row_Index": t["Row_Index"],
-                "Tipe_Entry": "Transaksi Normal",
-                "SA_Detail_IDs": None
-            })
-    
-    def get_sort_key(entry):
-        waktu = entry["Waktu"]
-        if waktu == "Awal Periode":
-            return (0, 0) 
-        else:
-            return (1, waktu) 
+def load_account_ledger_lines(akun_name, sheet_names=MAIN_SHEETS, period=None):
+    return get_repository().ledger_lines(akun_name, sheet_names, period)
 
-    ledger_entries.sort(key=get_sort_key)  
-    
-    return ledger_entries
+def get_ledger_data_for_display(akun_name, ledger_lines=None, period=None):
+    return get_report_engine().account_ledger(akun_name, ledger_lines, period)
 
+def get_general_ledger_frame(sheet_names=MAIN_SHEETS, period=None):
+    return get_report_engine().general_ledger(sheet_names, period)
 
-def get_dashboard_kpis():
-    
-    saldo_kas = calculate_account_balance("Kas")
-    total_penjualan = calculate_account_balance("Penjualan")
-    laba_rugi = calculate_laba_rugi()[2]
 
-    total_stok_ekor = 0
-    total_stok_nilai = 0.0
-    
-    for akun in INVENTORY_ACCOUNT_CHOICES:
-        kategori = akun.replace('Persediaan kambing ', '').title()
-        ekor, avg_cost = get_last_average_cost(kategori)
-        total_stok_ekor += ekor
-        total_stok_nilai += (ekor * avg_cost)
+def get_dashboard_kpis():
+    return get_report_engine().dashboard_kpis()
 
-    return saldo_kas, total_penjualan, laba_rugi, total_stok_ekor, total_stok_nilai
+def calculate_laba_rugi(balances=None):
+    return get_report_engine().laba_rugi(balances)
 
-def calculate_laba_rugi():
-    total_pendapatan = sum([calculate_account_balance(akun) for akun in AKUN_PENDAPATAN])
-    total_beban = sum([calculate_account_balance(akun) for akun in AKUN_BEBAN])
-    laba_rugi = total_pendapatan - total_beban
-    return total_pendapatan, total_beban, laba_rugi
+def load_daily_trends(period=None):
+    return get_report_engine().daily_trends(period)
 
 def generate_neraca_saldo_page():
     st.title("🧾 Neraca Saldo (Trial Balance)")
@@ -600,49 +279,13 @@ def generate_neraca_saldo_page():
         st.rerun()
 
     st.markdown("---")
+    period = period_selector("neraca_saldo", show_start=False)
     st.subheader("Neraca Saldo - Subuh Jaya Farm")
-    st.markdown(f"**Per Tanggal:** {datetime.now().strftime('%d %B %Y')}")
-
-    neraca_saldo_data = []
-    total_debit_ns = 0.0
-    total_kredit_ns = 0.0
-
-    all_accounts = sorted(GENERAL_LEDGER_ACCOUNTS)
+    st.markdown(f"**Per Tanggal:** {format_period_date(period[1] if period else None)}")
 
-    for akun in all_accounts:
-        saldo = calculate_account_balance(akun)
-        debit = 0.0
-        kredit = 0.0
-
-        if abs(saldo) > 0.01:
-            if akun in AKUN_ASET or akun in AKUN_BEBAN or akun == "Prive": 
-                if saldo >= 0:
-                    debit = saldo
-                else:
-                    kredit = abs(saldo)
-            
-            elif akun in AKUN_KEWAJIBAN or akun in AKUN_PENDAPATAN or akun == "Modal" or akun in AKUN_KONTRA: 
-                if saldo >= 0:
-                    kredit = saldo
-                else:
-                    debit = abs(saldo)
-            
-            else: 
-                if saldo >= 0:
-                    debit = saldo
-                else:
-                    kredit = abs(saldo)
-
-            if debit > 0 or kredit > 0:
-                neraca_saldo_data.append({
-                    "Keterangan": akun,
-                    "Debit": debit,
-                    "Kredit": kredit
-                })
-                total_debit_ns += debit
-                total_kredit_ns += kredit
-    
-    df_ns = pd.DataFrame(neraca_saldo_data)
+    df_ns = get_report_engine().trial_balance(period)
+    total_debit_ns = int(df_ns["Debit"].sum())
+    total_kredit_ns = int(df_ns["Kredit"].sum())
 
     if df_ns.empty:
         st.info("Tidak ada saldo yang tercatat untuk Neraca Saldo.")
@@ -665,12 +308,12 @@ def generate_neraca_saldo_page():
     with col_total3:
         st.markdown(f'**Rp. {total_kredit_ns:,.0f}**')
 
-    if abs(total_debit_ns - total_kredit_ns) < 1.0:
+    if total_debit_ns == total_kredit_ns:
         st.success("Neraca Saldo **SEIMBANG**. (Total Debit = Total Kredit)")
     else:
         st.error(f"PERINGATAN: Neraca Saldo **TIDAK SEIMBANG**! Selisih: Rp. {abs(total_debit_ns - total_kredit_ns):,.0f}")
 
-    add_download_button(df_for_download, "Neraca_Saldo.xlsx", key_suffix="neraca_saldo")
+    add_download_button(df_for_download, "Neraca_Saldo.xlsx", key_suffix="neraca_saldo", report_params=(period,))
 
 def get_base64_of_file(path):
     try:
@@ -687,50 +330,16 @@ def generate_laba_rugi_page():
         st.rerun()
 
     st.markdown("---")
+    period = period_selector("laba_rugi")
     st.subheader("Laporan Laba Rugi - Subuh Jaya Farm")
-    st.markdown(f"**Periode Sampai Tanggal:** {datetime.now().strftime('%d %B %Y')}")
-    
-    st.markdown(f'<div style="text-align: center; margin: 10px 0; border: 1px dashed #ccc; padding: 10px; background-color: #f9f9f9;">Infografis Laba Rugi (Revenue - Expenses)</div>', unsafe_allow_html=True)
-    
-    total_pendapatan, total_beban_gross, laba_rugi_gross = calculate_laba_rugi()
-    
-    lr_data = []
-    
-    lr_data.append({"Keterangan": "PENDAPATAN", "Nominal": None})
-    total_pendapatan_pos = 0.0
-    for akun in AKUN_PENDAPATAN:
-        saldo = calculate_account_balance(akun)
-        if saldo > 0:
-            lr_data.append({"Keterangan": f"    {akun}", "Nominal": saldo})
-            total_pendapatan_pos += saldo
-    
-    hpp_val = calculate_account_balance("HPP")
-    if hpp_val > 0:
-        lr_data.append({"Keterangan": "Beban Pokok Penjualan (HPP)", "Nominal": -hpp_val})
-        laba_bruto = total_pendapatan_pos - hpp_val
+    if period and period[0]:
+        st.markdown(f"**Periode:** {format_period_date(period[0])} s.d. {format_period_date(period[1])}")
     else:
-        laba_bruto = total_pendapatan_pos
-        
-    lr_data.append({"Keterangan": "LABA BRUTO", "Nominal": laba_bruto, "Total": "Subtotal"})
-    lr_data.append({"Keterangan": "", "Nominal": None})
-
-    lr_data.append({"Keterangan": "BEBAN OPERASIONAL", "Nominal": None})
-    total_beban_ops = 0.0
-    beban_ops_list = [a for a in AKUN_BEBAN if a != "HPP"]
-    for akun in beban_ops_list:
-        saldo = calculate_account_balance(akun)
-        if saldo > 0:
-            lr_data.append({"Keterangan": f"    {akun}", "Nominal": -saldo})
-            total_beban_ops += saldo
-    
-    if total_beban_ops > 0:
-        lr_data.append({"Keterangan": "TOTAL BEBAN OPERASIONAL", "Nominal": -total_beban_ops, "Total": "Subtotal"})
+        st.markdown(f"**Periode Sampai Tanggal:** {format_period_date(period[1] if period else None)}")
     
-    laba_bersih_final = laba_bruto - total_beban_ops
-    lr_data.append({"Keterangan": "", "Nominal": None})
-    lr_data.append({"Keterangan": "LABA (RUGI) BERSIH", "Nominal": laba_bersih_final, "Total": "Final"})
+    st.markdown(f'<div style="text-align: center; margin: 10px 0; border: 1px dashed #ccc; padding: 10px; background-color: #f9f9f9;">Infografis Laba Rugi (Revenue - Expenses)</div>', unsafe_allow_html=True)
     
-    df_lr = pd.DataFrame(lr_data)
+    df_lr, laba_bersih_final = get_report_engine().laba_rugi_statement(period)
     
     df_for_download = df_lr.copy()
     
@@ -748,7 +357,7 @@ def generate_laba_rugi_page():
     
     st.dataframe(df_lr, hide_index=True, use_container_width=True)
 
-    add_download_button(df_for_download, "Laporan_Laba_Rugi.xlsx", key_suffix="laba_rugi")
+    add_download_button(df_for_download, "Laporan_Laba_Rugi.xlsx", key_suffix="laba_rugi", report_params=(period,))
 
     return laba_bersih_final
 
@@ -760,8 +369,9 @@ def generate_balance_sheet(title):
         st.rerun()
 
     st.markdown("---")
+    period = period_selector("posisi_keuangan")
     st.subheader(f"{title} - Subuh Jaya Farm")
-    st.markdown(f"**Per Tanggal:** {datetime.now().strftime('%d %B %Y')}")
+    st.markdown(f"**Per Tanggal:** {format_period_date(period[1] if period else None)}")
     st.caption("Aset harus seimbang dengan Kewajiban ditambah Ekuitas.")
     
     st.markdown("""
@@ -770,111 +380,8 @@ def generate_balance_sheet(title):
         </div>
         """, unsafe_allow_html=True)
     
-    laba_rugi = calculate_laba_rugi()[2]
-    
-    data = []
-    total_aset = 0.0
-    total_kewajiban = 0.0
-    total_ekuitas_bersih = 0.0
-    
-    data.append({"Keterangan": "ASET", "Nominal": None, "Kategori": "A"})
-    
-    data.append({"Keterangan": "Aset Lancar:", "Nominal": None, "Kategori": "A"})
-    current_assets = [a for a in AKUN_ASET if a not in ["Bangunan kandang", "Kendaraan"]]
-    total_lancar = 0.0
-    for akun in current_assets:
-        saldo = calculate_account_balance(akun)
-        if saldo > 0:
-            data.append({"Keterangan": f"    {akun}", "Nominal": saldo, "Kategori": "A"})
-            total_lancar += saldo
-    data.append({"Keterangan": "Total Aset Lancar", "Nominal": total_lancar, "Total_Type": "Subtotal", "Kategori": "A"})
-    
-    data.append({"Keterangan": "Aset Tidak Lancar:", "Nominal": None, "Kategori": "A"})
-    total_tetap_bruto = 0.0
-    
-    for akun in ["Bangunan kandang", "Kendaraan"]:
-        saldo = calculate_account_balance(akun)
-        if saldo > 0:
-            data.append({"Keterangan": f"    {akun} (Bruto)", "Nominal": saldo, "Kategori": "A"})
-            total_tetap_bruto += saldo
-            
-    akumulasi_penyusutan = calculate_account_balance("Akumulasi penyusutan")
-    if akumulasi_penyusutan > 0:
-        data.append({"Keterangan": f"    (Akumulasi Penyusutan)", "Nominal": -akumulasi_penyusutan, "Kategori": "A"})
-        total_tetap_bersih = total_tetap_bruto - akumulasi_penyusutan
-    else:
-        total_tetap_bersih = total_tetap_bruto
-        
-    data.append({"Keterangan": "Total Aset Tidak Lancar (Neto)", "Nominal": total_tetap_bersih, "Total_Type": "Subtotal", "Kategori": "A"})
-    
-    total_aset = total_lancar + total_tetap_bersih
-    data.append({"Keterangan": "TOTAL ASET", "Nominal": total_aset, "Total_Type": "Final", "Kategori": "A"})
-    data.append({"Keterangan": "", "Nominal": None, "Kategori": None})
-    
-    data.append({"Keterangan": "LIABILITAS DAN EKUITAS", "Nominal": None, "Kategori": "L+E"})
-    
-    data.append({"Keterangan": "Liabilitas:", "Nominal": None, "Kategori": "L+E"})
-    total_kewajiban_sa_non_modal = 0.0
-    for akun in AKUN_KEWAJIBAN:
-        saldo = calculate_account_balance(akun)
-        if saldo > 0:
-            data.append({"Keterangan": f"    {akun}", "Nominal": saldo, "Kategori": "L+E"})
-            total_kewajiban += saldo
-    data.append({"Keterangan": "Total Liabilitas", "Nominal": total_kewajiban, "Total_Type": "Subtotal", "Kategori": "L+E"})
-    
-    data.append({"Keterangan": "Ekuitas:", "Nominal": None, "Kategori": "L+E"})
-    
-    modal_non_sa = calculate_account_balance_non_sa("Modal")
-
-    total_aset_awal = 0.0
-    for akun in AKUN_ASET:
-        transactions = load_transactions_data(["Saldo_Awal"])
-        total_debit_sa = sum(t["D1_Nominal"] for t in transactions if t["D1_Akun"] == akun)
-        total_debit_sa += sum(t["D2_Nominal"] for t in transactions if t["D2_Akun"] == akun)
-        total_kredit_sa = sum(t["K1_Nominal"] for t in transactions if t["K1_Akun"] == akun)
-        total_kredit_sa += sum(t["K2_Nominal"] for t in transactions if t["K2_Akun"] == akun)
-        
-        total_aset_awal += (total_debit_sa - total_kredit_sa)
-
-    total_liabilitas_awal = 0.0
-    liabilitas_kontra = AKUN_KEWAJIBAN + AKUN_KONTRA
-    for akun in liabilitas_kontra:
-        transactions = load_transactions_data(["Saldo_Awal"])
-        total_debit_sa = sum(t["D1_Nominal"] for t in transactions if t["D1_Akun"] == akun)
-        total_debit_sa += sum(t["D2_Nominal"] for t in transactions if t["D2_Akun"] == akun)
-        total_kredit_sa = sum(t["K1_Nominal"] for t in transactions if t["K1_Akun"] == akun)
-        total_kredit_sa += sum(t["K2_Nominal"] for t in transactions if t["K2_Akun"] == akun)
-        
-        total_liabilitas_awal += (total_kredit_sa - total_debit_sa)
-
-    sa_modal_implisit = total_aset_awal - total_liabilitas_awal
-
-    saldo_modal_final = sa_modal_implisit + modal_non_sa 
-
-    if abs(saldo_modal_final) > 0:
-        data.append({"Keterangan": f"    Modal Awal", "Nominal": saldo_modal_final, "Kategori": "L+E"})
-        total_ekuitas_bersih += saldo_modal_final
-    
-    prive = calculate_account_balance("Prive")
-    if prive > 0:
-        data.append({"Keterangan": f"    (Prive)", "Nominal": -prive, "Kategori": "L+E"})
-        total_ekuitas_bersih -= prive
-        
-    if laba_rugi != 0:
-        data.append({"Keterangan": f"    Laba (Rugi) Periode Berjalan", "Nominal": laba_rugi, "Kategori": "L+E"})
-        total_ekuitas_bersih += laba_rugi
-        
-    data.append({"Keterangan": "Total Ekuitas", "Nominal": total_ekuitas_bersih, "Total_Type": "Subtotal", "Kategori": "L+E"})
-    
-    total_liabilitas_ekuitas = total_kewajiban + total_ekuitas_bersih
-    data.append({"Keterangan": "TOTAL LIABILITAS DAN EKUITAS", "Nominal": total_liabilitas_ekuitas, "Total_Type": "Final", "Kategori": "L+E"})
-    
-    df = pd.DataFrame(data)
-    
-    df_for_download = df.copy()
-    df_for_download.insert(1, "ASET", df_for_download.apply(lambda row: row['Nominal'] if row['Kategori'] == 'A' else None, axis=1))
-    df_for_download.insert(2, "LIABILITAS_EKUITAS", df_for_download.apply(lambda row: row['Nominal'] if row['Kategori'] == 'L+E' else None, axis=1))
-    df_for_download = df_for_download.drop(columns=['Nominal', 'Total_Type', 'Kategori'])
+    df, total_aset, total_liabilitas_ekuitas = get_report_engine().balance_sheet(period)
+    df_for_download = get_balance_sheet_export_frame(df)
 
     def format_bs(val, type):
         if val is None: return ""
@@ -901,13 +408,165 @@ def generate_balance_sheet(title):
         st.dataframe(df_le, hide_index=True, use_container_width=True)
     
     st.markdown("---")
-    if abs(total_aset - total_liabilitas_ekuitas) < 1.0:
+    if total_aset == total_liabilitas_ekuitas:
         st.success(f"Laporan Seimbang: Total Aset (Rp. {total_aset:,.0f}) = Total L+E (Rp. {total_liabilitas_ekuitas:,.0f}).")
     else:
         st.error(f"PERINGATAN: Laporan Tidak Seimbang! Selisih: Rp. {abs(total_aset - total_liabilitas_ekuitas):,.0f}")
         
     st.markdown("---")
-    add_download_button(df_for_download, "Laporan_Posisi_Keuangan.xlsx", key_suffix="posisi_keuangan")
+    add_download_button(df_for_download, "Laporan_Posisi_Keuangan.xlsx", key_suffix="posisi_keuangan", report_params=(period,))
+
+def generate_period_closing_page():
+    st.title("🔒 Tutup Buku Periode")
+
+    if st.button("⬅️ Kembali ke Dashboard"):
+        st.session_state['page'] = 'dashboard'
+        st.rerun()
+
+    st.markdown("---")
+
+    db_path = st.session_state.get('db_path')
+    if not db_path:
+        st.error("Database user tidak ditemukan.")
+        return
+
+    closings = load_period_closings(db_path)
+
+    st.subheader("Periode yang Sudah Ditutup")
+    if closings.empty:
+        st.info("Belum ada periode yang ditutup.")
+    else:
+        st.dataframe(closings.rename(columns={"period_end": "Akhir Periode", "closed_at": "Ditutup Pada"}), hide_index=True, use_container_width=True)
+
+    st.subheader("Tutup Periode")
+    cols_closing = st.columns(2)
+    with cols_closing[0]:
+        jenis_periode = st.radio("Jenis Periode", ["Bulanan", "Tahunan"], horizontal=True, key="closing_type")
+    with cols_closing[1]:
+        tanggal_periode = st.date_input("Tanggal di Dalam Periode", datetime.now().date(), key="closing_date")
+
+    period_end = get_period_end_date(tanggal_periode, jenis_periode)
+    st.caption(f"Saldo semua akun dan stok per kategori s.d. {format_period_date(period_end)} akan disimpan sebagai titik awal laporan. Transaksi pada atau sebelum tanggal tersebut terkunci sampai periodenya dibuka kembali.")
+
+    df_stok = fetch_inventory_state_as_of(db_path, period_end)
+    if not df_stok.empty:
+        df_stok = df_stok.rename(columns={"kategori": "Kategori", "saldo_ekor": "Saldo (ekor)", "saldo_total": "Saldo (total)"})
+        df_stok["Saldo (total)"] = df_stok["Saldo (total)"].apply(lambda x: f"Rp. {x:,.0f}")
+        st.dataframe(df_stok, hide_index=True, use_container_width=True)
+
+    invalid_waktu = get_repository().invalid_waktu_rows()
+    if not invalid_waktu.empty:
+        st.error(f"{len(invalid_waktu)} baris jurnal/inventory belum memiliki tanggal yang valid. Hapus dan catat ulang baris tersebut dengan tanggal yang benar sebelum menutup periode, karena baris tanpa tanggal tidak ikut saldo periode.")
+        st.dataframe(invalid_waktu.rename(columns={"tabel": "Tabel", "id": "ID", "sumber": "Sumber", "keterangan": "Keterangan"}), hide_index=True, use_container_width=True)
+
+    if st.button(f"🔒 Tutup Periode s.d. {format_period_date(period_end)}", key="close_period_button", disabled=not invalid_waktu.empty):
+        try:
+            close_period(db_path, period_end)
+            st.success(f"Periode s.d. {format_period_date(period_end)} berhasil ditutup.")
+            st.rerun()
+        except (ValueError, sqlite3.Error) as e:
+            st.error(f"Gagal menutup periode: {e}")
+
+    if not closings.empty:
+        st.markdown("---")
+        st.subheader("Buka Kembali Periode")
+        reopen_end = st.selectbox("Pilih Periode", options=closings["period_end"].tolist()[::-1], key="reopen_period")
+        st.warning("Membuka kembali sebuah periode juga membatalkan snapshot semua periode sesudahnya.")
+        if st.button("🔓 Buka Kembali Periode", key="reopen_period_button"):
+            reopened_count = reopen_period(db_path, reopen_end)
+            st.success(f"{reopened_count} periode dibuka kembali.")
+            st.rerun()
+
+    st.markdown("---")
+    st.subheader("Ekspor Buku Lengkap")
+    st.caption("Satu file Excel berisi jurnal per sumber, buku besar setiap akun, kartu piutang dan utang per mitra, kartu stok, neraca saldo, laba rugi, dan posisi keuangan.")
+    add_full_books_download_button(period_selector("buku_lengkap"))
+
+def generate_raw_backup_page():
+    st.title("💾 Cadangan & Pemulihan Data")
+
+    if st.button("⬅️ Kembali ke Dashboard"):
+        st.session_state['page'] = 'dashboard'
+        st.rerun()
+
+    st.markdown("---")
+
+    db_path = st.session_state.get('db_path')
+    if not db_path:
+        st.error("Database user tidak ditemukan.")
+        return
+
+    st.subheader("Cadangan Data Mentah")
+    st.caption("Tabel jurnal dan inventory apa adanya, untuk cadangan, pindah server, atau analisis di luar aplikasi. Parquet lebih kecil dan lebih cepat dibaca ulang.")
+    raw_format = st.radio("Format", RAW_EXPORT_FORMATS, horizontal=True, key="raw_export_format")
+    add_raw_export_download_buttons(raw_format)
+
+    st.markdown("---")
+    with st.expander("♻️ Pulihkan Data Mentah"):
+        st.caption("Hanya untuk database user yang masih kosong. Semua baris dimasukkan dalam satu transaksi, lalu saldo akun, stok, dan ringkasan harian dihitung ulang sekali.")
+        uploads = {
+            table_name: st.file_uploader(f"File {table_name}.{raw_format}", type=[raw_format], key=f"restore_raw_{table_name}")
+            for table_name in RAW_EXPORT_TABLES
+        }
+        confirmed = st.checkbox("Saya yakin ingin memulihkan data dari file di atas ke database ini.", key="restore_raw_confirm")
+        if st.button("♻️ Pulihkan Data", key="restore_raw_button", disabled=not (any(uploads.values()) and confirmed)):
+            try:
+                counts = restore_raw_tables(db_path, {table_name: f for table_name, f in uploads.items() if f is not None}, raw_format)
+                st.success(", ".join(f"{n_rows:,} baris {table_name}" for table_name, n_rows in counts.items()) + " berhasil dipulihkan.")
+            except (ValueError, sqlite3.Error) as e:
+                st.error(f"Gagal memulihkan data: {e}")
+
+IMPORT_TEMPLATE_ROWS = [
+    ["2025-01-06", "Pembelian", "Beli bakalan", "Kredit", "Supplier A", "Jantan", None, None, 2500000, 4],
+    ["2025-01-08", "Penjualan", "Jual ke pasar", "Tunai", "Customer B", "Jantan", None, None, 3200000, 2],
+    ["2025-01-08", "Lain-lain", "Beli pakan", None, None, None, "Beban pakan ternak", "Kas", 750000, 1],
+]
+
+def generate_import_page():
+    st.title("📥 Impor Transaksi dari Excel/CSV")
+    if st.button("⬅️ Kembali ke Dashboard"):
+        st.session_state['page'] = 'dashboard'
+        st.rerun()
+
+    st.markdown("---")
+
+    if not st.session_state.get('db_path'):
+        st.error("Database user tidak ditemukan.")
+        return
+
+    st.caption(f"Satu baris per transaksi Penjualan, Pembelian, atau Lain-lain dengan kolom: {', '.join(IMPORT_COLUMNS)}. Penjualan dan Pembelian memakai Metode dan Kategori Ternak; Lain-lain memakai Debit Akun dan Kredit Akun. Tanggal ditulis YYYY-MM-DD, YYYY/MM/DD, DD/MM/YYYY, DD-MM-YYYY, atau DD.MM.YYYY; format lain ditandai tidak valid.")
+    st.caption("HPP penjualan dihitung otomatis (rata-rata bergerak) sesuai urutan tanggal, mulai dari saldo stok terkini, sehingga tanggal Penjualan/Pembelian tidak boleh sebelum mutasi stok terakhir. Jika ada satu baris yang gagal divalidasi, tidak ada transaksi yang disimpan.")
+    st.download_button(
+        label="📄 Unduh Template (.xlsx)",
+        data=lambda: to_excel(pd.DataFrame(IMPORT_TEMPLATE_ROWS, columns=IMPORT_COLUMNS), "Transaksi"),
+        file_name="Template_Impor_Transaksi.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        key="download_import_template",
+        on_click="ignore"
+    )
+
+    uploaded_file = st.file_uploader("File Transaksi", type=["xlsx", "csv"], key="import_transactions_file")
+    if st.button("📥 Impor Transaksi", key="import_transactions_button", disabled=uploaded_file is None):
+        try:
+            report = get_posting_engine().import_transactions(read_import_file(uploaded_file, uploaded_file.name))
+        except (ValueError, sqlite3.Error) as e:
+            st.error(f"Gagal mengimpor transaksi: {e}")
+            return
+
+        failed = report[report["Status"] == "Gagal"]
+        if failed.empty:
+            st.success(f"{len(report):,} transaksi berhasil diimpor.")
+        else:
+            st.error(f"{len(failed):,} dari {len(report):,} baris gagal divalidasi. Tidak ada transaksi yang disimpan; perbaiki baris tersebut lalu impor ulang.")
+        st.dataframe(report if failed.empty else failed, hide_index=True, use_container_width=True)
+        st.download_button(
+            label="⬇️ Unduh Laporan Impor (.csv)",
+            data=report.to_csv(index=False).encode("utf-8"),
+            file_name="Laporan_Impor_Transaksi.csv",
+            mime="text/csv",
+            key="download_import_report",
+            on_click="ignore"
+        )
 
 def report_page(title, sheet_names):
     st.title(title)
@@ -915,25 +574,29 @@ def report_page(title, sheet_names):
         st.session_state['page'] = 'dashboard'
         st.rerun()
         
-    target_sheet = sheet_names[0]  
-    data = get_formatted_journal_data(sheet_names)
+    target_sheet = sheet_names[0]
+    period = period_selector(f"jurnal_{target_sheet}")
+    pager_key = f"jurnal_pager_{target_sheet}"
+    state, page_size = render_pager_options(pager_key, period)
+    page = get_report_engine().journal_page(sheet_names, period, state["key"], state["direction"], page_size)
+    data = page["rows"]
     
-    if data:
+    if data or page["has_prev"]:
         st.subheader("Data Transaksi (Format Jurnal)")
         
-        df = pd.DataFrame(data)
+        df = pd.DataFrame(data, columns=["Waktu", "Keterangan", "Debit", "Kredit", "Sort_Key", "Row_Index"])
+        row_items = [[(target_sheet, int(row_index))] for row_index in df['Row_Index']]
+        editor_key = get_pager_editor_key(f'jurnal_data_editor_{target_sheet}', state, page_size)
+        base = get_selection_base(state, editor_key)
         
-        df_for_delete = df[['Row_Index']].copy()
         df_for_display = df.drop(columns=['Row_Index', 'Sort_Key'])
         
-        df_for_download = df_for_display.copy()
-        
         df_for_display['Debit'] = df_for_display['Debit'].apply(lambda x: f"Rp. {x:,.0f}")
         df_for_display['Kredit'] = df_for_display['Kredit'].apply(lambda x: f"Rp. {x:,.0f}")
 
-        df_for_display.insert(0, 'Pilih', False)
+        df_for_display.insert(0, 'Pilih', get_selection_column(row_items, base, df_for_display.index))
         
-        edited_df = st.data_editor(
+        edited_df = render_data_editor(
             df_for_display,  
             column_order=["Pilih", "Waktu", "Keterangan", "Debit", "Kredit"],
             column_config={
@@ -945,23 +608,21 @@ def report_page(title, sheet_names):
             },
             hide_index=True,
             use_container_width=True,
-            key=f'jurnal_data_editor_{target_sheet}'
+            key=editor_key
         )
+        apply_grid_selection(state, row_items, base, df_for_display['Pilih'], edited_df['Pilih'])
+        render_pager_navigation(pager_key, page)
         
-        add_download_button(df_for_download, f"Jurnal_{target_sheet}.xlsx", key_suffix=f"jurnal_{target_sheet}")
+        reports = get_report_engine()
+        add_download_button(
+            lambda: pd.DataFrame(reports.formatted_journal(sheet_names, period), columns=["Waktu", "Keterangan", "Debit", "Kredit"]),
+            f"Jurnal_{target_sheet}.xlsx", key_suffix=f"jurnal_{target_sheet}", report_params=(period,)
+        )
         st.markdown("---")
 
-        selected_indices = edited_df[edited_df['Pilih']].index.tolist()
-        
-        rows_to_delete = []
-        rows_to_delete_map = {}
-        
-        if selected_indices:
-            selected_ids = df_for_delete.iloc[selected_indices]['Row_Index'].unique().tolist()
-            rows_to_delete = selected_ids
-            rows_to_delete_map[target_sheet] = rows_to_delete
-
-        total_trx_to_delete = len(rows_to_delete)
+        render_selection_summary(pager_key)
+        rows_to_delete_map = get_rows_to_delete_map(state["selected"])
+        total_trx_to_delete = len(state["selected"])
         
         if st.button(f"🗑️ Hapus {total_trx_to_delete} Transaksi Terpilih", key=f'delete_button_{target_sheet}', disabled=total_trx_to_delete == 0):
             
@@ -969,20 +630,18 @@ def report_page(title, sheet_names):
             
             if deleted_count > 0:
                 st.success(f"{deleted_count} transaksi berhasil dihapus dari sheet {target_sheet}.")
-                st.session_state.pop(f'jurnal_data_editor_{target_sheet}', None)
+                st.session_state.pop(pager_key, None)
                 st.rerun()
             else:
                 st.warning("Tidak ada data yang dihapus.")
 
+    elif state["key"] is not None:
+        st.info("Tidak ada transaksi pada atau setelah tanggal tersebut.")
     else:
         st.info("Tidak ada data transaksi yang tercatat.")
 
-def get_sort_key_subledger(entry):
-    waktu = entry["Waktu"]
-    if waktu == "Awal Periode":
-        return (0, "0000-00-00")  
-    else:
-        return (1, waktu)  
+def load_partner_subledgers(akun_type, period=None):
+    return get_report_engine().partner_subledgers(akun_type, period)
 
 def generate_general_ledger_report(akun_type):
     if st.button("⬅️ Kembali ke Dashboard"):
@@ -990,227 +649,121 @@ def generate_general_ledger_report(akun_type):
         st.rerun()
         
     st.markdown("---")
-    
-    transactions = load_transactions_data(MAIN_SHEETS)  
-    
-    if akun_type == 'BB_PIUTANG':
-        report_title = "🤝 Kartu Piutang Usaha (Per Customer)"
-        st.title(report_title)
-        
-        piutang_akun = "Piutang usaha"
-        piutang_transactions = [
-            t for t in transactions if 
-            (t["Source_Sheet"] != "Saldo_Awal" and t.get("Customer") and (piutang_akun in [t["D1_Akun"], t["D2_Akun"], t["K1_Akun"], t["K2_Akun"]])) or
-            (t["Source_Sheet"] == "Saldo_Awal" and t.get("Customer") and t["D1_Akun"] == piutang_akun)
-        ]
-        
-        all_customers = {t["Customer"] for t in piutang_transactions if t.get("Customer")}
 
-        if not all_customers:
-            st.info("Tidak ada data Piutang Kredit atau Saldo Awal Piutang yang tercatat.")
-            return
+    period = period_selector(f"bb_{akun_type.lower()}")
 
-        selected_customer = st.selectbox("Pilih Customer", options=sorted(list(all_customers)))
+    if akun_type in SUBLEDGER_SPECS:
+        spec = SUBLEDGER_SPECS[akun_type]
+        label, mitra, kunci = spec["label"], spec["mitra"], spec["label"].lower()
+        st.title(spec["title"])
 
-        if selected_customer:
-            st.subheader(f"Mutasi Piutang untuk: {selected_customer}")
-            
-            saldo_awal_piutang = 0.0
-            saldo_awal_data = [t for t in transactions if t["Source_Sheet"] == "Saldo_Awal" and t["D1_Akun"] == piutang_akun and t.get("Customer") == selected_customer]
-            if saldo_awal_data:
-                saldo_awal_piutang = sum(t["D1_Nominal"] for t in saldo_awal_data)
-                
-            ledger_entries = []
-            
-            if abs(saldo_awal_piutang) > 0.01:
-                sa_ids_string = ",".join([str(t["id"]) for t in saldo_awal_data])
-                ledger_entries.append({
-                    "Waktu": "Awal Periode",  "Deskripsi": "Saldo Awal",
-                    "Debit": saldo_awal_piutang,  "Kredit": 0.0,
-                    "Saldo Akhir": saldo_awal_piutang,
-                    "Source_Sheet": "Saldo_Awal", "Row_Index": -1,  
-                    "Tipe_Entry": "Saldo Awal Total", "SA_Detail_IDs": sa_ids_string
-                })
-            
-            saldo_berjalan = saldo_awal_piutang
-            
-            for t in transactions:
-                if t["Source_Sheet"] == "Saldo_Awal": continue
-                
-                debit = 0.0
-                kredit = 0.0
-                
-                if t["Customer"] == selected_customer:
-                    if t["Source_Sheet"] == "Penjualan" and t["D1_Akun"] == piutang_akun:
-                        debit = t["D1_Nominal"]
-                        
-                    elif t["Source_Sheet"] == "Lain-lain":
-                        if t["K1_Akun"] == piutang_akun: kredit += t["K1_Nominal"]
-                        if t["K2_Akun"] == piutang_akun: kredit += t["K2_Nominal"]
-                        
-                if debit > 0 or kredit > 0:
-                    saldo_berjalan += (debit - kredit)
-                        
-                    ledger_entries.append({
-                        "Waktu": t["Waktu"], "Deskripsi": t["Deskripsi"],
-                        "Debit": debit, "Kredit": kredit, "Saldo Akhir": saldo_berjalan,
-                        "Source_Sheet": t["Source_Sheet"],
-                        "Row_Index": t["Row_Index"],
-                        "Tipe_Entry": "Transaksi Normal", "SA_Detail_IDs": None
-                        })
-                    
-            df_raw = pd.DataFrame(ledger_entries)
-            df_raw['Sort_Key'] = df_raw.apply(get_sort_key_subledger, axis=1)
-            df_raw.sort_values(by=['Sort_Key', 'Waktu'], ascending=True, inplace=True)
-            df_raw.drop(columns=['Sort_Key'], inplace=True)
-            
-            if not df_raw.empty:
-                df_display, df_for_download, rows_to_delete_map, total_trx_to_delete = setup_data_editor_and_delete_logic(df_raw, f'ledger_editor_piutang_{selected_customer}', piutang_akun, is_subledger=True)
-                
-                add_download_button(df_for_download, f"Kartu_Piutang_{selected_customer}.xlsx", key_suffix=f"bb_piutang_{selected_customer}")
-                st.markdown("---")
+        subledgers = load_partner_subledgers(akun_type, period)
 
-                if st.button(f"🗑️ Hapus {total_trx_to_delete} Transaksi Terpilih dari Kartu Piutang", key=f'delete_bb_button_piutang', disabled=total_trx_to_delete == 0):
-                    deleted_count = execute_delete_transactions(rows_to_delete_map)
-                    if deleted_count > 0:
-                        st.success(f"{deleted_count} transaksi berhasil dihapus.")
-                        st.session_state.pop(f'ledger_editor_piutang_{selected_customer}', None)  
-                        st.rerun()
-                    else:
-                        st.warning("Tidak ada data yang dihapus.")
-            else:
-                st.info(f"Tidak ada mutasi yang tercatat untuk Customer {selected_customer}.")
+        if not subledgers["partners"]:
+            st.info(f"Tidak ada data {label} Kredit atau Saldo Awal {label} yang tercatat.")
             return
 
-    elif akun_type == 'BB_UTANG':
-        report_title = "💸 Kartu Utang Usaha (Per Supplier)"
-        st.title(report_title)
-        
-        utang_akun = "Utang usaha"
-        utang_transactions = [
-            t for t in transactions if 
-            (t["Source_Sheet"] != "Saldo_Awal" and t.get("Customer") and (utang_akun in [t["D1_Akun"], t["D2_Akun"], t["K1_Akun"], t["K2_Akun"]])) or
-            (t["Source_Sheet"] == "Saldo_Awal" and t.get("Customer") and t["K1_Akun"] == utang_akun)
-        ]
+        with st.expander(f"📅 Umur {label} per {mitra}", expanded=False):
+            aging = subledgers["aging"]
+            aging_display = aging.copy()
+            for col in AGING_BUCKETS + ["Total", "Saldo Akhir"]:
+                aging_display[col] = format_rupiah_series(aging_display[col])
+            st.dataframe(aging_display, hide_index=True, use_container_width=True)
+            add_download_button(aging, f"Umur_{label}.xlsx", label=f"⬇️ Unduh Umur {label} (.xlsx)", key_suffix=f"umur_{kunci}", report_params=(period,))
 
-        all_suppliers = {t["Customer"] for t in utang_transactions if t.get("Customer")}
+        selected_partner = st.selectbox(f"Pilih {mitra}", options=subledgers["partners"])
 
-        if not all_suppliers:
-            st.info("Tidak ada data Utang Kredit atau Saldo Awal Utang yang tercatat.")
-            return
+        if selected_partner:
+            st.subheader(f"Mutasi {label} untuk: {selected_partner}")
 
-        selected_supplier = st.selectbox("Pilih Supplier", options=sorted(list(all_suppliers)))
+            df_raw = subledgers["ledgers"].get(selected_partner)
 
-        if selected_supplier:
-            st.subheader(f"Mutasi Utang untuk: {selected_supplier}")
-            
-            saldo_awal_utang = 0.0
-            saldo_awal_data = [t for t in transactions if t["Source_Sheet"] == "Saldo_Awal" and t["K1_Akun"] == utang_akun and t.get("Customer") == selected_supplier]
-            if saldo_awal_data:
-                saldo_awal_utang = sum(t["K1_Nominal"] for t in saldo_awal_data)
+            if df_raw is not None and not df_raw.empty:
+                pager_key = f"pager_{kunci}_{selected_partner}"
+                state, page_size = render_pager_options(pager_key, period)
+                is_header = df_raw['Row_Index'] == -1
+                entries = df_raw[~is_header]
+                page = fetch_keyset_page(
+                    lambda key, direction, limit: slice_frame_page(entries, key, direction, limit),
+                    state["key"], state["direction"], page_size, id_column="Row_Index"
+                )
+                page_rows = page["rows"] if page["has_prev"] else pd.concat([df_raw[is_header], page["rows"]], ignore_index=True)
 
-            ledger_entries = []
-            
-            if abs(saldo_awal_utang) > 0.01:
-                sa_ids_string = ",".join([str(t["id"]) for t in saldo_awal_data])
-                ledger_entries.append({
-                    "Waktu": "Awal Periode",  "Deskripsi": "Saldo Awal",
-                    "Debit": 0.0,  "Kredit": saldo_awal_utang,
-                    "Saldo Akhir": saldo_awal_utang,
-                    "Source_Sheet": "Saldo_Awal", "Row_Index": -1,  
-                    "Tipe_Entry": "Saldo Awal Total", "SA_Detail_IDs": sa_ids_string
-                })
-            
-            saldo_berjalan = saldo_awal_utang
-            
-            for t in transactions:
-                if t["Source_Sheet"] == "Saldo_Awal": continue
-                
-                debit = 0.0
-                kredit = 0.0
-                
-                if t["Customer"] == selected_supplier:
-                    if t["Source_Sheet"] == "Pembelian" and t["K1_Akun"] == utang_akun:
-                        kredit = t["K1_Nominal"]
-                        
-                    elif t["Source_Sheet"] == "Lain-lain":
-                        if t["D1_Akun"] == utang_akun: debit += t["D1_Nominal"]
-                        if t["D2_Akun"] == utang_akun: debit += t["D2_Nominal"]
+                rows_to_delete_map, total_trx_to_delete = setup_data_editor_and_delete_logic(page_rows, get_pager_editor_key(f'ledger_editor_{kunci}_{selected_partner}', state, page_size), pager_key)
+                render_pager_navigation(pager_key, page)
 
-                if debit > 0 or kredit > 0:
-                    saldo_berjalan += (kredit - debit) 
-                        
-                    ledger_entries.append({
-                        "Waktu": t["Waktu"], "Deskripsi": t["Deskripsi"],
-                        "Debit": debit, "Kredit": kredit, "Saldo Akhir": saldo_berjalan,
-                        "Source_Sheet": t["Source_Sheet"],
-                        "Row_Index": t["Row_Index"],
-                        "Tipe_Entry": "Transaksi Normal", "SA_Detail_IDs": None
-                        })
-                    
-            df_raw = pd.DataFrame(ledger_entries)
-            df_raw['Sort_Key'] = df_raw.apply(get_sort_key_subledger, axis=1)
-            df_raw.sort_values(by=['Sort_Key', 'Waktu'], ascending=True, inplace=True)
-            df_raw.drop(columns=['Sort_Key'], inplace=True)
-            
-            if not df_raw.empty:
-                df_display, df_for_download, rows_to_delete_map, total_trx_to_delete = setup_data_editor_and_delete_logic(df_raw, f'ledger_editor_utang_{selected_supplier}', utang_akun, is_subledger=True)
-                
-                add_download_button(df_for_download, f"Kartu_Utang_{selected_supplier}.xlsx", key_suffix=f"bb_utang_{selected_supplier}")
+                add_download_button(df_raw[['Waktu', 'Deskripsi', 'Debit', 'Kredit', 'Saldo Akhir']], f"Kartu_{label}_{selected_partner}.xlsx", key_suffix=f"bb_{kunci}_{selected_partner}", report_params=(period,))
                 st.markdown("---")
-                
-                if st.button(f"🗑️ Hapus {total_trx_to_delete} Transaksi Terpilih dari Kartu Utang", key=f'delete_bb_button_utang', disabled=total_trx_to_delete == 0):
+
+                render_selection_summary(pager_key)
+                if st.button(f"🗑️ Hapus {total_trx_to_delete} Transaksi Terpilih dari Kartu {label}", key=f'delete_bb_button_{kunci}', disabled=total_trx_to_delete == 0):
                     deleted_count = execute_delete_transactions(rows_to_delete_map)
                     if deleted_count > 0:
                         st.success(f"{deleted_count} transaksi berhasil dihapus.")
-                        st.session_state.pop(f'ledger_editor_utang_{selected_supplier}', None)  
+                        st.session_state.pop(pager_key, None)
                         st.rerun()
                     else:
                         st.warning("Tidak ada data yang dihapus.")
             else:
-                st.info(f"Tidak ada mutasi yang tercatat untuk Supplier {selected_supplier}.")
+                st.info(f"Tidak ada mutasi yang tercatat untuk {mitra} {selected_partner}.")
             return
 
     elif akun_type == 'BB_UMUM':
         st.title("📖 Buku Besar Umum")
+
+        reports = get_report_engine()
+        add_download_button(
+            lambda: reports.general_ledger(period=period)[["Akun", "Waktu", "Deskripsi", "Debit", "Kredit", "Saldo Akhir"]],
+            "Buku_Besar_Semua_Akun.xlsx", label="⬇️ Unduh Buku Besar Semua Akun (.xlsx)", key_suffix="bb_semua_akun", report_params=(period,)
+        )
+
         accounts_to_show = GENERAL_LEDGER_ACCOUNTS
         selected_account = st.selectbox("Pilih Akun Buku Besar", options=accounts_to_show)
 
         if selected_account:
             st.subheader(f"Mutasi Akun: {selected_account}")
-            transactions = load_transactions_data(MAIN_SHEETS)  
-            ledger_entries_raw = get_ledger_data_for_display(selected_account, transactions)
+            pager_key = f"pager_bb_{selected_account}"
+            state, page_size = render_pager_options(pager_key, period)
+            header, opening = reports.ledger_header(selected_account, period)
+            if state["balance"] is None:
+                state["balance"] = opening if state["key"] is None else reports.ledger_balance_before(selected_account, state["key"][0], period)
+            page = reports.ledger_page(selected_account, period, state["key"], state["direction"], page_size, state["balance"])
+            df_raw = page["rows"] if page["has_prev"] else pd.concat([header, page["rows"]], ignore_index=True)
             
-            if not ledger_entries_raw:
-                st.info(f"Tidak ada mutasi yang tercatat untuk akun {selected_account}.")
+            if df_raw.empty and not page["has_prev"]:
+                if state["key"] is not None:
+                    st.info(f"Tidak ada mutasi akun {selected_account} pada atau setelah tanggal tersebut.")
+                else:
+                    st.info(f"Tidak ada mutasi yang tercatat untuk akun {selected_account}.")
                 return
 
-            df_raw = pd.DataFrame(ledger_entries_raw)
+            rows_to_delete_map, total_trx_to_delete = setup_data_editor_and_delete_logic(df_raw, get_pager_editor_key(f'ledger_editor_{selected_account}', state, page_size), pager_key)
+            render_pager_navigation(pager_key, page)
             
-            if not df_raw.empty:
+            add_download_button(
+                lambda: pd.DataFrame(reports.account_ledger(selected_account, period=period), columns=["Waktu", "Deskripsi", "Debit", "Kredit", "Saldo Akhir"]),
+                f"Buku_Besar_{selected_account}.xlsx", key_suffix=f"bb_{selected_account}", report_params=(period,)
+            )
+            st.markdown("---")
+
+            render_selection_summary(pager_key)
+            if st.button(f"🗑️ Hapus {total_trx_to_delete} Transaksi Terpilih dari Buku Besar", key=f'delete_bb_button_{selected_account}', disabled=total_trx_to_delete == 0):
                 
-                df_display, df_for_download, rows_to_delete_map, total_trx_to_delete = setup_data_editor_and_delete_logic(df_raw, f'ledger_editor_{selected_account}', selected_account, is_subledger=False)
+                deleted_count = execute_delete_transactions(rows_to_delete_map)
                 
-                add_download_button(df_for_download, f"Buku_Besar_{selected_account}.xlsx", key_suffix=f"bb_{selected_account}")
-                st.markdown("---")
-
-                if st.button(f"🗑️ Hapus {total_trx_to_delete} Transaksi Terpilih dari Buku Besar", key=f'delete_bb_button_{selected_account}', disabled=total_trx_to_delete == 0):
-                    
-                    deleted_count = execute_delete_transactions(rows_to_delete_map)
-                    
-                    if deleted_count > 0:
-                        st.success(f"{deleted_count} transaksi berhasil dihapus.")
-                        st.session_state.pop(f'ledger_editor_{selected_account}', None)  
-                        st.rerun()
-                    else:
-                        st.warning("Tidak ada data yang dihapus.")
-
-            else:
-                st.info(f"Tidak ada mutasi yang tercatat untuk akun {selected_account}.")
+                if deleted_count > 0:
+                    st.success(f"{deleted_count} transaksi berhasil dihapus.")
+                    st.session_state.pop(pager_key, None)
+                    st.rerun()
+                else:
+                    st.warning("Tidak ada data yang dihapus.")
     
     else:
         st.error("Tipe laporan tidak valid.")
 
+def format_rupiah_series(values):
+    return "Rp. " + values.map("{:,.0f}".format)
+
 def generate_detailed_inventory_card():
     st.title("📦 Kartu Stok Persediaan Detail (Moving Average)")
     
@@ -1225,84 +778,35 @@ def generate_detailed_inventory_card():
         st.error("Database user tidak ditemukan.")
         return
         
-    conn = get_db_connection(db_path)
     try:
-        query = f"SELECT * FROM {INVENTORY_TABLE_NAME} ORDER BY Waktu"
-        inventory_data_raw = pd.read_sql_query(query, conn)
+        inventory_data_raw = fetch_inventory_frame(db_path)
     except Exception as e:
         st.error(f"Gagal memuat data Inventory: {e}")
         return
-    finally:
-        conn.close()
-        
-    inventory_data_raw.rename(columns={'id': 'Row_Index'}, inplace=True)  
-        
+
+    inventory_data_raw.rename(columns={'id': 'Row_Index'}, inplace=True)
+
     if inventory_data_raw.empty:
         st.info("Tidak ada data transaksi inventory yang tercatat.")
         add_download_button(inventory_data_raw, "Kartu_Stok_Inventory.xlsx", key_suffix="inventory_empty")
         return
-        
-    df = inventory_data_raw.copy()
-    categories = df['Kategori'].unique()
-    
+
+    stock_cards = build_inventory_stock_cards(build_inventory_store(inventory_data_raw))
+
     all_rows_to_delete = []
-    
-    for category in categories:
+
+    for category, df_card in stock_cards.groupby("Kategori", sort=False):
         st.subheader(f"Kartu Stok: Persediaan Kambing {category}")
-        
-        df_cat = df[df['Kategori'] == category].copy()
-        
-        saldo_ekor = 0
-        saldo_total = 0.0
-        inventory_card = []
-        
-        for index, row in df_cat.iterrows():
-            waktu_str = str(row['Waktu']).split(' ')[0]  
-            
-            tipe = row['Tipe']
-            jumlah = safe_int_conversion(row['Jumlah'])
-            total = safe_float_conversion(row['Total'])
-            harga = safe_float_conversion(row['Harga'])  
-            row_index = row['Row_Index']  
-            
-            in_ekor, in_harga, in_total = 0, 0.0, 0.0
-            out_ekor, out_harga, out_total = 0, 0.0, 0.0
-            
-            if tipe == "Pembelian" or tipe == "SALDO AWAL":
-                in_ekor = jumlah
-                in_harga = harga
-                in_total = total
-                
-                saldo_ekor += in_ekor
-                saldo_total += in_total
-                
-            elif tipe == "Penjualan":
-                out_ekor = jumlah
-                out_harga = harga
-                out_total = total
-                
-                saldo_ekor -= out_ekor
-                saldo_total -= out_total
 
-            saldo_harga = saldo_total / saldo_ekor if saldo_ekor > 0 else 0.0
-                
-            inventory_card.append({
-                "Tanggal": waktu_str, "Tipe": tipe,
-                "IN Ekor": in_ekor, "IN Harga": in_harga, "IN Total": in_total,
-                "OUT Ekor": out_ekor, "OUT Harga": out_harga, "OUT Total": out_total,
-                "SALDO Ekor": saldo_ekor, "SALDO Harga Rata2": saldo_harga, "SALDO Total": saldo_total,
-                "Row_Index": row_index
-            })
-        
-        df_card = pd.DataFrame(inventory_card)
-        
+        df_card = df_card.drop(columns=["Kategori"]).reset_index(drop=True)
+
         cols_to_format = ["IN Harga", "IN Total", "OUT Harga", "OUT Total", "SALDO Harga Rata2", "SALDO Total"]
-        
+
         df_for_download = df_card.drop(columns=['Row_Index'])
-        
+
         df_display = df_card.copy()
         for col in cols_to_format:
-            df_display[col] = df_display[col].apply(lambda x: f"Rp. {x:,.0f}")
+            df_display[col] = format_rupiah_series(df_display[col])
 
         display_cols = [
             "Tanggal", "Tipe",
@@ -1312,7 +816,7 @@ def generate_detailed_inventory_card():
             "Row_Index"
         ]
         df_display = df_display[display_cols].copy()
-        
+
         df_display.columns = [
             "Tanggal", "Tipe",
             "IN (ekor)", "IN (harga)", "IN (total)",
@@ -1320,7 +824,7 @@ def generate_detailed_inventory_card():
             "Balance (ekor)", "Balance (harga rata-rata)", "Balance (total)",
             "Row_Index"
         ]
-        
+
         is_saldo_awal_inv = (df_display['Tipe'] == 'SALDO AWAL')
         
         df_display_for_delete = df_display[['Row_Index']].copy()
@@ -1331,7 +835,7 @@ def generate_detailed_inventory_card():
         disabled_indices_list = is_saldo_awal_inv[is_saldo_awal_inv].index.tolist()
         disabled_status = [i in disabled_indices_list for i in df_display.index]
         
-        edited_df_inv = st.data_editor(
+        edited_df_inv = render_data_editor(
             df_display,  
             column_config={"Pilih": st.column_config.CheckboxColumn(default=False)},
             disabled=disabled_status if len(disabled_status) == len(df_display) else None,
@@ -1369,23 +873,31 @@ def generate_detailed_inventory_card():
         else:
             st.warning("Tidak ada data Inventory yang dihapus.")
 
-def setup_data_editor_and_delete_logic(df_raw, editor_key, account_name, is_subledger=False):
-    df_display = df_raw.copy()
-    
-    is_saldo_awal_total = (df_display['Row_Index'] == -1)
+def get_ledger_row_items(row_index, source_sheet, sa_detail_ids):
+    if row_index == -1:
+        return [("Saldo_Awal", int(id_str)) for id_str in (sa_detail_ids or "").split(',') if id_str.strip()]
+    if row_index > 0:
+        return [(source_sheet, int(row_index))]
+    return []
+
+def setup_data_editor_and_delete_logic(df_raw, editor_key, pager_key):
+    state = st.session_state[pager_key]
+    df_display = df_raw.reset_index(drop=True)
+    row_items = [get_ledger_row_items(*row) for row in df_display[['Row_Index', 'Source_Sheet', 'SA_Detail_IDs']].itertuples(index=False)]
+    base = get_selection_base(state, editor_key)
     
     df_display_show = df_display[['Waktu', 'Deskripsi', 'Debit', 'Kredit', 'Saldo Akhir']].copy()
-    df_for_download = df_display_show.copy()
     
     for col in ['Debit', 'Kredit', 'Saldo Akhir']:
-        df_display_show[col] = df_display_show[col].apply(lambda x: f"Rp. {x:,.0f}" if abs(x) > 0.01 else "")
+        df_display_show[col] = df_display_show[col].apply(lambda x: f"Rp. {x:,.0f}" if x != 0 else "")
 
-    df_display_show.insert(0, 'Pilih', False)
+    df_display_show.insert(0, 'Pilih', get_selection_column(row_items, base, df_display_show.index))
     
+    is_saldo_awal_total = (df_display['Row_Index'] == -1)
     disabled_indices_list = is_saldo_awal_total[is_saldo_awal_total].index.tolist()
     disabled_status = [i in disabled_indices_list for i in df_display_show.index]
 
-    edited_df = st.data_editor(
+    edited_df = render_data_editor(
         df_display_show,  
         column_order=["Pilih", "Waktu", "Deskripsi", "Debit", "Kredit", "Saldo Akhir"],
         column_config={
@@ -1401,69 +913,19 @@ def setup_data_editor_and_delete_logic(df_raw, editor_key, account_name, is_subl
         use_container_width=True,
         key=editor_key
     )
-    
-    selected_indices = edited_df[edited_df['Pilih']].index.tolist()
-    
-    rows_to_delete_map = {}
-    total_trx_to_delete = 0
-
-    for display_index in selected_indices:
-        row_data = df_raw.iloc[display_index]
-        
-        if row_data['Row_Index'] == -1:
-            sa_ids_to_delete = [int(id_str) for id_str in row_data['SA_Detail_IDs'].split(',') if id_str.strip()]
-            
-            if sa_ids_to_delete:
-                if 'Saldo_Awal' not in rows_to_delete_map:
-                    rows_to_delete_map['Saldo_Awal'] = []
-                
-                for id_sa in sa_ids_to_delete:
-                    if id_sa not in rows_to_delete_map['Saldo_Awal']:
-                        rows_to_delete_map['Saldo_Awal'].append(id_sa)
-                        total_trx_to_delete += 1
-            
-        elif row_data['Row_Index'] > 0: 
-            sheet_name = row_data['Source_Sheet']
-            row_id = int(row_data['Row_Index'])
-            
-            if sheet_name not in rows_to_delete_map:
-                rows_to_delete_map[sheet_name] = []
-            rows_to_delete_map[sheet_name].append(row_id)
-            total_trx_to_delete += 1
+    apply_grid_selection(state, row_items, base, df_display_show['Pilih'], edited_df['Pilih'])
 
-    return edited_df, df_for_download, rows_to_delete_map, total_trx_to_delete
+    return get_rows_to_delete_map(state["selected"]), len(state["selected"])
 
 def execute_delete_transactions(rows_to_delete_map):
-    deleted_count = 0
-    
-    for sheet_name, row_ids in rows_to_delete_map.items():
-        
-        if sheet_name in ["Penjualan", "Pembelian"]:
-            db_path = st.session_state.get('db_path')
-            conn = get_db_connection(db_path)
-            c = conn.cursor()
-            
-            placeholders = ', '.join(['?' for _ in row_ids])
-            c.execute(f"SELECT Waktu FROM {TABLE_NAME} WHERE id IN ({placeholders})", row_ids)
-            times_to_delete = {row['Waktu'] for row in c.fetchall()}
-            conn.close()
-            
-            conn_inv = get_db_connection(db_path)
-            df_inv = pd.read_sql_query(f"SELECT id, Waktu FROM {INVENTORY_TABLE_NAME}", conn_inv)
-            rows_inv_to_delete = df_inv[df_inv['Waktu'].isin(times_to_delete)]['id'].tolist()
-            conn_inv.close()
-            
-            if rows_inv_to_delete:
-                delete_rows_from_sheet("Inventory_Data", rows_inv_to_delete)
-                st.info(f"Data Inventory terkait berhasil dihapus ({len(rows_inv_to_delete)} baris).")
-                
-            deleted_from_sheet = delete_rows_from_sheet(sheet_name, row_ids)
-            deleted_count += deleted_from_sheet
-        
-        else: 
-            deleted_from_sheet = delete_rows_from_sheet(sheet_name, row_ids)
-            deleted_count += deleted_from_sheet
-            
+    try:
+        deleted_count, deleted_inventory_count = get_posting_engine().delete_transactions(rows_to_delete_map)
+    except Exception as e:
+        st.error(str(e))
+        return 0
+
+    if deleted_inventory_count:
+        st.info(f"Data Inventory terkait berhasil dihapus ({deleted_inventory_count} baris).")
     return deleted_count
 
 def get_auth_page_styles(bg_base64, fallback_bg_color, input_bg_color, dark_header, text_color, button_color):
@@ -1555,6 +1017,7 @@ def login_page():
             conn_master.close()
 
             if user_data and user_data['password_hash'] == hashed_input:
+                setup_user_database(user_data['db_path'])
                 st.session_state['logged_in'] = True
                 st.session_state['username'] = username
                 st.session_state['db_path'] = user_data['db_path']  
@@ -1568,6 +1031,19 @@ def login_page():
         st.session_state['page'] = 'register'
         st.rerun()
 
+def render_trend_chart(col, trends, column, title, mark="line", is_money=True):
+    base = alt.Chart(trends, title=title)
+    chart = base.mark_bar() if mark == "bar" else base.mark_line(interpolate="step-after")
+    chart = chart.encode(
+        x=alt.X("Tanggal:T", title=None),
+        y=alt.Y(f"{column}:Q", title="Rp" if is_money else "Ekor", axis=alt.Axis(format="~s")),
+        tooltip=[alt.Tooltip("Tanggal:T", format="%d %b %Y"), alt.Tooltip(f"{column}:Q", format=",.0f")],
+    )
+    if mark == "bar":
+        chart = chart.encode(color=alt.condition(alt.datum[column] >= 0, alt.value("#28a745"), alt.value("#dc3545")))
+    with col:
+        st.altair_chart(chart.properties(height=260), use_container_width=True)
+
 def render_metric_card(col, title, value, unit="", is_money=True):
     value = float(value)
     if is_money:
@@ -1695,6 +1171,20 @@ def dashboard_page():
     
     st.markdown("<br>", unsafe_allow_html=True)
     st.markdown("---")
+
+    st.subheader("📈 Tren Harian")
+    trend_period = period_selector("dashboard_tren")
+    trends = load_daily_trends(trend_period)
+    if trends.empty:
+        st.info("Belum ada transaksi untuk ditampilkan pada grafik tren.")
+    else:
+        col_tren1, col_tren2 = st.columns(2)
+        render_trend_chart(col_tren1, trends, "Saldo Kas", "Saldo Kas")
+        render_trend_chart(col_tren2, trends, "Penjualan", "Penjualan Harian", mark="bar")
+        col_tren3, col_tren4 = st.columns(2)
+        render_trend_chart(col_tren3, trends, "Laba Kotor", "Laba Kotor Harian (Penjualan - HPP)", mark="bar")
+        render_trend_chart(col_tren4, trends, "Jumlah Ternak", "Jumlah Ternak", is_money=False)
+    st.markdown("---")
     
     st.markdown('<div style="text-align: center; margin-top: 10px;">', unsafe_allow_html=True)
     if 'transaction_type' not in st.session_state:
@@ -1787,8 +1277,8 @@ def dashboard_page():
                             None, None,
                             nominal 
                         ]
-                        append_row_to_sheet("Saldo_Awal", jurnal_row)
-                        st.success(f"Saldo Awal {jenis_saldo} untuk '{final_customer}' berhasil disimpan! Nominal: Rp. {nominal:,.0f}.")
+                        append_rows_to_sheet([("Saldo_Awal", jurnal_row)])
+                        st.success(f"Saldo Awal {jenis_saldo} untuk'{final_customer}' berhasil disimpan! Nominal: Rp. {nominal:,.0f}.")
                         st.session_state['show_form'] = False
                         st.rerun()
                     except Exception as e:
@@ -1822,12 +1312,10 @@ def dashboard_page():
                         return
                         
                     try:
-                        waktu_format_db = str(tanggal_input) 
-                        
-                        append_row_to_sheet("Inventory_Data",  
-                            [waktu_format_db, "SALDO AWAL", kategori_bb, harga_satuan, jumlah, total_nominal]
-                        )
-                        
+                        waktu_format_db = str(tanggal_input)
+
+                        inventory_row = [waktu_format_db, "SALDO AWAL", kategori_bb, harga_satuan, jumlah, total_nominal]
+
                         jurnal_row = [
                             waktu_format_db, deskripsi, "SALDO AWAL INVENTORY",
                             kategori_akun, total_nominal, None, None,
@@ -1837,9 +1325,9 @@ def dashboard_page():
                             jumlah,
                             total_nominal  
                         ]
-                        append_row_to_sheet("Saldo_Awal", jurnal_row)
-                        
-                        st.success(f"Saldo Awal Inventory '{kategori_akun}' berhasil disimpan! Total: Rp. {total_nominal:,.0f}.")
+                        append_rows_to_sheet([("Inventory_Data", inventory_row), ("Saldo_Awal", jurnal_row)])
+
+                        st.success(f"Saldo Awal Inventory'{kategori_akun}' berhasil disimpan! Total: Rp. {total_nominal:,.0f}.")
                         st.session_state['show_form'] = False
                         st.rerun()
                     except Exception as e:
@@ -1907,9 +1395,9 @@ def dashboard_page():
                             None, None,
                             total_nominal
                         ]
-                        append_row_to_sheet("Saldo_Awal", jurnal_row)
-                        
-                        st.success(f"{st_msg} berhasil disimpan! Nominal: Rp. {total_nominal:,.0f}")
+                        append_rows_to_sheet([("Saldo_Awal", jurnal_row)])
+
+                        st.success(f"{st_msg} berhasil disimpan!Nominal: Rp. {total_nominal:,.0f}")
                             
                         st.session_state['show_form'] = False
                         st.rerun()
@@ -1962,18 +1450,7 @@ def dashboard_page():
                     customer_to_save = final_customer if final_customer != "(Pilih/Input Baru)" and final_customer else None
                     
                     try:
-                        waktu_format_db = str(tanggal_input) 
-                        jurnal_row = [
-                            waktu_format_db, deskripsi, "Jurnal Umum",
-                            d1_akun, total_nominal, None, None,
-                            k1_akun, total_nominal, None, None,
-                            customer_to_save, None,
-                            harga_satuan,  
-                            jumlah_satuan,
-                            total_nominal
-                        ]
-                        
-                        append_row_to_sheet("Lain-lain", jurnal_row)
+                        append_rows_to_sheet(build_general_journal_rows(tanggal_input, deskripsi, d1_akun, k1_akun, harga_satuan, jumlah_satuan, customer_to_save))
                         
                         st.success(f"Transaksi Jurnal Umum '{deskripsi}' berhasil disimpan! Total: Rp. {total_nominal:,.0f}")
                         st.session_state['show_form'] = False
@@ -2007,26 +1484,8 @@ def dashboard_page():
                 submitted = st.form_submit_button("SIMPAN TRANSAKSI PEMBELIAN")
 
                 if submitted:
-                    if total_nominal <= 0 or jumlah <= 0: st.error("Harga Satuan Beli dan Jumlah Ekor harus > 0."); return
-                    if metode == "Kredit" and not customer: st.error("Pembelian Kredit WAJIB mengisi Supplier."); return
-                    
                     try:
-                        waktu_format_db = str(tanggal_input) 
-                        d1_akun_auto = kategori_akun
-                        k1_akun_auto = "Kas" if metode == "Tunai" else "Utang usaha"
-                        
-                        jurnal_row = [
-                            waktu_format_db, deskripsi, metode,
-                            d1_akun_auto, total_nominal, None, None,
-                            k1_akun_auto, total_nominal, None, None,
-                            customer, kategori_bb,
-                            harga_satuan,  
-                            jumlah,  
-                            total_nominal
-                        ]
-                        append_row_to_sheet("Pembelian", jurnal_row)
-                        
-                        append_row_to_sheet("Inventory_Data", [jurnal_row[0], "Pembelian", kategori_bb, harga_satuan, jumlah, total_nominal])
+                        get_posting_engine().post_purchase(tanggal_input, deskripsi, metode, customer, kategori_akun, harga_satuan, jumlah)
                         
                         st.success(f"Transaksi Pembelian '{deskripsi}' berhasil disimpan! Total: Rp. {total_nominal:,.0f}")
                         st.session_state['show_form'] = False
@@ -2054,7 +1513,8 @@ def dashboard_page():
             
             kategori_akun = st.session_state['jual_kategori_akun']
             kategori_bb = kategori_akun.replace('Persediaan kambing ', '').title()  
-            saldo_ekor_last, avg_cost_last = get_last_average_cost(kategori_bb)
+            saldo_ekor_last, saldo_total_last = get_inventory_balance(kategori_bb)
+            avg_cost_last = get_moving_average_hpp(saldo_ekor_last, saldo_total_last, 1)
 
             with st.form(key="form_penjualan"):
                 
@@ -2078,8 +1538,8 @@ def dashboard_page():
                     st.metric(label="HPP Otomatis/Unit", value=f"Rp. {avg_cost_last:,.0f}")
                     st.caption(f"Saldo Ekor: {saldo_ekor_last:,.0f}")
                 
-                total_penjualan_bruto = harga_satuan_jual * jumlah
-                total_hpp_calc = avg_cost_last * jumlah  
+                total_penjualan_bruto = to_rupiah(harga_satuan_jual * jumlah)
+                total_hpp_calc = get_moving_average_hpp(saldo_ekor_last, saldo_total_last, jumlah)
 
                 st.metric(label="Total Penjualan Bruto", value=f"Rp. {total_penjualan_bruto:,.0f}")
                 st.metric(label="Total HPP Otomatis", value=f"Rp. {total_hpp_calc:,.0f}")
@@ -2087,40 +1547,8 @@ def dashboard_page():
                 submitted = st.form_submit_button("SIMPAN TRANSAKSI PENJUALan")
 
                 if submitted:
-                    if total_penjualan_bruto <= 0 or jumlah <= 0:  
-                        st.error("Harga Satuan Jual dan Jumlah Ekor harus lebih besar dari 0.")
-                        return
-                    
-                    if metode == "Kredit" and not customer:  
-                        st.error("Penjualan Kredit WAJIB mengisi Customer.")
-                        return
-                        
-                    if saldo_ekor_last < jumlah:  
-                        st.error(f"Ekor Penjualan ({jumlah:,.0f}) melebihi Saldo Ekor ({saldo_ekor_last:,.0f}). Transaksi Dibatalkan.")
-                        return
-                    
                     try:
-                        waktu_format_db = str(tanggal_input) 
-                        
-                        d1_akun_jual = "Piutang usaha" if metode == "Kredit" else "Kas"  
-                        k1_akun_jual = "Penjualan"
-                        d1_nominal_jual = total_penjualan_bruto
-                        k1_nominal_jual = total_penjualan_bruto
-                        d2_akun_hpp = "HPP"
-                        k2_akun_hpp = kategori_akun
-
-                        jurnal_row = [
-                            waktu_format_db, deskripsi, metode,
-                            d1_akun_jual, d1_nominal_jual, d2_akun_hpp, total_hpp_calc,
-                            k1_akun_jual, k1_nominal_jual, k2_akun_hpp, total_hpp_calc,
-                            customer, kategori_bb,
-                            harga_satuan_jual,  
-                            jumlah,  
-                            total_penjualan_bruto
-                        ]
-                        append_row_to_sheet("Penjualan", jurnal_row)
-                        
-                        append_row_to_sheet("Inventory_Data", [jurnal_row[0], "Penjualan", kategori_bb, avg_cost_last, jumlah, total_hpp_calc])
+                        get_posting_engine().post_sale(tanggal_input, deskripsi, metode, customer, kategori_akun, harga_satuan_jual, jumlah)
                         
                         st.success(f"Transaksi Penjualan '{deskripsi}' berhasil disimpan! Total Jual: Rp. {total_penjualan_bruto:,.0f}. HPP: Rp. {total_hpp_calc:,.0f}")
                         st.session_state['show_form'] = False
@@ -2139,6 +1567,7 @@ def dashboard_page():
         ("🛒 Jurnal Beli", 'jurnal_pembelian'), 
         ("💰 Jurnal Jual", 'jurnal_penjualan'),
         ("📖 Buku Besar (Umum)", 'buku_besar'),
+        ("📥 Impor Transaksi", 'impor_transaksi'),
     ]
     cols_nav_jurnal = st.columns(len(nav_items_jurnal_bb))
     for i, (icon_text, page_key) in enumerate(nav_items_jurnal_bb):
@@ -2169,6 +1598,8 @@ def dashboard_page():
         ("🧾 Neraca Saldo", 'neraca_saldo'),  
         ("📈 Laba Rugi", 'laba_rugi'),  
         ("📊 Lap. Pos. Keuangan", 'posisi_keuangan'),
+        ("🔒 Tutup Buku", 'tutup_buku'),
+        ("💾 Cadangan Data", 'cadangan_data'),
     ]
     cols_nav_laporan = st.columns(len(nav_items_laporan))
     for i, (icon_text, page_key) in enumerate(nav_items_laporan):
@@ -2178,19 +1609,55 @@ def dashboard_page():
                 st.rerun()
 
 
-def main():
-    
-    if 'logged_in' not in st.session_state: st.session_state['logged_in'] = False
-    if 'page' not in st.session_state: st.session_state['page'] = 'login'  
-    if 'show_form' not in st.session_state: st.session_state['show_form'] = False
-    if 'laba_rugi_cache' not in st.session_state: st.session_state['laba_rugi_cache'] = 0.0
-    if 'db_path' not in st.session_state: st.session_state['db_path'] = None  
-    
-    global INVENTORY_ACCOUNT_CHOICES 
-    INVENTORY_ACCOUNT_CHOICES = ["Persediaan kambing jantan", "Persediaan kambing betina"]
-    if 'jual_kategori_akun' not in st.session_state:
-        st.session_state['jual_kategori_akun'] = INVENTORY_ACCOUNT_CHOICES[0]
-
+def can_toggle_profiling():
+    return st.session_state.get('logged_in') and st.session_state.get('username') in get_profiling_admins()
+
+def is_profiling_active():
+    return is_profiling_enabled_by_env() or (can_toggle_profiling() and st.session_state.get('profiling_enabled', False))
+
+def render_profiling_toggle():
+    if can_toggle_profiling() and not is_profiling_enabled_by_env():
+        st.sidebar.toggle("🩺 Profiling per rerun", key="profiling_enabled", help="Hitung query SQL dan waktu fungsi laporan pada setiap rerun.")
+
+def record_profile_history(profile):
+    history = st.session_state.setdefault('profiling_history', [])
+    history.insert(0, {
+        "Mulai": profile["started_at"], "Halaman": profile["label"], "Total (ms)": round(profile["wall_s"] * 1000, 1),
+        "SQL (ms)": round(profile["sql_s"] * 1000, 1), "Query": profile["query_count"], "Peringatan": len(profile["flags"])
+    })
+    del history[PROFILING_HISTORY_LENGTH:]
+
+def render_profiling_panel(profile):
+    with st.sidebar.expander("🩺 Profiling rerun ini", expanded=False):
+        col_total, col_sql, col_other = st.columns(3)
+        col_total.metric("Total", f"{profile['wall_s'] * 1000:,.0f} ms")
+        col_sql.metric("SQLite", f"{profile['sql_s'] * 1000:,.0f} ms")
+        col_other.metric("Lainnya", f"{profile['other_s'] * 1000:,.0f} ms")
+        st.caption(f"{profile['query_count']} query · cache hit {profile['cache_hits']} / miss {profile['cache_misses']}")
+
+        for flag in profile["flags"]:
+            st.warning(flag)
+
+        if profile["sections"]:
+            st.markdown("**Fungsi (waktu inklusif)**")
+            st.dataframe(pd.DataFrame(profile["sections"]).assign(
+                ms=lambda df: (df["elapsed_s"] * 1000).round(1)
+            )[["name", "calls", "ms"]].rename(columns={"name": "Fungsi", "calls": "Panggilan"}), hide_index=True, use_container_width=True)
+
+        if profile["queries"]:
+            st.markdown("**Query SQL**")
+            st.dataframe(pd.DataFrame(profile["queries"]).assign(
+                ms=lambda df: (df["elapsed_s"] * 1000).round(1)
+            )[["sql", "calls", "distinct_params", "rows", "ms"]].rename(columns={
+                "sql": "SQL", "calls": "Panggilan", "distinct_params": "Parameter Unik", "rows": "Baris"
+            }), hide_index=True, use_container_width=True)
+
+        history = st.session_state.get('profiling_history', [])
+        if len(history) > 1:
+            st.markdown("**Rerun sebelumnya**")
+            st.dataframe(pd.DataFrame(history[1:]), hide_index=True, use_container_width=True)
+
+def route_page():
     if not st.session_state['logged_in']:
         if st.session_state['page'] == 'register':
             register_page()  
@@ -2224,14 +1691,49 @@ def main():
             st.session_state['laba_rugi_cache'] = laba_rugi_result
         elif st.session_state['page'] == 'neraca' or st.session_state['page'] == 'posisi_keuangan':
             generate_balance_sheet("📊 Laporan Posisi Keuangan")
+        elif st.session_state['page'] == 'tutup_buku':
+            generate_period_closing_page()
+        elif st.session_state['page'] == 'impor_transaksi':
+            generate_import_page()
+        elif st.session_state['page'] == 'cadangan_data':
+            generate_raw_backup_page()
         elif st.session_state['page'] == 'saldo_awal':
              st.session_state['show_form'] = True
              st.session_state['selected_transaction_category'] = "Saldo_Awal"
              st.session_state['page'] = 'dashboard'
              st.rerun()
 
+def main():
+    
+    if 'logged_in' not in st.session_state: st.session_state['logged_in'] = False
+    if 'page' not in st.session_state: st.session_state['page'] = 'login'  
+    if 'show_form' not in st.session_state: st.session_state['show_form'] = False
+    if 'laba_rugi_cache' not in st.session_state: st.session_state['laba_rugi_cache'] = 0.0
+    if 'db_path' not in st.session_state: st.session_state['db_path'] = None  
+    
+    global INVENTORY_ACCOUNT_CHOICES 
+    INVENTORY_ACCOUNT_CHOICES = ["Persediaan kambing jantan", "Persediaan kambing betina"]
+    if 'jual_kategori_akun' not in st.session_state:
+        st.session_state['jual_kategori_akun'] = INVENTORY_ACCOUNT_CHOICES[0]
+
+    render_profiling_toggle()
+    if not is_profiling_active():
+        route_page()
+        return
+
+    start_profile(st.session_state['page'])
+    try:
+        route_page()
+    finally:
+        profile = finish_profile(os.environ.get(PROFILING_LOG_ENV_VAR))
+        record_profile_history(profile)
+    render_profiling_panel(profile)
+
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in CLI_COMMANDS:
+        sys.exit(CLI_COMMANDS[sys.argv[1]](sys.argv[2:]))
+
     st.set_page_config(layout="wide", page_title="SJF Digital Accounting")
     setup_master_database()
 
@@ -0,0 +1,3215 @@
+import os
+import re
+import sys
+import json
+import math
+import time
+import atexit
+import logging
+import argparse
+import sqlite3
+import threading
+import hashlib
+import functools
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date, datetime
+import pandas as pd
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MASTER_DB = "accounts.db"
+TABLE_NAME = "jurnal"
+INVENTORY_TABLE_NAME = "inventory"
+JOURNAL_LINES_TABLE_NAME = "journal_lines"
+ACCOUNT_BALANCES_TABLE_NAME = "account_balances"
+INVENTORY_STATE_TABLE_NAME = "inventory_state"
+PERIOD_CLOSINGS_TABLE_NAME = "period_closings"
+CLOSING_ACCOUNT_BALANCES_TABLE_NAME = "closing_account_balances"
+CLOSING_INVENTORY_STATE_TABLE_NAME = "closing_inventory_state"
+DAILY_ROLLUP_TABLE_NAME = "daily_rollup"
+DAILY_INVENTORY_ROLLUP_TABLE_NAME = "daily_inventory_rollup"
+
+AKUN_ASET = [
+    "Kas", "Piutang usaha", "Persediaan kambing jantan", "Persediaan kambing betina",
+    "Aset biologis - kambing kecil", "Persediaan pakan", "Persediaan obat & vitamin",
+    "Bangunan kandang", "Kendaraan"
+]
+AKUN_KEWAJIBAN = [ "Utang usaha", "Utang lain-lain" ]
+AKUN_EKUITAS = [ "Modal", "Prive" ]
+AKUN_PENDAPATAN = [ "Penjualan", "Pendapatan lain-lain" ]
+AKUN_BEBAN = [
+    "HPP", "Beban gaji", "Beban reparasi kandang", "Beban listrik & air",
+    "Beban pakan ternak", "Beban obat & vitamin", "Beban penyusutan"
+]
+AKUN_KONTRA = [ "Akumulasi penyusutan" ]
+AKUN_SALDO_NORMAL_KREDIT = AKUN_KEWAJIBAN + AKUN_PENDAPATAN + ["Modal"] + AKUN_KONTRA
+
+DEBIT_CHOICES = AKUN_ASET + AKUN_KEWAJIBAN + AKUN_EKUITAS + AKUN_PENDAPATAN + AKUN_BEBAN + AKUN_KONTRA
+GENERAL_LEDGER_ACCOUNTS = DEBIT_CHOICES
+INVENTORY_ACCOUNT_CHOICES = ["Persediaan kambing jantan", "Persediaan kambing betina"]
+MAIN_SHEETS = ["Penjualan", "Pembelian", "Lain-lain", "Inventory_Data", "Saldo_Awal"]
+NON_SA_SHEETS = ["Penjualan", "Pembelian", "Lain-lain"]
+JOURNAL_LEGS = [
+    ("D1_Akun", "D1_Nominal", "Debit"), ("D2_Akun", "D2_Nominal", "Debit"),
+    ("K1_Akun", "K1_Nominal", "Kredit"), ("K2_Akun", "K2_Nominal", "Kredit")
+]
+JOURNAL_SIDE_CODES = {"Debit": "D", "Kredit": "K"}
+INVENTORY_TYPES = ["SALDO AWAL", "Pembelian", "Penjualan"]
+TREND_ACCOUNTS = ["Kas", "Penjualan", "HPP"]
+TRANSACTIONS_CACHE_MAX_ENTRIES = 32
+EXCEL_CACHE_MAX_BYTES = 16 * 1024 * 1024
+DB_POOL_MAX_IDLE_PER_DATABASE = 4
+DB_POOL_MAX_DATABASES = 64
+SQLITE_PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA temp_store=MEMORY",
+]
+PROFILING_ENV_VAR = "SJF_PROFILE"
+PROFILING_LOG_ENV_VAR = "SJF_PROFILE_LOG"
+PROFILING_ADMINS_ENV_VAR = "SJF_PROFILE_ADMINS"
+PROFILING_N_PLUS_ONE_THRESHOLD = 5
+PROFILING_SQL_PREVIEW_CHARS = 160
+
+def hash_password(password):
+    return hashlib.sha224(password.encode()).hexdigest()
+
+class PooledConnection(sqlite3.Connection):
+    db_path = None
+    in_pool = False
+
+    def close(self):
+        release_db_connection(self)
+
+    def cursor(self, factory=None):
+        if factory is None:
+            factory = ProfiledCursor if get_active_profile() is not None else sqlite3.Cursor
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        if get_active_profile() is None:
+            return super().execute(sql, parameters)
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        if get_active_profile() is None:
+            return super().executemany(sql, seq_of_parameters)
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        if get_active_profile() is None:
+            return super().executescript(sql_script)
+        return self.cursor().executescript(sql_script)
+
+class ProfiledCursor(sqlite3.Cursor):
+    query = None
+
+    def timed(self, method, *args):
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            if self.query is not None:
+                self.query["elapsed_s"] += time.perf_counter() - start
+
+    def execute(self, sql, parameters=()):
+        self.query = record_profile_query(sql, parameters)
+        return self.timed(super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        seq_of_parameters = list(seq_of_parameters)
+        self.query = record_profile_query(sql, (f"<{len(seq_of_parameters)} baris>",))
+        return self.timed(super().executemany, sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        self.query = record_profile_query(sql_script, ())
+        return self.timed(super().executescript, sql_script)
+
+    def fetchone(self):
+        row = self.timed(super().fetchone)
+        if row is not None and self.query is not None:
+            self.query["rows"] += 1
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self.timed(super().fetchmany, self.arraysize if size is None else size)
+        if self.query is not None:
+            self.query["rows"] += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self.timed(super().fetchall)
+        if self.query is not None:
+            self.query["rows"] += len(rows)
+        return rows
+
+def get_connection_pool():
+    return CONNECTION_POOL
+
+def open_db_connection(db_path):
+    conn = sqlite3.connect(db_path, factory=PooledConnection, check_same_thread=False, timeout=30)
+    conn.db_path = db_path
+    for pragma in SQLITE_PRAGMAS:
+        try:
+            conn.execute(pragma)
+        except sqlite3.Error:
+            pass
+    return conn
+
+def close_db_connection(conn):
+    try:
+        sqlite3.Connection.close(conn)
+    except sqlite3.Error:
+        pass
+
+def is_db_connection_healthy(conn):
+    try:
+        sqlite3.Connection.execute(conn, "SELECT 1").fetchone()
+        return not conn.in_transaction
+    except sqlite3.Error:
+        return False
+
+def acquire_db_connection(db_path):
+    pool = get_connection_pool()
+    while True:
+        conn = None
+        with pool["lock"]:
+            idle = pool["idle"].get(db_path)
+            if idle:
+                conn = idle.pop()
+                conn.in_pool = False
+                pool["idle"].move_to_end(db_path)
+
+        if conn is None:
+            conn = open_db_connection(db_path)
+            break
+        if is_db_connection_healthy(conn):
+            break
+        close_db_connection(conn)
+
+    conn.row_factory = sqlite3.Row
+    return conn
+
+def release_db_connection(conn):
+    if conn.in_pool:
+        return
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+    except sqlite3.Error:
+        close_db_connection(conn)
+        return
+
+    pool = get_connection_pool()
+    evicted = []
+    with pool["lock"]:
+        idle = pool["idle"].setdefault(conn.db_path, [])
+        pool["idle"].move_to_end(conn.db_path)
+        if len(idle) < DB_POOL_MAX_IDLE_PER_DATABASE:
+            conn.in_pool = True
+            idle.append(conn)
+        else:
+            evicted.append(conn)
+        while len(pool["idle"]) > DB_POOL_MAX_DATABASES:
+            evicted.extend(pool["idle"].popitem(last=False)[1])
+
+    for idle_conn in evicted:
+        close_db_connection(idle_conn)
+
+def close_all_db_connections(pool=None, db_path=None):
+    pool = pool or get_connection_pool()
+    with pool["lock"]:
+        if db_path is None:
+            to_close = [conn for conns in pool["idle"].values() for conn in conns]
+            pool["idle"].clear()
+        else:
+            to_close = pool["idle"].pop(db_path, [])
+
+    for conn in to_close:
+        close_db_connection(conn)
+
+CONNECTION_POOL = {"lock": threading.Lock(), "idle": OrderedDict()}
+atexit.register(close_all_db_connections, CONNECTION_POOL)
+
+PROFILING = {"local": threading.local(), "log_lock": threading.Lock()}
+
+def is_profiling_enabled_by_env():
+    return os.environ.get(PROFILING_ENV_VAR, "").strip().lower() in ("1", "true", "yes", "on")
+
+def get_profiling_admins():
+    return {name.strip() for name in os.environ.get(PROFILING_ADMINS_ENV_VAR, "").split(",") if name.strip()}
+
+def get_active_profile():
+    return getattr(PROFILING["local"], "profile", None)
+
+def start_profile(label):
+    PROFILING["local"].profile = {
+        "label": label, "started_at": datetime.now().isoformat(timespec="seconds"),
+        "start": time.perf_counter(), "queries": [], "sections": {}, "cache_hits": 0, "cache_misses": 0,
+    }
+
+def normalize_profile_sql(sql):
+    return " ".join(sql.split())
+
+def record_profile_query(sql, parameters):
+    profile = get_active_profile()
+    if profile is None:
+        return None
+    query = {"sql": normalize_profile_sql(sql), "params": repr(parameters), "elapsed_s": 0.0, "rows": 0}
+    profile["queries"].append(query)
+    return query
+
+def record_profile_cache(hit):
+    profile = get_active_profile()
+    if profile is not None:
+        profile["cache_hits" if hit else "cache_misses"] += 1
+
+@contextmanager
+def profile_section(name):
+    profile = get_active_profile()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        section = profile["sections"].setdefault(name, {"calls": 0, "elapsed_s": 0.0})
+        section["calls"] += 1
+        section["elapsed_s"] += time.perf_counter() - start
+
+def profiled(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if get_active_profile() is None:
+            return func(*args, **kwargs)
+        with profile_section(func.__qualname__):
+            return func(*args, **kwargs)
+    return wrapper
+
+def summarize_profile_queries(queries):
+    groups = {}
+    for query in queries:
+        group = groups.setdefault(query["sql"], {"calls": 0, "elapsed_s": 0.0, "rows": 0, "params": {}})
+        group["calls"] += 1
+        group["elapsed_s"] += query["elapsed_s"]
+        group["rows"] += query["rows"]
+        group["params"][query["params"]] = group["params"].get(query["params"], 0) + 1
+
+    summary = []
+    for sql, group in groups.items():
+        repeated_identical = max(group["params"].values())
+        flags = []
+        if repeated_identical > 1:
+            flags.append(f"query identik diulang {repeated_identical}x")
+        if len(group["params"]) >= PROFILING_N_PLUS_ONE_THRESHOLD:
+            flags.append(f"pola N+1: {len(group['params'])} parameter berbeda")
+        summary.append({
+            "sql": sql[:PROFILING_SQL_PREVIEW_CHARS], "calls": group["calls"], "distinct_params": len(group["params"]),
+            "elapsed_s": group["elapsed_s"], "rows": group["rows"], "flags": flags,
+        })
+    return sorted(summary, key=lambda item: item["elapsed_s"], reverse=True)
+
+def finish_profile(log_path=None):
+    profile = get_active_profile()
+    if profile is None:
+        return None
+    PROFILING["local"].profile = None
+
+    wall_s = time.perf_counter() - profile["start"]
+    queries = summarize_profile_queries(profile["queries"])
+    sql_s = sum(query["elapsed_s"] for query in queries)
+    result = {
+        "label": profile["label"], "started_at": profile["started_at"],
+        "wall_s": wall_s, "sql_s": sql_s, "other_s": max(wall_s - sql_s, 0.0),
+        "query_count": len(profile["queries"]), "cache_hits": profile["cache_hits"], "cache_misses": profile["cache_misses"],
+        "queries": queries,
+        "sections": sorted(
+            ({"name": name, **section} for name, section in profile["sections"].items()),
+            key=lambda item: item["elapsed_s"], reverse=True
+        ),
+        "flags": [f"{'; '.join(query['flags'])} — {query['sql'][:80]}" for query in queries if query["flags"]],
+    }
+    if log_path:
+        write_profile_log(log_path, result)
+    return result
+
+def write_profile_log(log_path, result):
+    try:
+        with PROFILING["log_lock"], open(log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(result, ensure_ascii=False) + "\n")
+    except OSError as e:
+        logger.warning("Gagal menulis log profiling %s: %s", log_path, e)
+
+def get_master_db_connection():
+    return acquire_db_connection(MASTER_DB)
+
+def setup_master_database():
+    conn = get_master_db_connection()
+    c = conn.cursor()
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            username TEXT PRIMARY KEY,
+            password_hash TEXT NOT NULL,
+            db_path TEXT NOT NULL
+        )
+    """)
+    conn.commit()
+    conn.close()
+
+def get_db_connection(db_path):
+    return acquire_db_connection(db_path)
+
+def setup_user_database(db_path):
+    conn = get_db_connection(db_path)
+    try:
+        migrate_user_database(conn)
+    finally:
+        conn.close()
+
+def migrate_user_database(conn):
+    current_version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if current_version >= len(USER_DB_MIGRATIONS):
+        return current_version
+
+    c = conn.cursor()
+    for version, migration in enumerate(USER_DB_MIGRATIONS, start=1):
+        if version <= current_version:
+            continue
+
+        c.execute("BEGIN IMMEDIATE")
+        try:
+            if c.execute("PRAGMA user_version").fetchone()[0] < version:
+                migration(c)
+                c.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        current_version = version
+
+    return current_version
+
+def create_base_tables(c):
+    c.execute(f"""
+        CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            Waktu TEXT,
+            Deskripsi TEXT,
+            Metode TEXT,
+            Source_Sheet TEXT,
+            D1_Akun TEXT,
+            D1_Nominal REAL DEFAULT 0.0,
+            D2_Akun TEXT DEFAULT NULL,
+            D2_Nominal REAL DEFAULT 0.0,
+            K1_Akun TEXT,
+            K1_Nominal REAL DEFAULT 0.0,
+            K2_Akun TEXT DEFAULT NULL,
+            K2_Nominal REAL DEFAULT 0.0,
+            Customer_Supplier TEXT,
+            Kategori_Ternak TEXT,
+            Harga_Satuan REAL DEFAULT 0.0,
+            Jumlah_Unit REAL DEFAULT 0.0,
+            Total_Nilai REAL DEFAULT 0.0
+        )
+    """)
+
+    c.execute(f"""
+        CREATE TABLE IF NOT EXISTS {INVENTORY_TABLE_NAME} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            Waktu TEXT,
+            Tipe TEXT,
+            Kategori TEXT,
+            Harga REAL DEFAULT 0.0,
+            Jumlah INTEGER DEFAULT 0,
+            Total REAL DEFAULT 0.0
+        )
+    """)
+
+def create_report_indexes(c):
+    c.execute(f"CREATE INDEX IF NOT EXISTS idx_jurnal_sheet_waktu ON {TABLE_NAME} (Source_Sheet, Waktu, id)")
+    c.execute(f"CREATE INDEX IF NOT EXISTS idx_jurnal_customer ON {TABLE_NAME} (Customer_Supplier)")
+    c.execute(f"CREATE INDEX IF NOT EXISTS idx_inventory_kategori_waktu ON {INVENTORY_TABLE_NAME} (Kategori, Waktu, id)")
+    c.execute("ANALYZE")
+
+def normalize_waktu_columns(c):
+    for table_name in [TABLE_NAME, INVENTORY_TABLE_NAME]:
+        c.execute(f"UPDATE {table_name} SET Waktu = date(Waktu) WHERE date(Waktu) IS NOT NULL AND Waktu != date(Waktu)")
+
+        c.execute(f"SELECT id, Waktu FROM {table_name} WHERE Waktu IS NOT NULL AND date(Waktu) IS NULL")
+        unparsed = c.fetchall()
+        updates = []
+        for row in unparsed:
+            try:
+                updates.append((normalize_waktu(row[1]), row[0]))
+            except ValueError:
+                continue
+        if updates:
+            c.executemany(f"UPDATE {table_name} SET Waktu = ? WHERE id = ?", updates)
+
+def get_invalid_waktu_sql():
+    return f"""
+        SELECT '{TABLE_NAME}' AS tabel, id, Waktu, Source_Sheet AS sumber, Deskripsi AS keterangan
+        FROM {TABLE_NAME} WHERE Waktu IS NULL OR date(Waktu) IS NULL OR Waktu != date(Waktu)
+        UNION ALL
+        SELECT '{INVENTORY_TABLE_NAME}', id, Waktu, Tipe, Kategori
+        FROM {INVENTORY_TABLE_NAME} WHERE Waktu IS NULL OR date(Waktu) IS NULL OR Waktu != date(Waktu)
+    """
+
+def verify_waktu_columns(db_path):
+    conn = get_db_connection(db_path)
+    try:
+        return pd.read_sql_query(f"{get_invalid_waktu_sql()} ORDER BY tabel, id", conn)
+    finally:
+        conn.close()
+
+def setup_period_closings(c):
+    c.execute(f"""
+        CREATE TABLE IF NOT EXISTS {PERIOD_CLOSINGS_TABLE_NAME} (
+            period_end TEXT PRIMARY KEY,
+            closed_at TEXT NOT NULL
+        )
+    """)
+    c.execute(f"""
+        CREATE TABLE IF NOT EXISTS {CLOSING_ACCOUNT_BALANCES_TABLE_NAME} (
+            period_end TEXT NOT NULL,
+            account TEXT NOT NULL,
+            source_sheet TEXT NOT NULL,
+            debit REAL NOT NULL DEFAULT 0.0,
+            kredit REAL NOT NULL DEFAULT 0.0,
+            PRIMARY KEY (period_end, account, source_sheet)
+        )
+    """)
+    c.execute(f"""
+        CREATE TABLE IF NOT EXISTS {CLOSING_INVENTORY_STATE_TABLE_NAME} (
+            period_end TEXT NOT NULL,
+            kategori TEXT NOT NULL,
+            saldo_ekor INTEGER NOT NULL DEFAULT 0,
+            saldo_total REAL NOT NULL DEFAULT 0.0,
+            PRIMARY KEY (period_end, kategori)
+        )
+    """)
+
+    closed_until_sql = f"(SELECT MAX(period_end) FROM {PERIOD_CLOSINGS_TABLE_NAME})"
+    guarded_events = [
+        ("INSERT", "NEW.Waktu <= {closed}"),
+        ("UPDATE", "OLD.Waktu <= {closed} OR NEW.Waktu <= {closed}"),
+        ("DELETE", "OLD.Waktu <= {closed}"),
+    ]
+    for table_name in [TABLE_NAME, INVENTORY_TABLE_NAME]:
+        for event, condition in guarded_events:
+            c.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table_name}_closed_period_{event.lower()} BEFORE {event} ON {table_name}
+                WHEN {condition.format(closed=closed_until_sql)}
+                BEGIN
+                    SELECT RAISE(ABORT, 'Periode transaksi sudah ditutup. Buka kembali periodenya sebelum mengubah data.');
+                END
+            """)
+
+def get_journal_lines_insert_sql(entry_ref, with_waktu=True):
+    waktu_column = ", waktu" if with_waktu else ""
+    waktu_value = f", COALESCE({entry_ref}.Waktu, '')" if with_waktu else ""
+    statements = []
+    for line_no, (akun_col, nominal_col, side) in enumerate(JOURNAL_LEGS, start=1):
+        statements.append(f"""
+            INSERT INTO {JOURNAL_LINES_TABLE_NAME} (entry_id, line_no, account, side, amount{waktu_column})
+            SELECT {entry_ref}.id, {line_no}, {entry_ref}.{akun_col}, '{JOURNAL_SIDE_CODES[side]}', COALESCE({entry_ref}.{nominal_col}, 0){waktu_value}
+            WHERE {entry_ref}.{akun_col} IS NOT NULL AND {entry_ref}.{akun_col} != '';
+        """)
+    return "".join(statements)
+
+def setup_journal_lines(c):
+    c.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = ?", (JOURNAL_LINES_TABLE_NAME,))
+    is_new_table = c.fetchone() is None
+
+    c.execute(f"""
+        CREATE TABLE IF NOT EXISTS {JOURNAL_LINES_TABLE_NAME} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            entry_id INTEGER NOT NULL REFERENCES {TABLE_NAME}(id) ON DELETE CASCADE,
+            line_no INTEGER NOT NULL,
+            account TEXT NOT NULL,
+            side TEXT NOT NULL CHECK (side IN ('D', 'K')),
+            amount REAL NOT NULL DEFAULT 0.0
+        )
+    """)
+    c.execute(f"CREATE INDEX IF NOT EXISTS idx_journal_lines_account_entry ON {JOURNAL_LINES_TABLE_NAME} (account, entry_id)")
+    c.execute(f"CREATE INDEX IF NOT EXISTS idx_journal_lines_entry ON {JOURNAL_LINES_TABLE_NAME} (entry_id)")
+
+    c.execute("DROP TRIGGER IF EXISTS trg_jurnal_lines_update")
+    c.execute("DROP TRIGGER IF EXISTS trg_jurnal_lines_delete")
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_jurnal_lines_insert AFTER INSERT ON {TABLE_NAME}
+        BEGIN
+            {get_journal_lines_insert_sql("NEW", with_waktu=False)}
+        END
+    """)
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_jurnal_lines_before_update BEFORE UPDATE ON {TABLE_NAME}
+        BEGIN
+            DELETE FROM {JOURNAL_LINES_TABLE_NAME} WHERE entry_id = OLD.id;
+        END
+    """)
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_jurnal_lines_after_update AFTER UPDATE ON {TABLE_NAME}
+        BEGIN
+            {get_journal_lines_insert_sql("NEW", with_waktu=False)}
+        END
+    """)
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_jurnal_lines_before_delete BEFORE DELETE ON {TABLE_NAME}
+        BEGIN
+            DELETE FROM {JOURNAL_LINES_TABLE_NAME} WHERE entry_id = OLD.id;
+        END
+    """)
+
+    if is_new_table:
+        rebuild_journal_lines(c, with_waktu=False)
+
+def rebuild_journal_lines(c, with_waktu=True):
+    waktu_column = ", waktu" if with_waktu else ""
+    waktu_value = ", COALESCE(Waktu, '')" if with_waktu else ""
+    c.execute(f"DELETE FROM {JOURNAL_LINES_TABLE_NAME}")
+    for line_no, (akun_col, nominal_col, side) in enumerate(JOURNAL_LEGS, start=1):
+        c.execute(f"""
+            INSERT INTO {JOURNAL_LINES_TABLE_NAME} (entry_id, line_no, account, side, amount{waktu_column})
+            SELECT id, {line_no}, {akun_col}, '{JOURNAL_SIDE_CODES[side]}', COALESCE({nominal_col}, 0){waktu_value}
+            FROM {TABLE_NAME}
+            WHERE {akun_col} IS NOT NULL AND {akun_col} != ''
+        """)
+
+def setup_journal_lines_waktu(c):
+    columns = [row[1] for row in c.execute(f"PRAGMA table_info({JOURNAL_LINES_TABLE_NAME})").fetchall()]
+    if "waktu" not in columns:
+        c.execute(f"ALTER TABLE {JOURNAL_LINES_TABLE_NAME} ADD COLUMN waktu TEXT NOT NULL DEFAULT ''")
+    c.execute(f"""
+        UPDATE {JOURNAL_LINES_TABLE_NAME}
+        SET waktu = COALESCE((SELECT Waktu FROM {TABLE_NAME} WHERE id = {JOURNAL_LINES_TABLE_NAME}.entry_id), '')
+    """)
+    for trigger_name, event in [("trg_jurnal_lines_insert", "INSERT"), ("trg_jurnal_lines_after_update", "UPDATE")]:
+        c.execute(f"DROP TRIGGER IF EXISTS {trigger_name}")
+        c.execute(f"""
+            CREATE TRIGGER {trigger_name} AFTER {event} ON {TABLE_NAME}
+            BEGIN
+                {get_journal_lines_insert_sql("NEW")}
+            END
+        """)
+    c.execute(f"CREATE INDEX IF NOT EXISTS idx_journal_lines_account_waktu ON {JOURNAL_LINES_TABLE_NAME} (account, waktu, entry_id)")
+
+def setup_account_balances(c):
+    c.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = ?", (ACCOUNT_BALANCES_TABLE_NAME,))
+    is_new_table = c.fetchone() is None
+
+    c.execute(f"""
+        CREATE TABLE IF NOT EXISTS {ACCOUNT_BALANCES_TABLE_NAME} (
+            account TEXT NOT NULL,
+            source_sheet TEXT NOT NULL,
+            debit REAL NOT NULL DEFAULT 0.0,
+            kredit REAL NOT NULL DEFAULT 0.0,
+            PRIMARY KEY (account, source_sheet)
+        )
+    """)
+
+    source_sheet_sql = f"COALESCE((SELECT Source_Sheet FROM {TABLE_NAME} WHERE id = {{ref}}.entry_id), '')"
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_journal_lines_balances_insert AFTER INSERT ON {JOURNAL_LINES_TABLE_NAME}
+        BEGIN
+            INSERT INTO {ACCOUNT_BALANCES_TABLE_NAME} (account, source_sheet, debit, kredit)
+            VALUES (
+                NEW.account, {source_sheet_sql.format(ref="NEW")},
+                CASE WHEN NEW.side = 'D' THEN NEW.amount ELSE 0.0 END,
+                CASE WHEN NEW.side = 'K' THEN NEW.amount ELSE 0.0 END
+            )
+            ON CONFLICT (account, source_sheet) DO UPDATE SET
+                debit = debit + excluded.debit,
+                kredit = kredit + excluded.kredit;
+        END
+    """)
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_journal_lines_balances_delete AFTER DELETE ON {JOURNAL_LINES_TABLE_NAME}
+        BEGIN
+            UPDATE {ACCOUNT_BALANCES_TABLE_NAME} SET
+                debit = debit - CASE WHEN OLD.side = 'D' THEN OLD.amount ELSE 0.0 END,
+                kredit = kredit - CASE WHEN OLD.side = 'K' THEN OLD.amount ELSE 0.0 END
+            WHERE account = OLD.account AND source_sheet = {source_sheet_sql.format(ref="OLD")};
+        END
+    """)
+
+    if is_new_table:
+        rebuild_account_balances(c)
+
+def get_inventory_state_delta_sql(ref, sign):
+    return f"""
+        INSERT INTO {INVENTORY_STATE_TABLE_NAME} (kategori, saldo_ekor, saldo_total, last_row_id)
+        SELECT {ref}.Kategori,
+               {sign} * CASE WHEN {ref}.Tipe = 'Penjualan' THEN -1 ELSE 1 END * CAST(COALESCE({ref}.Jumlah, 0) AS INTEGER),
+               {sign} * CASE WHEN {ref}.Tipe = 'Penjualan' THEN -1 ELSE 1 END * COALESCE({ref}.Total, 0.0),
+               {ref}.id
+        WHERE {ref}.Kategori IS NOT NULL AND {ref}.Tipe IN ('Pembelian', 'SALDO AWAL', 'Penjualan')
+        ON CONFLICT (kategori) DO UPDATE SET
+            saldo_ekor = saldo_ekor + excluded.saldo_ekor,
+            saldo_total = saldo_total + excluded.saldo_total,
+            last_row_id = MAX(last_row_id, excluded.last_row_id);
+    """
+
+def setup_inventory_state(c):
+    c.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = ?", (INVENTORY_STATE_TABLE_NAME,))
+    is_new_table = c.fetchone() is None
+
+    c.execute(f"""
+        CREATE TABLE IF NOT EXISTS {INVENTORY_STATE_TABLE_NAME} (
+            kategori TEXT PRIMARY KEY,
+            saldo_ekor INTEGER NOT NULL DEFAULT 0,
+            saldo_total REAL NOT NULL DEFAULT 0.0,
+            last_row_id INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_inventory_state_insert AFTER INSERT ON {INVENTORY_TABLE_NAME}
+        BEGIN
+            {get_inventory_state_delta_sql("NEW", 1)}
+        END
+    """)
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_inventory_state_update AFTER UPDATE ON {INVENTORY_TABLE_NAME}
+        BEGIN
+            {get_inventory_state_delta_sql("OLD", -1)}
+            {get_inventory_state_delta_sql("NEW", 1)}
+        END
+    """)
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_inventory_state_delete AFTER DELETE ON {INVENTORY_TABLE_NAME}
+        BEGIN
+            {get_inventory_state_delta_sql("OLD", -1)}
+        END
+    """)
+
+    if is_new_table:
+        rebuild_inventory_state(c)
+
+def get_inventory_totals_sql(period_sql=""):
+    return f"""
+        SELECT Kategori AS kategori,
+               SUM(CASE WHEN Tipe = 'Penjualan' THEN -1 ELSE 1 END * CAST(COALESCE(Jumlah, 0) AS INTEGER)) AS saldo_ekor,
+               SUM(CASE WHEN Tipe = 'Penjualan' THEN -1 ELSE 1 END * COALESCE(Total, 0)) AS saldo_total,
+               MAX(id) AS last_row_id
+        FROM {INVENTORY_TABLE_NAME}
+        WHERE Kategori IS NOT NULL AND Tipe IN ('Pembelian', 'SALDO AWAL', 'Penjualan'){period_sql}
+        GROUP BY Kategori
+    """
+
+def rebuild_inventory_state(c):
+    c.execute(f"DELETE FROM {INVENTORY_STATE_TABLE_NAME}")
+    c.execute(f"""
+        INSERT INTO {INVENTORY_STATE_TABLE_NAME} (kategori, saldo_ekor, saldo_total, last_row_id)
+        {get_inventory_totals_sql()}
+    """)
+
+def verify_inventory_state(db_path):
+    conn = get_db_connection(db_path)
+    try:
+        expected = pd.read_sql_query(get_inventory_totals_sql(), conn)
+        stored = pd.read_sql_query(f"SELECT kategori, saldo_ekor, saldo_total FROM {INVENTORY_STATE_TABLE_NAME}", conn)
+    finally:
+        conn.close()
+
+    comparison = expected.drop(columns=["last_row_id"]).merge(stored, on="kategori", how="outer", suffixes=("_inventory", "_tersimpan")).fillna(0)
+    drift = (
+        (comparison["saldo_ekor_inventory"] != comparison["saldo_ekor_tersimpan"]) |
+        (comparison["saldo_total_inventory"] != comparison["saldo_total_tersimpan"])
+    )
+    return comparison[drift].reset_index(drop=True)
+
+def get_rupiah_columns_by_table():
+    return {
+        TABLE_NAME: JURNAL_RUPIAH_COLUMNS,
+        INVENTORY_TABLE_NAME: INVENTORY_RUPIAH_COLUMNS,
+        JOURNAL_LINES_TABLE_NAME: ["amount"],
+        ACCOUNT_BALANCES_TABLE_NAME: ["debit", "kredit"],
+        INVENTORY_STATE_TABLE_NAME: ["saldo_total"],
+        CLOSING_ACCOUNT_BALANCES_TABLE_NAME: ["debit", "kredit"],
+        CLOSING_INVENTORY_STATE_TABLE_NAME: ["saldo_total"],
+    }
+
+def rebuild_table_with_rupiah_columns(c, table_name, rupiah_columns):
+    create_sql = c.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,)).fetchone()[0]
+    for col in rupiah_columns:
+        create_sql = re.sub(rf"\b({col}\s+)REAL\b([^,\n]*?)DEFAULT 0\.0", r"\1INTEGER\2DEFAULT 0", create_sql)
+    new_table_name = f"{table_name}_rupiah"
+    create_sql = re.sub(rf"^CREATE TABLE \"?{table_name}\"?", f"CREATE TABLE {new_table_name}", create_sql)
+
+    columns = [row[1] for row in c.execute(f"PRAGMA table_info({table_name})")]
+    select_sql = ", ".join(f"CAST(ROUND({col}) AS INTEGER)" if col in rupiah_columns else col for col in columns)
+    seq = get_autoincrement_seq(c, table_name)
+
+    c.execute(create_sql)
+    c.execute(f"INSERT INTO {new_table_name} ({', '.join(columns)}) SELECT {select_sql} FROM {table_name}")
+    c.execute(f"DROP TABLE {table_name}")
+    c.execute(f"ALTER TABLE {new_table_name} RENAME TO {table_name}")
+    if seq:
+        c.execute("DELETE FROM sqlite_sequence WHERE name = ?", (table_name,))
+        c.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table_name, seq))
+
+def convert_rupiah_columns(c):
+    rupiah_tables = list(get_rupiah_columns_by_table())
+    placeholders = ', '.join(['?' for _ in rupiah_tables])
+    dependents = c.execute(
+        f"SELECT type, name, sql FROM sqlite_master WHERE type IN ('index', 'trigger') AND sql IS NOT NULL AND tbl_name IN ({placeholders})",
+        rupiah_tables
+    ).fetchall()
+    for object_type, name, _ in dependents:
+        if object_type == "trigger":
+            c.execute(f"DROP TRIGGER {name}")
+
+    for table_name, rupiah_columns in get_rupiah_columns_by_table().items():
+        if table_name in (TABLE_NAME, INVENTORY_TABLE_NAME):
+            for col in rupiah_columns:
+                rows = c.execute(f"SELECT id, {col} FROM {table_name} WHERE typeof({col}) = 'text'").fetchall()
+                if rows:
+                    c.executemany(f"UPDATE {table_name} SET {col} = ? WHERE id = ?", [(to_rupiah(row[1]), row[0]) for row in rows])
+        rebuild_table_with_rupiah_columns(c, table_name, rupiah_columns)
+
+    for _, _, sql in dependents:
+        c.execute(sql)
+    for table_name in rupiah_tables:
+        c.execute(f"ANALYZE {table_name}")
+
+def get_daily_inventory_rollup_delta_sql(ref, sign):
+    return f"""
+        INSERT INTO {DAILY_INVENTORY_ROLLUP_TABLE_NAME} (kategori, waktu, ekor, total)
+        SELECT {ref}.Kategori, COALESCE({ref}.Waktu, ''),
+               {sign} * CASE WHEN {ref}.Tipe = 'Penjualan' THEN -1 ELSE 1 END * CAST(COALESCE({ref}.Jumlah, 0) AS INTEGER),
+               {sign} * CASE WHEN {ref}.Tipe = 'Penjualan' THEN -1 ELSE 1 END * COALESCE({ref}.Total, 0)
+        WHERE {ref}.Kategori IS NOT NULL AND {ref}.Tipe IN ('Pembelian', 'SALDO AWAL', 'Penjualan')
+        ON CONFLICT (kategori, waktu) DO UPDATE SET
+            ekor = ekor + excluded.ekor,
+            total = total + excluded.total;
+    """
+
+def setup_daily_rollup(c):
+    c.execute(f"""
+        CREATE TABLE IF NOT EXISTS {DAILY_ROLLUP_TABLE_NAME} (
+            account TEXT NOT NULL,
+            waktu TEXT NOT NULL,
+            debit INTEGER NOT NULL DEFAULT 0,
+            kredit INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (account, waktu)
+        )
+    """)
+    c.execute(f"""
+        CREATE TABLE IF NOT EXISTS {DAILY_INVENTORY_ROLLUP_TABLE_NAME} (
+            kategori TEXT NOT NULL,
+            waktu TEXT NOT NULL,
+            ekor INTEGER NOT NULL DEFAULT 0,
+            total INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (kategori, waktu)
+        )
+    """)
+
+    waktu_sql = f"COALESCE((SELECT Waktu FROM {TABLE_NAME} WHERE id = {{ref}}.entry_id), '')"
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_journal_lines_rollup_insert AFTER INSERT ON {JOURNAL_LINES_TABLE_NAME}
+        BEGIN
+            INSERT INTO {DAILY_ROLLUP_TABLE_NAME} (account, waktu, debit, kredit)
+            VALUES (
+                NEW.account, {waktu_sql.format(ref="NEW")},
+                CASE WHEN NEW.side = 'D' THEN NEW.amount ELSE 0 END,
+                CASE WHEN NEW.side = 'K' THEN NEW.amount ELSE 0 END
+            )
+            ON CONFLICT (account, waktu) DO UPDATE SET
+                debit = debit + excluded.debit,
+                kredit = kredit + excluded.kredit;
+        END
+    """)
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_journal_lines_rollup_delete AFTER DELETE ON {JOURNAL_LINES_TABLE_NAME}
+        BEGIN
+            UPDATE {DAILY_ROLLUP_TABLE_NAME} SET
+                debit = debit - CASE WHEN OLD.side = 'D' THEN OLD.amount ELSE 0 END,
+                kredit = kredit - CASE WHEN OLD.side = 'K' THEN OLD.amount ELSE 0 END
+            WHERE account = OLD.account AND waktu = {waktu_sql.format(ref="OLD")};
+        END
+    """)
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_inventory_rollup_insert AFTER INSERT ON {INVENTORY_TABLE_NAME}
+        BEGIN
+            {get_daily_inventory_rollup_delta_sql("NEW", 1)}
+        END
+    """)
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_inventory_rollup_update AFTER UPDATE ON {INVENTORY_TABLE_NAME}
+        BEGIN
+            {get_daily_inventory_rollup_delta_sql("OLD", -1)}
+            {get_daily_inventory_rollup_delta_sql("NEW", 1)}
+        END
+    """)
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_inventory_rollup_delete AFTER DELETE ON {INVENTORY_TABLE_NAME}
+        BEGIN
+            {get_daily_inventory_rollup_delta_sql("OLD", -1)}
+        END
+    """)
+
+    rebuild_daily_rollup(c)
+
+def create_inventory_waktu_index(c):
+    c.execute(f"CREATE INDEX IF NOT EXISTS idx_inventory_waktu ON {INVENTORY_TABLE_NAME} (Waktu)")
+    c.execute(f"ANALYZE {INVENTORY_TABLE_NAME}")
+
+USER_DB_MIGRATIONS = [
+    create_base_tables,
+    setup_journal_lines,
+    setup_account_balances,
+    setup_inventory_state,
+    create_report_indexes,
+    normalize_waktu_columns,
+    setup_period_closings,
+    convert_rupiah_columns,
+    setup_daily_rollup,
+    setup_journal_lines_waktu,
+    create_inventory_waktu_index,
+]
+
+REPORT_QUERY_PLAN_CHECKS = [
+    (
+        "Jurnal per sheet",
+        f"SELECT * FROM {TABLE_NAME} WHERE Source_Sheet IN (?) ORDER BY Waktu, id",
+        ["Penjualan"], "idx_jurnal_sheet_waktu"
+    ),
+    (
+        "Mutasi per mitra",
+        f"SELECT id, Waktu FROM {TABLE_NAME} WHERE Customer_Supplier = ?",
+        ["Customer"], "idx_jurnal_customer"
+    ),
+    (
+        "Kartu stok per kategori",
+        f"SELECT Tipe, Jumlah, Total FROM {INVENTORY_TABLE_NAME} WHERE Kategori = ? ORDER BY Waktu, id",
+        ["Jantan"], "idx_inventory_kategori_waktu"
+    ),
+    (
+        "Saldo akun per periode",
+        f"SELECT l.account, l.side, l.amount FROM {TABLE_NAME} j JOIN {JOURNAL_LINES_TABLE_NAME} l ON l.entry_id = j.id WHERE j.Source_Sheet IN (?) AND j.Waktu >= ? AND j.Waktu <= ?",
+        ["Penjualan", "2025-01-01", "2025-01-31"], "idx_jurnal_sheet_waktu"
+    ),
+    (
+        "Buku besar per akun",
+        f"SELECT entry_id, side, amount FROM {JOURNAL_LINES_TABLE_NAME} WHERE account = ?",
+        ["Kas"], "idx_journal_lines_account"
+    ),
+    (
+        "Halaman jurnal (keyset)",
+        f"SELECT * FROM {TABLE_NAME} WHERE Source_Sheet IN (?) AND (Waktu, id) > (?, ?) ORDER BY Waktu, id LIMIT 51",
+        ["Penjualan", "2025-01-01", 0], "idx_jurnal_sheet_waktu"
+    ),
+    (
+        "Halaman buku besar (keyset)",
+        f"SELECT l.waktu, l.entry_id FROM {JOURNAL_LINES_TABLE_NAME} l WHERE l.account = ? AND (l.waktu, l.entry_id) > (?, ?) ORDER BY l.waktu, l.entry_id LIMIT 51",
+        ["Kas", "2025-01-01", 0], "idx_journal_lines_account_waktu"
+    ),
+    (
+        "Kartu mitra per akun",
+        f"SELECT j.* FROM (SELECT DISTINCT entry_id FROM {JOURNAL_LINES_TABLE_NAME} WHERE account = ? AND waktu <= ?) l CROSS JOIN {TABLE_NAME} j ON j.id = l.entry_id",
+        ["Piutang usaha", "2025-12-31"], "idx_journal_lines_account"
+    ),
+    (
+        "Inventory terkait jurnal",
+        f"SELECT id FROM {INVENTORY_TABLE_NAME} WHERE Waktu IN (SELECT Waktu FROM {TABLE_NAME} WHERE id IN (?))",
+        [1], "idx_inventory_waktu"
+    ),
+    (
+        "Tren harian per akun",
+        f"SELECT account, waktu, debit, kredit FROM {DAILY_ROLLUP_TABLE_NAME} WHERE account IN (?, ?, ?) AND waktu != '' AND waktu >= ? AND waktu <= ?",
+        TREND_ACCOUNTS + ["2025-01-01", "2025-12-31"], f"sqlite_autoindex_{DAILY_ROLLUP_TABLE_NAME}_1"
+    ),
+]
+
+def check_report_query_plans(db_path):
+    results = []
+    conn = get_db_connection(db_path)
+    try:
+        for name, query, params, expected_index in REPORT_QUERY_PLAN_CHECKS:
+            plan = [row['detail'] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+            uses_index = any(expected_index in detail for detail in plan)
+            results.append({"Query": name, "Index": expected_index, "OK": uses_index, "Plan": " | ".join(plan)})
+    finally:
+        conn.close()
+    return results
+
+def query_plan_cli(args):
+    parser = argparse.ArgumentParser(prog="subuhjayafarm.py check-query-plans", description="Pastikan query laporan memakai index yang dibuat migrasi.")
+    parser.add_argument("db_paths", nargs="+", help="Database user yang dicek.")
+    options = parser.parse_args(args)
+
+    all_ok = True
+    for db_path in options.db_paths:
+        setup_user_database(db_path)
+        for result in check_report_query_plans(db_path):
+            status = "OK" if result["OK"] else "TIDAK PAKAI INDEX"
+            print(f"{db_path}: {result['Query']} -> {status} ({result['Plan']})")
+            all_ok = all_ok and result["OK"]
+
+    return 0 if all_ok else 1
+
+def get_jurnal_account_totals_sql(group_column="Source_Sheet", group_name="source_sheet"):
+    legs_sql = " UNION ALL ".join(
+        f"""
+        SELECT {akun_col} AS account, COALESCE({group_column}, '') AS {group_name},
+               {"COALESCE(" + nominal_col + ", 0)" if side == "Debit" else "0"} AS debit,
+               {"COALESCE(" + nominal_col + ", 0)" if side == "Kredit" else "0"} AS kredit
+        FROM {TABLE_NAME}
+        WHERE {akun_col} IS NOT NULL AND {akun_col} != ''
+        """
+        for akun_col, nominal_col, side in JOURNAL_LEGS
+    )
+    return f"""
+        SELECT account, {group_name}, SUM(debit) AS debit, SUM(kredit) AS kredit
+        FROM ({legs_sql})
+        GROUP BY account, {group_name}
+    """
+
+def rebuild_account_balances(c):
+    c.execute(f"DELETE FROM {ACCOUNT_BALANCES_TABLE_NAME}")
+    c.execute(f"""
+        INSERT INTO {ACCOUNT_BALANCES_TABLE_NAME} (account, source_sheet, debit, kredit)
+        {get_jurnal_account_totals_sql()}
+    """)
+
+def verify_account_balances(db_path):
+    conn = get_db_connection(db_path)
+    try:
+        expected = pd.read_sql_query(get_jurnal_account_totals_sql(), conn)
+        stored = pd.read_sql_query(f"SELECT account, source_sheet, debit, kredit FROM {ACCOUNT_BALANCES_TABLE_NAME}", conn)
+    finally:
+        conn.close()
+
+    comparison = expected.merge(stored, on=["account", "source_sheet"], how="outer", suffixes=("_jurnal", "_tersimpan")).fillna(0)
+    drift = (
+        (comparison["debit_jurnal"] != comparison["debit_tersimpan"]) |
+        (comparison["kredit_jurnal"] != comparison["kredit_tersimpan"])
+    )
+    return comparison[drift].reset_index(drop=True)
+
+def get_inventory_daily_totals_sql():
+    return f"""
+        SELECT Kategori AS kategori, COALESCE(Waktu, '') AS waktu,
+               SUM(CASE WHEN Tipe = 'Penjualan' THEN -1 ELSE 1 END * CAST(COALESCE(Jumlah, 0) AS INTEGER)) AS ekor,
+               SUM(CASE WHEN Tipe = 'Penjualan' THEN -1 ELSE 1 END * COALESCE(Total, 0)) AS total
+        FROM {INVENTORY_TABLE_NAME}
+        WHERE Kategori IS NOT NULL AND Tipe IN ('Pembelian', 'SALDO AWAL', 'Penjualan')
+        GROUP BY Kategori, COALESCE(Waktu, '')
+    """
+
+def rebuild_daily_rollup(c):
+    c.execute(f"DELETE FROM {DAILY_ROLLUP_TABLE_NAME}")
+    c.execute(f"""
+        INSERT INTO {DAILY_ROLLUP_TABLE_NAME} (account, waktu, debit, kredit)
+        {get_jurnal_account_totals_sql("Waktu", "waktu")}
+    """)
+    c.execute(f"DELETE FROM {DAILY_INVENTORY_ROLLUP_TABLE_NAME}")
+    c.execute(f"""
+        INSERT INTO {DAILY_INVENTORY_ROLLUP_TABLE_NAME} (kategori, waktu, ekor, total)
+        {get_inventory_daily_totals_sql()}
+    """)
+
+def verify_daily_rollup(db_path):
+    conn = get_db_connection(db_path)
+    try:
+        expected = pd.read_sql_query(get_jurnal_account_totals_sql("Waktu", "waktu"), conn)
+        stored = pd.read_sql_query(f"SELECT account, waktu, debit, kredit FROM {DAILY_ROLLUP_TABLE_NAME}", conn)
+        expected_inventory = pd.read_sql_query(get_inventory_daily_totals_sql(), conn)
+        stored_inventory = pd.read_sql_query(f"SELECT kategori, waktu, ekor, total FROM {DAILY_INVENTORY_ROLLUP_TABLE_NAME}", conn)
+    finally:
+        conn.close()
+
+    comparison = pd.concat([
+        expected.merge(stored, on=["account", "waktu"], how="outer", suffixes=("_sumber", "_tersimpan")),
+        expected_inventory.rename(columns={"kategori": "account", "ekor": "debit", "total": "kredit"}).merge(
+            stored_inventory.rename(columns={"kategori": "account", "ekor": "debit", "total": "kredit"}),
+            on=["account", "waktu"], how="outer", suffixes=("_sumber", "_tersimpan")
+        ),
+    ], ignore_index=True).fillna(0)
+    drift = (
+        (comparison["debit_sumber"] != comparison["debit_tersimpan"]) |
+        (comparison["kredit_sumber"] != comparison["kredit_tersimpan"])
+    )
+    return comparison[drift].reset_index(drop=True)
+
+def account_balances_cli(args):
+    parser = argparse.ArgumentParser(prog="subuhjayafarm.py verify-balances", description="Cek (dan perbaiki) tabel account_balances, inventory_state, dan daily_rollup terhadap jurnal dan inventory, serta laporkan baris tanpa tanggal yang valid.")
+    parser.add_argument("db_paths", nargs="*", help="Database user. Default: semua user di accounts.db.")
+    parser.add_argument("--rebuild", action="store_true", help="Hitung ulang tabel ringkasan dari data sumber jika ada selisih.")
+    options = parser.parse_args(args)
+
+    db_paths = options.db_paths
+    if not db_paths:
+        conn_master = get_master_db_connection()
+        db_paths = [row['db_path'] for row in conn_master.execute("SELECT db_path FROM users")]
+        conn_master.close()
+
+    has_drift = False
+    has_invalid_waktu = False
+    for db_path in db_paths:
+        setup_user_database(db_path)
+        drift = verify_account_balances(db_path)
+        drift_inventory = verify_inventory_state(db_path)
+        drift_rollup = verify_daily_rollup(db_path)
+        invalid_waktu = verify_waktu_columns(db_path)
+        if drift.empty and drift_inventory.empty and drift_rollup.empty and invalid_waktu.empty:
+            print(f"{db_path}: OK")
+            continue
+
+        if not invalid_waktu.empty:
+            has_invalid_waktu = True
+            print(f"{db_path}: {len(invalid_waktu)} baris tanpa tanggal yang valid (tutup buku ditolak sampai tanggalnya diperbaiki)")
+            print(invalid_waktu.to_string(index=False))
+        if drift.empty and drift_inventory.empty and drift_rollup.empty:
+            continue
+
+        has_drift = True
+        conn = get_db_connection(db_path)
+        if not drift.empty:
+            print(f"{db_path}: {len(drift)} saldo akun tidak sesuai jurnal")
+            print(drift.to_string(index=False))
+            if options.rebuild:
+                rebuild_account_balances(conn.cursor())
+                print(f"{db_path}: account_balances dibangun ulang dari jurnal")
+        if not drift_inventory.empty:
+            print(f"{db_path}: {len(drift_inventory)} saldo stok tidak sesuai inventory")
+            print(drift_inventory.to_string(index=False))
+            if options.rebuild:
+                rebuild_inventory_state(conn.cursor())
+                print(f"{db_path}: inventory_state dibangun ulang dari inventory")
+        if not drift_rollup.empty:
+            print(f"{db_path}: {len(drift_rollup)} rekap harian tidak sesuai jurnal/inventory")
+            print(drift_rollup.to_string(index=False))
+            if options.rebuild:
+                rebuild_daily_rollup(conn.cursor())
+                print(f"{db_path}: daily_rollup dibangun ulang dari jurnal dan inventory")
+        conn.commit()
+        conn.close()
+
+    return 1 if has_invalid_waktu or (has_drift and not options.rebuild) else 0
+
+def register_user(username, password):
+    if not username or not password:
+        return False, "Username dan password tidak boleh kosong."
+
+    conn_master = get_master_db_connection()
+    c_master = conn_master.cursor()
+    
+    c_master.execute("SELECT username FROM users WHERE username = ?", (username,))
+    if c_master.fetchone():
+        conn_master.close()
+        return False, "Username sudah terdaftar. Silakan pilih yang lain."
+
+    db_path = f"{username}_transaksi.db"
+    hashed_pass = hash_password(password)
+
+    try:
+        c_master.execute("INSERT INTO users (username, password_hash, db_path) VALUES (?, ?, ?)", 
+                             (username, hashed_pass, db_path))
+        conn_master.commit()
+        conn_master.close()
+
+        setup_user_database(db_path)
+
+        return True, "Registrasi berhasil! Silakan login."
+    except Exception as e:
+        return False, f"Gagal menyimpan data: {e}"
+
+INVENTORY_INSERT_COLUMNS = ["Waktu", "Tipe", "Kategori", "Harga", "Jumlah", "Total"]
+INVENTORY_RUPIAH_COLUMNS = ["Harga", "Total"]
+JURNAL_INSERT_COLUMNS = [
+    "Waktu", "Deskripsi", "Metode", "Source_Sheet",
+    "D1_Akun", "D1_Nominal", "D2_Akun", "D2_Nominal",
+    "K1_Akun", "K1_Nominal", "K2_Akun", "K2_Nominal",
+    "Customer_Supplier", "Kategori_Ternak", "Harga_Satuan",
+    "Jumlah_Unit", "Total_Nilai"
+]
+JURNAL_RUPIAH_COLUMNS = ["D1_Nominal", "D2_Nominal", "K1_Nominal", "K2_Nominal", "Harga_Satuan", "Total_Nilai"]
+
+def round_rupiah_values(columns, data, rupiah_columns):
+    return tuple(
+        to_rupiah(value) if column in rupiah_columns and value is not None else value
+        for column, value in zip(columns, data)
+    )
+
+def build_insert_row(sheet_name, row_data):
+    if sheet_name == "Inventory_Data":
+        if len(row_data) != len(INVENTORY_INSERT_COLUMNS):
+            raise ValueError("Jumlah kolom untuk Inventory_Data tidak sesuai.")
+        data = (normalize_waktu(row_data[0]),) + tuple(row_data[1:])
+        return INVENTORY_TABLE_NAME, round_rupiah_values(INVENTORY_INSERT_COLUMNS, data, INVENTORY_RUPIAH_COLUMNS)
+
+    if len(row_data) != len(JURNAL_INSERT_COLUMNS) - 1:
+        raise ValueError("Jumlah kolom untuk Jurnal/Transaksi tidak sesuai.")
+    data = (normalize_waktu(row_data[0]),) + tuple(row_data[1:3]) + (sheet_name,) + tuple(row_data[3:])
+    return TABLE_NAME, round_rupiah_values(JURNAL_INSERT_COLUMNS, data, JURNAL_RUPIAH_COLUMNS)
+
+def get_autoincrement_seq(c, table_name):
+    c.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table_name,))
+    row = c.fetchone()
+    return row[0] if row else 0
+
+def insert_rows(c, table_name, rows):
+    columns = JURNAL_INSERT_COLUMNS if table_name == TABLE_NAME else INVENTORY_INSERT_COLUMNS
+    placeholders = ', '.join(['?' for _ in columns])
+    first_id = get_autoincrement_seq(c, table_name) + 1
+    c.executemany(f"INSERT INTO {table_name} ({','.join(columns)}) VALUES ({placeholders})", rows)
+    last_id = get_autoincrement_seq(c, table_name)
+    if last_id - first_id + 1 != len(rows):
+        raise sqlite3.IntegrityError(f"ID baru untuk {table_name} tidak berurutan.")
+    return list(range(first_id, last_id + 1))
+
+def insert_prepared_rows(c, prepared_rows):
+    rows_by_table = {}
+    for position, (table_name, data) in enumerate(prepared_rows):
+        rows_by_table.setdefault(table_name, []).append((position, data))
+
+    assigned_ids = [None] * len(prepared_rows)
+    for table_name, table_rows in rows_by_table.items():
+        new_ids = insert_rows(c, table_name, [data for _, data in table_rows])
+        for (position, _), new_id in zip(table_rows, new_ids):
+            assigned_ids[position] = new_id
+    return assigned_ids
+
+def delete_table_rows(c, table_name, ids_to_delete):
+    placeholders = ', '.join(['?' for _ in ids_to_delete])
+    c.execute(f"DELETE FROM {table_name} WHERE id IN ({placeholders})", ids_to_delete)
+    return c.rowcount
+
+def fetch_linked_inventory_ids(c, row_ids):
+    placeholders = ', '.join(['?' for _ in row_ids])
+    c.execute(f"SELECT id FROM {INVENTORY_TABLE_NAME} WHERE Waktu IN (SELECT Waktu FROM {TABLE_NAME} WHERE id IN ({placeholders}))", row_ids)
+    return [row[0] for row in c.fetchall()]
+
+def safe_float_conversion(value):
+    if value is None: return 0.0
+    try: 
+        if isinstance(value, str):
+            return float(value.replace('.', '').replace(',', '.').strip()) 
+        return float(value)
+    except (ValueError, TypeError): return 0.0
+
+def to_rupiah(value):
+    nominal = safe_float_conversion(value)
+    return int(math.copysign(math.floor(abs(nominal) + 0.5), nominal))
+
+def round_half_up_div(numerator, denominator):
+    return (2 * numerator + denominator) // (2 * denominator)
+
+def get_moving_average_hpp(saldo_ekor, saldo_total, jumlah):
+    if saldo_ekor <= 0:
+        return 0
+    return round_half_up_div(saldo_total * int(jumlah), saldo_ekor)
+
+def safe_int_conversion(value):
+    if value is None: return 0
+    try:
+        if isinstance(value, str):
+            return int(float(value.replace('.', '').replace(',', '.').strip()))
+        return int(float(value))
+    except (ValueError, TypeError): return 0
+
+WAKTU_FORMATS = ["%Y-%m-%d", "%Y/%m/%d", "%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y"]
+
+def normalize_waktu(value):
+    if isinstance(value, date) and not pd.isna(value):
+        return value.strftime('%Y-%m-%d')
+    if isinstance(value, str):
+        text = value.strip()
+        for waktu_format in WAKTU_FORMATS:
+            try:
+                return datetime.strptime(text, waktu_format).strftime('%Y-%m-%d')
+            except ValueError:
+                continue
+    raise ValueError(f"Format tanggal tidak valid: {value}")
+
+def make_period(start_date=None, end_date=None):
+    start_date = normalize_waktu(start_date) if start_date else None
+    end_date = normalize_waktu(end_date) if end_date else None
+    if start_date is None and end_date is None:
+        return None
+    return (start_date, end_date)
+
+def get_period_before(period):
+    if not period or not period[0]:
+        return None
+    return make_period(None, pd.Timestamp(period[0]) - pd.Timedelta(days=1))
+
+def get_period_filter_sql(period, column="Waktu"):
+    start_date, end_date = period or (None, None)
+    conditions = []
+    params = []
+    if start_date:
+        conditions.append(f" AND {column} >= ?")
+        params.append(start_date)
+    if end_date:
+        conditions.append(f" AND {column} <= ?")
+        params.append(end_date)
+    return "".join(conditions), params
+
+def format_period_date(value):
+    if not value:
+        return datetime.now().strftime('%d %B %Y')
+    return pd.Timestamp(value).strftime('%d %B %Y')
+
+TRANSACTIONS_CACHE = {"lock": threading.Lock(), "versions": {}, "entries": OrderedDict()}
+EXCEL_CACHE = {"lock": threading.Lock(), "entries": OrderedDict(), "bytes": 0}
+
+def get_transactions_cache():
+    return TRANSACTIONS_CACHE
+
+def get_data_version(db_path):
+    cache = get_transactions_cache()
+    with cache["lock"]:
+        return cache["versions"].get(db_path, 0)
+
+def bump_data_version(db_path):
+    cache = get_transactions_cache()
+    with cache["lock"]:
+        cache["versions"][db_path] = cache["versions"].get(db_path, 0) + 1
+        stale_keys = [key for key in cache["entries"] if key[0] == db_path]
+        for key in stale_keys:
+            del cache["entries"][key]
+
+    with EXCEL_CACHE["lock"]:
+        stale_keys = [key for key in EXCEL_CACHE["entries"] if key[0] == db_path]
+        for key in stale_keys:
+            EXCEL_CACHE["bytes"] -= len(EXCEL_CACHE["entries"].pop(key))
+
+TRANSACTION_COLUMNS = [
+    "id", "Waktu", "Deskripsi", "Metode",
+    "D1_Akun", "D1_Nominal", "D2_Akun", "D2_Nominal",
+    "K1_Akun", "K1_Nominal", "K2_Akun", "K2_Nominal",
+    "Customer", "Source_Sheet", "Total_Nilai", "Row_Index"
+]
+TRANSACTION_NOMINAL_COLUMNS = ["D1_Nominal", "D2_Nominal", "K1_Nominal", "K2_Nominal", "Total_Nilai"]
+
+def get_cached_data(db_path, cache_name, loader):
+    cache = get_transactions_cache()
+    with cache["lock"]:
+        cache_key = (db_path, cache["versions"].get(db_path, 0), cache_name)
+        cached = cache["entries"].get(cache_key)
+        if cached is not None:
+            cache["entries"].move_to_end(cache_key)
+            record_profile_cache(True)
+            return cached
+
+    record_profile_cache(False)
+    data = loader()
+    if data is None:
+        return None
+
+    with cache["lock"]:
+        if cache["versions"].get(db_path, 0) == cache_key[1]:
+            cache["entries"][cache_key] = data
+            cache["entries"].move_to_end(cache_key)
+            while len(cache["entries"]) > TRANSACTIONS_CACHE_MAX_ENTRIES:
+                cache["entries"].popitem(last=False)
+
+    return data
+
+def get_cached_excel_bytes(db_path, cache_name, builder):
+    cache_key = (db_path, get_data_version(db_path), cache_name)
+    with EXCEL_CACHE["lock"]:
+        cached = EXCEL_CACHE["entries"].get(cache_key)
+        if cached is not None:
+            EXCEL_CACHE["entries"].move_to_end(cache_key)
+            record_profile_cache(True)
+            return cached
+
+    record_profile_cache(False)
+    data = builder()
+    if len(data) > EXCEL_CACHE_MAX_BYTES or get_data_version(db_path) != cache_key[1]:
+        return data
+
+    with EXCEL_CACHE["lock"]:
+        if cache_key not in EXCEL_CACHE["entries"]:
+            EXCEL_CACHE["entries"][cache_key] = data
+            EXCEL_CACHE["bytes"] += len(data)
+        while EXCEL_CACHE["bytes"] > EXCEL_CACHE_MAX_BYTES:
+            _, evicted = EXCEL_CACHE["entries"].popitem(last=False)
+            EXCEL_CACHE["bytes"] -= len(evicted)
+
+    return data
+
+def transactions_frame_to_records(df):
+    return df.to_dict(orient="records")
+
+def intern_codes(values, registry=()):
+    values = pd.Series(values, dtype=object)
+    present = values[values.notna()]
+    names = list(registry) + pd.unique(present[~present.isin(registry)]).tolist()
+    return pd.Categorical(values, categories=names).codes, names
+
+def decode_codes(codes, names):
+    return np.append(np.asarray(names, dtype=object), None)[codes]
+
+def to_date_array(values):
+    return pd.to_datetime(pd.Series(values, dtype=object), errors="coerce").to_numpy(dtype="datetime64[D]")
+
+def build_transaction_store(df):
+    n_rows = len(df)
+    legs = pd.concat([df[akun_col] for akun_col, _, _ in JOURNAL_LEGS], ignore_index=True)
+    akun, accounts = intern_codes(legs.mask(legs == ""), DEBIT_CHOICES)
+    sheet, sheets = intern_codes(df["Source_Sheet"], MAIN_SHEETS)
+    partner, partners = intern_codes(df["Customer"].mask(df["Customer"] == ""))
+
+    return {
+        "id": df["id"].to_numpy(dtype="int64"),
+        "waktu": to_date_array(df["Waktu"]),
+        "deskripsi": df["Deskripsi"].to_numpy(dtype=object),
+        "sheet": sheet, "sheets": sheets,
+        "partner": partner, "partners": partners,
+        "akun": akun.reshape(len(JOURNAL_LEGS), n_rows), "accounts": accounts,
+        "nominal": np.vstack([df[nominal_col].to_numpy(dtype="int64") for _, nominal_col, _ in JOURNAL_LEGS]),
+    }
+
+def fetch_transaction_store(db_path, sheet_names, period=None):
+    df = fetch_transactions_frame(db_path, sheet_names, period)
+    return build_transaction_store(df) if df is not None else None
+
+def store_account_totals(store):
+    accounts = store["accounts"]
+    totals = np.zeros((len(accounts), 2), dtype="int64")
+    for (_, _, side), akun, nominal in zip(JOURNAL_LEGS, store["akun"], store["nominal"]):
+        has_akun = akun >= 0
+        np.add.at(totals[:, 0 if side == "Debit" else 1], akun[has_akun], nominal[has_akun])
+    return pd.DataFrame(totals, index=pd.Index(accounts, name="Akun"), columns=["Debit", "Kredit"])
+
+def store_ledger_lines(store, akun_name=None):
+    n_legs, n_rows = store["akun"].shape
+    akun = store["akun"].ravel()
+    nominal = store["nominal"].ravel()
+    is_debit = np.repeat([side == "Debit" for _, _, side in JOURNAL_LEGS], n_rows)
+
+    keep = akun >= 0
+    if akun_name is not None:
+        keep &= akun == (store["accounts"].index(akun_name) if akun_name in store["accounts"] else -2)
+
+    lines = pd.DataFrame({
+        "row": np.tile(np.arange(n_rows), n_legs)[keep], "akun": akun[keep],
+        "Debit": np.where(is_debit, nominal, 0)[keep], "Kredit": np.where(is_debit, 0, nominal)[keep],
+    }).groupby(["row", "akun"], sort=True).sum().reset_index()
+
+    rows = lines["row"].to_numpy()
+    return pd.DataFrame({
+        "Akun": decode_codes(lines["akun"].to_numpy(), store["accounts"]),
+        "id": store["id"][rows],
+        "Waktu": np.datetime_as_string(store["waktu"][rows], unit="D"),
+        "Deskripsi": store["deskripsi"][rows],
+        "Source_Sheet": decode_codes(store["sheet"][rows], store["sheets"]),
+        "Debit": lines["Debit"].to_numpy(), "Kredit": lines["Kredit"].to_numpy(),
+    }, columns=LEDGER_LINE_COLUMNS)
+
+def empty_transactions_frame():
+    df = pd.DataFrame(columns=TRANSACTION_COLUMNS)
+    df[TRANSACTION_NOMINAL_COLUMNS] = df[TRANSACTION_NOMINAL_COLUMNS].astype("int64")
+    df[["id", "Row_Index"]] = df[["id", "Row_Index"]].astype("int64")
+    return df
+
+def strip_waktu_time(values):
+    waktu = values.astype(str)
+    has_time = waktu.str.contains(' ', regex=False)
+    if has_time.any():
+        waktu = waktu.where(~has_time, waktu.str.split(' ', n=1).str[0])
+    return waktu
+
+def safe_float_series(values):
+    numeric = pd.to_numeric(values, errors='coerce').astype("float64")
+    unparsed = numeric.isna() & values.notna()
+    if unparsed.any():
+        cleaned = values[unparsed].astype(str).str.replace('.', '', regex=False).str.replace(',', '.', regex=False).str.strip()
+        numeric[unparsed] = pd.to_numeric(cleaned, errors='coerce')
+    return numeric.fillna(0.0)
+
+def safe_rupiah_series(values):
+    if pd.api.types.is_integer_dtype(values):
+        return values.astype("int64")
+    numeric = safe_float_series(values)
+    return (np.sign(numeric) * np.floor(numeric.abs() + 0.5)).astype("int64")
+
+def fetch_transactions_frame(db_path, sheet_names, period=None):
+    try:
+        conn = get_db_connection(db_path)
+    except Exception:
+        return None
+
+    placeholders = ', '.join(['?' for _ in sheet_names])
+    period_sql, period_params = get_period_filter_sql(period)
+    query_base = f"""
+        SELECT * FROM {TABLE_NAME}
+        WHERE Source_Sheet IN ({placeholders}){period_sql}
+        ORDER BY Waktu, id
+    """
+
+    try:
+        df = pd.read_sql_query(query_base, conn, params=list(sheet_names) + period_params)
+    except Exception as e:
+        if "no such table" not in str(e):
+            raise
+        return None
+    finally:
+        conn.close()
+
+    return prepare_transactions_frame(df)
+
+def prepare_transactions_frame(df):
+    if df.empty:
+        return empty_transactions_frame()
+
+    df = df.rename(columns={"Customer_Supplier": "Customer"})
+    df["Waktu"] = strip_waktu_time(df["Waktu"])
+    df["Metode"] = df["Metode"].where(df["Source_Sheet"] != "Saldo_Awal", "SALDO AWAL")
+    for col in TRANSACTION_NOMINAL_COLUMNS:
+        df[col] = safe_rupiah_series(df[col])
+    df["id"] = df["id"].astype("int64")
+    df["Row_Index"] = df["id"]
+
+    return df[TRANSACTION_COLUMNS].reset_index(drop=True)
+
+def get_saldo_normal_multiplier(akun_names):
+    return pd.Series(np.where(pd.Index(akun_names).isin(AKUN_SALDO_NORMAL_KREDIT), -1, 1), index=akun_names)
+
+def build_account_totals(transactions):
+    df = pd.DataFrame(transactions)
+    if df.empty:
+        df = empty_transactions_frame()
+    return store_account_totals(build_transaction_store(df))
+
+def get_period_lines_sql(placeholders, period_sql):
+    return f"""
+        SELECT l.account AS Akun,
+               CASE WHEN l.side = 'D' THEN l.amount ELSE 0 END AS Debit,
+               CASE WHEN l.side = 'K' THEN l.amount ELSE 0 END AS Kredit
+        FROM {TABLE_NAME} j
+        JOIN {JOURNAL_LINES_TABLE_NAME} l ON l.entry_id = j.id
+        WHERE j.Source_Sheet IN ({placeholders}){period_sql}
+    """
+
+def fetch_account_totals(db_path, sheet_names, period=None):
+    placeholders = ', '.join(['?' for _ in sheet_names])
+    conn = get_db_connection(db_path)
+    try:
+        if period is None:
+            query = f"""
+                SELECT account AS Akun, SUM(debit) AS Debit, SUM(kredit) AS Kredit
+                FROM {ACCOUNT_BALANCES_TABLE_NAME}
+                WHERE source_sheet IN ({placeholders})
+                GROUP BY account
+            """
+            params = list(sheet_names)
+        else:
+            closing_end = get_latest_period_closing(conn, period[1]) if period[0] is None else None
+            period_sql, period_params = get_period_filter_sql(period, "j.Waktu")
+            if closing_end:
+                query = f"""
+                    SELECT Akun, SUM(Debit) AS Debit, SUM(Kredit) AS Kredit FROM (
+                        SELECT account AS Akun, debit AS Debit, kredit AS Kredit
+                        FROM {CLOSING_ACCOUNT_BALANCES_TABLE_NAME}
+                        WHERE period_end = ? AND source_sheet IN ({placeholders})
+                        UNION ALL
+                        {get_period_lines_sql(placeholders, " AND j.Waktu > ?" + period_sql)}
+                    )
+                    GROUP BY Akun
+                """
+                params = [closing_end] + list(sheet_names) + list(sheet_names) + [closing_end] + period_params
+            else:
+                query = f"""
+                    SELECT Akun, SUM(Debit) AS Debit, SUM(Kredit) AS Kredit
+                    FROM ({get_period_lines_sql(placeholders, period_sql)})
+                    GROUP BY Akun
+                """
+                params = list(sheet_names) + period_params
+
+        df = pd.read_sql_query(query, conn, params=params)
+    except Exception as e:
+        if "no such table" not in str(e):
+            raise
+        return None
+    finally:
+        conn.close()
+
+    totals = df.set_index("Akun")[["Debit", "Kredit"]].fillna(0).astype("int64")
+    return totals.reindex(totals.index.union(pd.Index(GENERAL_LEDGER_ACCOUNTS), sort=False), fill_value=0)
+
+def get_latest_period_closing(conn, as_of=None):
+    if as_of:
+        row = conn.execute(f"SELECT MAX(period_end) FROM {PERIOD_CLOSINGS_TABLE_NAME} WHERE period_end <= ?", (as_of,)).fetchone()
+    else:
+        row = conn.execute(f"SELECT MAX(period_end) FROM {PERIOD_CLOSINGS_TABLE_NAME}").fetchone()
+    return row[0] if row else None
+
+def get_period_end_date(value, jenis_periode):
+    offset = pd.offsets.YearEnd(0) if jenis_periode == "Tahunan" else pd.offsets.MonthEnd(0)
+    return normalize_waktu(pd.Timestamp(value) + offset)
+
+def close_period(db_path, period_end):
+    period_end = normalize_waktu(period_end)
+    conn = get_db_connection(db_path)
+    try:
+        c = conn.cursor()
+        c.execute("BEGIN IMMEDIATE")
+        previous_end = get_latest_period_closing(conn)
+        if previous_end and period_end <= previous_end:
+            raise ValueError(f"Periode s.d. {previous_end} sudah ditutup.")
+        invalid_count = c.execute(f"SELECT COUNT(*) FROM ({get_invalid_waktu_sql()})").fetchone()[0]
+        if invalid_count:
+            raise ValueError(f"{invalid_count} baris jurnal/inventory tanpa tanggal yang valid; hapus dan catat ulang baris tersebut (lihat verify-balances) sebelum menutup periode.")
+
+        c.execute(f"""
+            INSERT INTO {CLOSING_ACCOUNT_BALANCES_TABLE_NAME} (period_end, account, source_sheet, debit, kredit)
+            SELECT ?, account, source_sheet, SUM(debit), SUM(kredit) FROM (
+                SELECT account, source_sheet, debit, kredit
+                FROM {CLOSING_ACCOUNT_BALANCES_TABLE_NAME}
+                WHERE period_end = ?
+                UNION ALL
+                SELECT l.account, COALESCE(j.Source_Sheet, ''),
+                       CASE WHEN l.side = 'D' THEN l.amount ELSE 0 END,
+                       CASE WHEN l.side = 'K' THEN l.amount ELSE 0 END
+                FROM {TABLE_NAME} j
+                JOIN {JOURNAL_LINES_TABLE_NAME} l ON l.entry_id = j.id
+                WHERE j.Waktu > ? AND j.Waktu <= ?
+            )
+            GROUP BY account, source_sheet
+        """, (period_end, previous_end or "", previous_end or "", period_end))
+
+        c.execute(f"""
+            INSERT INTO {CLOSING_INVENTORY_STATE_TABLE_NAME} (period_end, kategori, saldo_ekor, saldo_total)
+            SELECT ?, kategori, SUM(saldo_ekor), SUM(saldo_total) FROM (
+                SELECT kategori, saldo_ekor, saldo_total
+                FROM {CLOSING_INVENTORY_STATE_TABLE_NAME}
+                WHERE period_end = ?
+                UNION ALL
+                SELECT kategori, saldo_ekor, saldo_total FROM ({get_inventory_totals_sql(" AND Waktu > ? AND Waktu <= ?")})
+            )
+            GROUP BY kategori
+        """, (period_end, previous_end or "", previous_end or "", period_end))
+
+        c.execute(f"INSERT INTO {PERIOD_CLOSINGS_TABLE_NAME} (period_end, closed_at) VALUES (?, ?)", (period_end, datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    bump_data_version(db_path)
+    return period_end
+
+def reopen_period(db_path, period_end):
+    conn = get_db_connection(db_path)
+    try:
+        c = conn.cursor()
+        c.execute("BEGIN IMMEDIATE")
+        c.execute(f"DELETE FROM {CLOSING_ACCOUNT_BALANCES_TABLE_NAME} WHERE period_end >= ?", (period_end,))
+        c.execute(f"DELETE FROM {CLOSING_INVENTORY_STATE_TABLE_NAME} WHERE period_end >= ?", (period_end,))
+        c.execute(f"DELETE FROM {PERIOD_CLOSINGS_TABLE_NAME} WHERE period_end >= ?", (period_end,))
+        reopened_count = c.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    bump_data_version(db_path)
+    return reopened_count
+
+def load_period_closings(db_path):
+    conn = get_db_connection(db_path)
+    try:
+        return pd.read_sql_query(f"SELECT period_end, closed_at FROM {PERIOD_CLOSINGS_TABLE_NAME} ORDER BY period_end", conn)
+    finally:
+        conn.close()
+
+def fetch_inventory_state_as_of(db_path, as_of):
+    conn = get_db_connection(db_path)
+    try:
+        closing_end = get_latest_period_closing(conn, as_of)
+        query = f"""
+            SELECT kategori, SUM(saldo_ekor) AS saldo_ekor, SUM(saldo_total) AS saldo_total FROM (
+                SELECT kategori, saldo_ekor, saldo_total
+                FROM {CLOSING_INVENTORY_STATE_TABLE_NAME}
+                WHERE period_end = ?
+                UNION ALL
+                SELECT kategori, saldo_ekor, saldo_total FROM ({get_inventory_totals_sql(" AND Waktu > ? AND Waktu <= ?")})
+            )
+            GROUP BY kategori
+            ORDER BY kategori
+        """
+        return pd.read_sql_query(query, conn, params=[closing_end or "", closing_end or "", as_of])
+    finally:
+        conn.close()
+
+LEDGER_LINE_COLUMNS = ["Akun", "id", "Waktu", "Deskripsi", "Source_Sheet", "Debit", "Kredit"]
+LEDGER_ENTRY_COLUMNS = ["Waktu", "Deskripsi", "Debit", "Kredit", "Saldo Akhir", "Source_Sheet", "Row_Index", "Tipe_Entry", "SA_Detail_IDs"]
+
+def build_general_ledger(ledger_lines, opening_balances=None, period_before=None):
+    debit = ledger_lines["Debit"].astype("int64")
+    kredit = ledger_lines["Kredit"].astype("int64")
+    is_counted = (debit > 0) | (kredit > 0)
+    is_saldo_awal = ledger_lines["Source_Sheet"] == "Saldo_Awal"
+
+    lines = ledger_lines[is_counted][["Akun", "id", "Waktu", "Deskripsi", "Source_Sheet"]].assign(
+        Debit=debit[is_counted], Kredit=kredit[is_counted],
+        Phase=np.where(is_saldo_awal[is_counted], 1, 2),
+        Row_Index=ledger_lines["id"][is_counted], Tipe_Entry="Transaksi Normal", SA_Detail_IDs=None
+    )
+    lines["Signed"] = (lines["Debit"] - lines["Kredit"]) * get_saldo_normal_multiplier(lines["Akun"]).to_numpy()
+
+    carried = pd.Series(dtype="int64")
+    if opening_balances is not None:
+        carried = opening_balances[opening_balances != 0]
+    if not carried.empty:
+        carried_rows = pd.DataFrame({
+            "Akun": carried.index, "id": -1, "Waktu": "Awal Periode",
+            "Deskripsi": f"Saldo s.d. {format_period_date(period_before[1] if period_before else None)}",
+            "Source_Sheet": "", "Debit": 0, "Kredit": 0, "Phase": 0, "Row_Index": -1,
+            "Tipe_Entry": "Saldo Periode Sebelumnya", "SA_Detail_IDs": "", "Signed": carried.to_numpy()
+        })
+        lines = pd.concat([carried_rows, lines], ignore_index=True) if not lines.empty else carried_rows
+
+    if lines.empty:
+        return pd.DataFrame(columns=["Akun"] + LEDGER_ENTRY_COLUMNS)
+
+    account_order = pd.Index(GENERAL_LEDGER_ACCOUNTS).get_indexer(lines["Akun"])
+    lines["Akun_Order"] = np.where(account_order < 0, len(GENERAL_LEDGER_ACCOUNTS), account_order)
+    lines = lines.sort_values(["Akun_Order", "Akun", "Phase"], kind="stable")
+    lines["Saldo Akhir"] = lines.groupby("Akun", sort=False)["Signed"].cumsum()
+
+    parts = [lines[lines["Phase"] != 1]]
+
+    saldo_awal_lines = lines[lines["Phase"] == 1]
+    if not saldo_awal_lines.empty:
+        has_debit = saldo_awal_lines["Debit"] > 0
+        has_kredit = saldo_awal_lines["Kredit"] > 0
+        id_repeats = has_debit.astype(int) + has_kredit.astype(int)
+        by_account = saldo_awal_lines.groupby("Akun", sort=False)
+        saldo_awal_rows = pd.DataFrame({
+            "Debit": saldo_awal_lines["Debit"].where(has_debit, 0).groupby(saldo_awal_lines["Akun"], sort=False).sum(),
+            "Kredit": saldo_awal_lines["Kredit"].where(has_kredit, 0).groupby(saldo_awal_lines["Akun"], sort=False).sum(),
+            "Saldo Akhir": by_account["Saldo Akhir"].last(),
+            "Akun_Order": by_account["Akun_Order"].first(),
+            "SA_Detail_IDs": saldo_awal_lines["id"].astype(str).repeat(id_repeats).groupby(saldo_awal_lines["Akun"].repeat(id_repeats), sort=False).agg(",".join),
+        })
+        saldo_awal_rows["SA_Detail_IDs"] = saldo_awal_rows["SA_Detail_IDs"].fillna("")
+        saldo_sebelumnya = carried.reindex(saldo_awal_rows.index, fill_value=0)
+        saldo_awal_rows = saldo_awal_rows[saldo_awal_rows["Saldo Akhir"] != saldo_sebelumnya]
+        parts.append(saldo_awal_rows.rename_axis("Akun").reset_index().assign(
+            Waktu="Awal Periode", Deskripsi="Saldo Awal", Source_Sheet="Saldo_Awal",
+            Row_Index=-1, Tipe_Entry="Saldo Awal Total", Phase=1
+        ))
+
+    ledger = pd.concat([part for part in parts if not part.empty], ignore_index=True)
+    ledger = ledger.sort_values(["Akun_Order", "Akun", "Phase"], kind="stable")
+    ledger["Row_Index"] = ledger["Row_Index"].astype("int64")
+    return ledger[["Akun"] + LEDGER_ENTRY_COLUMNS].reset_index(drop=True)
+
+def format_journal_entries(raw_data, skip_saldo_awal=True):
+    formatted_journal = []
+
+    for transaction in raw_data:
+        if skip_saldo_awal and transaction["Source_Sheet"] == "Saldo_Awal":
+            continue
+
+        waktu = transaction["Waktu"]
+        deskripsi = transaction["Deskripsi"]
+        sort_key = str(waktu)
+        row_index = transaction["Row_Index"] 
+
+        if transaction["D1_Nominal"] > 0 and transaction["D1_Akun"]:
+            keterangan = f"{transaction['D1_Akun']} ({deskripsi})"
+            formatted_journal.append({
+                "Waktu": waktu,
+                "Keterangan": keterangan,
+                "Debit": transaction["D1_Nominal"],
+                "Kredit": 0.0,
+                "Sort_Key": sort_key,
+                "Row_Index": row_index
+            })
+
+        if transaction["D2_Nominal"] > 0 and transaction["D2_Akun"]:
+            formatted_journal.append({
+                "Waktu": "",
+                "Keterangan": transaction["D2_Akun"],
+                "Debit": transaction["D2_Nominal"],
+                "Kredit": 0.0,
+                "Sort_Key": sort_key,
+                "Row_Index": row_index
+            })
+
+        if transaction["K1_Nominal"] > 0 and transaction["K1_Akun"]:
+            keterangan = f"    {transaction['K1_Akun']}"
+            formatted_journal.append({
+                "Waktu": "",
+                "Keterangan": keterangan,  
+                "Debit": 0.0,
+                "Kredit": transaction["K1_Nominal"],
+                "Sort_Key": sort_key,
+                "Row_Index": row_index
+            })
+
+        if transaction["K2_Nominal"] > 0 and transaction["K2_Akun"]:
+            formatted_journal.append({
+                "Waktu": "",
+                "Keterangan": f"    {transaction['K2_Akun']}",  
+                "Debit": 0.0,
+                "Kredit": transaction["K2_Nominal"],
+                "Sort_Key": sort_key,
+                "Row_Index": row_index
+            })
+
+    formatted_journal.sort(key=lambda x: str(x["Sort_Key"]))
+    return formatted_journal
+
+PAGE_SIZE_CHOICES = [25, 50, 100, 200]
+LEDGER_PAGE_SHEETS = [sheet for sheet in MAIN_SHEETS if sheet != "Saldo_Awal"]
+KEYSET_DIRECTIONS = {"next": (">", "ASC"), "prev": ("<", "DESC")}
+
+def get_keyset_filter_sql(key, direction, waktu_column="Waktu", id_column="id"):
+    operator, order = KEYSET_DIRECTIONS[direction]
+    order_sql = f" ORDER BY {waktu_column} {order}, {id_column} {order}"
+    if key is None:
+        return "", [], order_sql
+    return f" AND ({waktu_column}, {id_column}) {operator} (?, ?)", [key[0], key[1]], order_sql
+
+def read_keyset_page(db_path, query, params, direction):
+    conn = get_db_connection(db_path)
+    try:
+        df = pd.read_sql_query(query, conn, params=params)
+    except Exception as e:
+        if "no such table" not in str(e):
+            raise
+        return None
+    finally:
+        conn.close()
+    if direction == "prev":
+        df = df.iloc[::-1]
+    return df.reset_index(drop=True)
+
+def fetch_journal_page(db_path, sheet_names, period=None, key=None, direction="next", limit=PAGE_SIZE_CHOICES[1]):
+    placeholders = ', '.join(['?' for _ in sheet_names])
+    period_sql, period_params = get_period_filter_sql(period)
+    keyset_sql, keyset_params, order_sql = get_keyset_filter_sql(key, direction)
+    query = f"""
+        SELECT * FROM {TABLE_NAME}
+        WHERE Source_Sheet IN ({placeholders}){period_sql}{keyset_sql}
+        {order_sql}
+        LIMIT ?
+    """
+    return read_keyset_page(db_path, query, list(sheet_names) + period_params + keyset_params + [limit], direction)
+
+def fetch_ledger_page(db_path, akun_name, period=None, key=None, direction="next", limit=PAGE_SIZE_CHOICES[1]):
+    placeholders = ', '.join(['?' for _ in LEDGER_PAGE_SHEETS])
+    period_sql, period_params = get_period_filter_sql(period, "l.waktu")
+    keyset_sql, keyset_params, order_sql = get_keyset_filter_sql(key, direction, "l.waktu", "l.entry_id")
+    query = f"""
+        SELECT l.waktu AS Waktu, l.entry_id AS id, j.Deskripsi, j.Source_Sheet,
+               SUM(CASE WHEN l.side = 'D' THEN l.amount ELSE 0 END) AS Debit,
+               SUM(CASE WHEN l.side = 'K' THEN l.amount ELSE 0 END) AS Kredit
+        FROM {JOURNAL_LINES_TABLE_NAME} l
+        JOIN {TABLE_NAME} j ON j.id = l.entry_id
+        WHERE l.account = ? AND j.Source_Sheet IN ({placeholders}){period_sql}{keyset_sql}
+        GROUP BY l.waktu, l.entry_id
+        HAVING Debit > 0 OR Kredit > 0
+        {order_sql}
+        LIMIT ?
+    """
+    return read_keyset_page(db_path, query, [akun_name] + LEDGER_PAGE_SHEETS + period_params + keyset_params + [limit], direction)
+
+def fetch_rollup_account_totals(db_path, akun_name, start_date, before_date):
+    start_sql, start_params = get_period_filter_sql(make_period(start_date, None), "waktu")
+    conn = get_db_connection(db_path)
+    try:
+        row = conn.execute(f"""
+            SELECT COALESCE(SUM(debit), 0), COALESCE(SUM(kredit), 0) FROM {DAILY_ROLLUP_TABLE_NAME}
+            WHERE account = ? AND waktu < ?{start_sql}
+        """, [akun_name, before_date] + start_params).fetchone()
+    finally:
+        conn.close()
+    return int(row[0]), int(row[1])
+
+def fetch_keyset_page(fetch, key, direction, page_size, id_column="id"):
+    rows = fetch(key, direction, page_size + 1)
+    has_more = len(rows) > page_size
+    if has_more:
+        rows = rows.iloc[1:] if direction == "prev" else rows.iloc[:page_size]
+    rows = rows.reset_index(drop=True)
+
+    get_key = lambda i: (rows["Waktu"].iloc[i], int(rows[id_column].iloc[i]))
+    first_key = get_key(0) if not rows.empty else key
+    last_key = get_key(-1) if not rows.empty else key
+    has_prev = has_more if direction == "prev" else first_key is not None and not fetch(first_key, "prev", 1).empty
+    has_next = has_more if direction == "next" else last_key is not None and not fetch(last_key, "next", 1).empty
+    return {"rows": rows, "first_key": first_key, "last_key": last_key, "has_prev": has_prev, "has_next": has_next}
+
+def slice_frame_page(frame, key, direction, limit, id_column="Row_Index"):
+    if key is not None:
+        waktu = frame["Waktu"].astype(str)
+        if direction == "next":
+            frame = frame[(waktu > key[0]) | ((waktu == key[0]) & (frame[id_column] > key[1]))]
+        else:
+            frame = frame[(waktu < key[0]) | ((waktu == key[0]) & (frame[id_column] < key[1]))]
+    return frame.tail(limit) if direction == "prev" else frame.head(limit)
+
+def build_ledger_page_rows(page_lines, akun_name, opening):
+    signed = (page_lines["Debit"] - page_lines["Kredit"]) * int(get_saldo_normal_multiplier([akun_name]).iloc[0])
+    return pd.DataFrame({
+        "Waktu": strip_waktu_time(page_lines["Waktu"]), "Deskripsi": page_lines["Deskripsi"],
+        "Debit": page_lines["Debit"].astype("int64"), "Kredit": page_lines["Kredit"].astype("int64"),
+        "Saldo Akhir": opening + signed.cumsum().astype("int64"), "Source_Sheet": page_lines["Source_Sheet"],
+        "Row_Index": page_lines["id"].astype("int64"), "Tipe_Entry": "Transaksi Normal", "SA_Detail_IDs": None,
+    }, columns=LEDGER_ENTRY_COLUMNS)
+
+def fetch_daily_trends(db_path, period=None):
+    start_date, end_date = period or (None, None)
+    period_sql, period_params = get_period_filter_sql(period, "waktu")
+    tail_sql, tail_params = get_period_filter_sql((start_date, None), "waktu")
+    placeholders = ', '.join(['?' for _ in TREND_ACCOUNTS])
+
+    conn = get_db_connection(db_path)
+    try:
+        rollup = pd.read_sql_query(
+            f"SELECT account, waktu, debit, kredit FROM {DAILY_ROLLUP_TABLE_NAME} WHERE account IN ({placeholders}) AND waktu != ''{period_sql}",
+            conn, params=TREND_ACCOUNTS + period_params
+        )
+        herd = pd.read_sql_query(
+            f"SELECT waktu, SUM(ekor) AS ekor FROM {DAILY_INVENTORY_ROLLUP_TABLE_NAME} WHERE waktu != ''{period_sql} GROUP BY waktu",
+            conn, params=period_params
+        )
+        # Saldo awal = saldo berjalan dikurangi mutasi sejak tanggal awal, supaya tidak membaca seluruh riwayat.
+        opening_kas = conn.execute(f"""
+            SELECT (SELECT COALESCE(SUM(debit - kredit), 0) FROM {ACCOUNT_BALANCES_TABLE_NAME} WHERE account = 'Kas')
+                 - (SELECT COALESCE(SUM(debit - kredit), 0) FROM {DAILY_ROLLUP_TABLE_NAME} WHERE account = 'Kas' AND waktu != ''{tail_sql})
+        """, tail_params).fetchone()[0]
+        opening_ekor = conn.execute(f"""
+            SELECT (SELECT COALESCE(SUM(saldo_ekor), 0) FROM {INVENTORY_STATE_TABLE_NAME})
+                 - (SELECT COALESCE(SUM(ekor), 0) FROM {DAILY_INVENTORY_ROLLUP_TABLE_NAME} WHERE waktu != ''{tail_sql})
+        """, tail_params).fetchone()[0]
+    except Exception as e:
+        if "no such table" not in str(e):
+            raise
+        return None
+    finally:
+        conn.close()
+
+    return build_daily_trends(rollup, herd, opening_kas, opening_ekor, period)
+
+def build_daily_trends(rollup, herd, opening_kas=0, opening_ekor=0, period=None):
+    start_date, end_date = period or (None, None)
+    dates = pd.concat([rollup["waktu"], herd["waktu"]])
+    start_date = start_date or dates.min()
+    end_date = end_date or dates.max()
+    if pd.isna(start_date) or pd.isna(end_date):
+        return pd.DataFrame(columns=["Tanggal", "Saldo Kas", "Penjualan", "Laba Kotor", "Jumlah Ternak"])
+
+    days = pd.date_range(start_date, end_date, freq="D")
+    mutasi = (
+        rollup.assign(net=rollup["debit"] - rollup["kredit"])
+        .pivot_table(index="waktu", columns="account", values="net", aggfunc="sum")
+        .reindex(columns=TREND_ACCOUNTS, fill_value=0)
+    )
+    mutasi.index = pd.to_datetime(mutasi.index)
+    mutasi = mutasi.reindex(days, fill_value=0).fillna(0).astype("int64")
+    ekor = herd.set_index(pd.to_datetime(herd["waktu"]))["ekor"].reindex(days, fill_value=0).astype("int64")
+
+    penjualan = -mutasi["Penjualan"]
+    return pd.DataFrame({
+        "Tanggal": days,
+        "Saldo Kas": int(opening_kas) + mutasi["Kas"].cumsum(),
+        "Penjualan": penjualan,
+        "Laba Kotor": penjualan - mutasi["HPP"],
+        "Jumlah Ternak": int(opening_ekor) + ekor.cumsum(),
+    }).reset_index(drop=True)
+
+SUBLEDGER_SPECS = {
+    'BB_PIUTANG': {
+        "akun": "Piutang usaha", "label": "Piutang", "mitra": "Customer", "sisi_bertambah": "Debit",
+        "title": "🤝 Kartu Piutang Usaha (Per Customer)",
+        "saldo_awal_leg": ("D1_Akun", "D1_Nominal"),
+        "bertambah": ("Penjualan", [("D1_Akun", "D1_Nominal")]),
+        "berkurang": ("Lain-lain", [("K1_Akun", "K1_Nominal"), ("K2_Akun", "K2_Nominal")]),
+    },
+    'BB_UTANG': {
+        "akun": "Utang usaha", "label": "Utang", "mitra": "Supplier", "sisi_bertambah": "Kredit",
+        "title": "💸 Kartu Utang Usaha (Per Supplier)",
+        "saldo_awal_leg": ("K1_Akun", "K1_Nominal"),
+        "bertambah": ("Pembelian", [("K1_Akun", "K1_Nominal")]),
+        "berkurang": ("Lain-lain", [("D1_Akun", "D1_Nominal"), ("D2_Akun", "D2_Nominal")]),
+    },
+}
+AGING_BUCKETS = ["0-30 hari", "31-60 hari", "61-90 hari", ">90 hari"]
+
+def sum_subledger_legs(df, akun, sheet_legs):
+    sheet_name, legs = sheet_legs
+    is_sheet = df["Source_Sheet"] == sheet_name
+    amount = pd.Series(0, index=df.index, dtype="int64")
+    for akun_col, nominal_col in legs:
+        amount += df[nominal_col].where(is_sheet & (df[akun_col] == akun), 0)
+    return amount
+
+def build_partner_subledgers(transactions_df, akun_type, period=None):
+    spec = SUBLEDGER_SPECS[akun_type]
+    akun = spec["akun"]
+    sisi_berkurang = "Kredit" if spec["sisi_bertambah"] == "Debit" else "Debit"
+    df = transactions_df
+    partner = df["Customer"]
+    has_partner = partner.notna() & (partner.astype(str) != "")
+    is_saldo_awal = df["Source_Sheet"] == "Saldo_Awal"
+    sa_akun_col, sa_nominal_col = spec["saldo_awal_leg"]
+
+    touches_akun = df[[akun_col for akun_col, _, _ in JOURNAL_LEGS]].eq(akun).any(axis=1)
+    is_member = has_partner & ((~is_saldo_awal & touches_akun) | (is_saldo_awal & (df[sa_akun_col] == akun)))
+    partners = sorted(partner[is_member].unique())
+
+    bertambah = sum_subledger_legs(df, akun, spec["bertambah"])
+    berkurang = sum_subledger_legs(df, akun, spec["berkurang"])
+    is_mutasi = has_partner & ~is_saldo_awal & ((bertambah > 0) | (berkurang > 0))
+    is_sa_partner = has_partner & is_saldo_awal & (df[sa_akun_col] == akun)
+
+    sa_lines = pd.DataFrame({
+        "Partner": partner[is_sa_partner], "Waktu": df["Waktu"][is_sa_partner],
+        "Bertambah": df[sa_nominal_col][is_sa_partner], "Berkurang": 0, "Phase": 0,
+        "id": df["id"][is_sa_partner],
+    })
+    mutasi_lines = pd.DataFrame({
+        "Partner": partner[is_mutasi], "Waktu": df["Waktu"][is_mutasi],
+        "Bertambah": bertambah[is_mutasi], "Berkurang": berkurang[is_mutasi], "Phase": 2,
+        "id": df["id"][is_mutasi],
+    })
+
+    saldo_awal = sa_lines.groupby("Partner", sort=False).agg(
+        Bertambah=("Bertambah", "sum"), SA_Detail_IDs=("id", lambda ids: ",".join(ids.astype(str)))
+    )
+    ledger = pd.concat([
+        saldo_awal.reset_index().assign(
+            Waktu="Awal Periode", Deskripsi="Saldo Awal", Source_Sheet="Saldo_Awal", Row_Index=-1,
+            Tipe_Entry="Saldo Awal Total", Berkurang=0, Phase=0
+        ),
+        mutasi_lines.drop(columns=["id"]).assign(
+            Deskripsi=df["Deskripsi"][is_mutasi], Source_Sheet=df["Source_Sheet"][is_mutasi],
+            Row_Index=df["Row_Index"][is_mutasi], Tipe_Entry="Transaksi Normal", SA_Detail_IDs=None
+        ),
+    ], ignore_index=True)
+    ledger = ledger.sort_values(["Partner", "Phase"], kind="stable")
+    ledger["Saldo Akhir"] = (ledger["Bertambah"] - ledger["Berkurang"]).groupby(ledger["Partner"], sort=False).cumsum()
+    ledger = ledger[(ledger["Phase"] != 0) | (ledger["Bertambah"] != 0)]
+
+    if period and period[0]:
+        is_before = (ledger["Phase"] == 2) & (ledger["Waktu"].astype(str) < period[0])
+        if is_before.any():
+            by_partner = ledger[is_before].groupby("Partner", sort=False)
+            folded = pd.DataFrame({
+                "Bertambah": by_partner["Bertambah"].sum(), "Berkurang": by_partner["Berkurang"].sum(),
+                "Saldo Akhir": by_partner["Saldo Akhir"].last(),
+            }).reset_index().assign(
+                Waktu="Awal Periode", Deskripsi=f"Mutasi s.d. {format_period_date(get_period_before(period)[1])}",
+                Source_Sheet="", Row_Index=-1, Tipe_Entry="Saldo Periode Sebelumnya", SA_Detail_IDs="", Phase=1
+            )
+            ledger = pd.concat([ledger[~is_before], folded], ignore_index=True)
+            ledger = ledger.sort_values(["Partner", "Phase"], kind="stable")
+
+    ledger = ledger.rename(columns={"Bertambah": spec["sisi_bertambah"], "Berkurang": sisi_berkurang})
+    ledger["Row_Index"] = ledger["Row_Index"].astype("int64")
+    ledgers = {
+        name: entries[LEDGER_ENTRY_COLUMNS].reset_index(drop=True)
+        for name, entries in ledger.groupby("Partner", sort=False)
+    }
+
+    as_of = pd.Timestamp(period[1]) if period and period[1] else pd.Timestamp.today().normalize()
+    tagihan = pd.concat([sa_lines, mutasi_lines[mutasi_lines["Bertambah"] > 0]]).sort_values(["Partner", "Phase"], kind="stable")
+    total_berkurang = mutasi_lines.groupby("Partner", sort=False)["Berkurang"].sum().reindex(tagihan["Partner"], fill_value=0).to_numpy()
+    kumulatif = tagihan.groupby("Partner", sort=False)["Bertambah"].cumsum().to_numpy()
+    tagihan["Sisa"] = np.minimum(tagihan["Bertambah"].to_numpy(), np.maximum(kumulatif - total_berkurang, 0))
+    umur = (as_of - pd.to_datetime(tagihan["Waktu"], errors="coerce")).dt.days.fillna(0)
+    tagihan["Umur"] = pd.cut(umur, [-np.inf, 30, 60, 90, np.inf], labels=AGING_BUCKETS)
+
+    aging = tagihan.pivot_table(index="Partner", columns="Umur", values="Sisa", aggfunc="sum", observed=False)
+    aging = aging.reindex(index=partners, columns=AGING_BUCKETS).fillna(0).astype("int64")
+    aging.columns = list(AGING_BUCKETS)
+    aging["Total"] = aging[AGING_BUCKETS].sum(axis=1)
+    aging["Saldo Akhir"] = pd.Series({name: entries["Saldo Akhir"].iloc[-1] for name, entries in ledgers.items()}, dtype="int64").reindex(partners, fill_value=0)
+    aging = aging.rename_axis(spec["mitra"]).reset_index()
+
+    return {"partners": partners, "ledgers": ledgers, "aging": aging}
+
+STOCK_CARD_COLUMNS = [
+    "Kategori", "Tanggal", "Tipe",
+    "IN Ekor", "IN Harga", "IN Total",
+    "OUT Ekor", "OUT Harga", "OUT Total",
+    "SALDO Ekor", "SALDO Harga Rata2", "SALDO Total",
+    "Row_Index"
+]
+
+def fetch_inventory_frame(db_path, kategori=None):
+    query = f"SELECT * FROM {INVENTORY_TABLE_NAME}"
+    params = []
+    if kategori is not None:
+        query += " WHERE Kategori = ?"
+        params.append(kategori)
+    query += " ORDER BY Waktu, id"
+
+    conn = get_db_connection(db_path)
+    try:
+        return pd.read_sql_query(query, conn, params=params)
+    finally:
+        conn.close()
+
+def build_inventory_store(inventory_df):
+    kategori, kategoris = intern_codes(inventory_df["Kategori"])
+    tipe, tipes = intern_codes(inventory_df["Tipe"], INVENTORY_TYPES)
+    row_index = inventory_df["Row_Index"] if "Row_Index" in inventory_df.columns else inventory_df["id"]
+
+    return {
+        "id": row_index.to_numpy(dtype="int64"),
+        "waktu": to_date_array(inventory_df["Waktu"]),
+        "kategori": kategori, "kategoris": kategoris,
+        "tipe": tipe, "tipes": tipes,
+        "jumlah": safe_float_series(inventory_df["Jumlah"]).to_numpy(dtype="int64"),
+        "harga": safe_rupiah_series(inventory_df["Harga"]).to_numpy(),
+        "total": safe_rupiah_series(inventory_df["Total"]).to_numpy(),
+    }
+
+def build_inventory_stock_cards(inventory_store, opening=None):
+    has_kategori = inventory_store["kategori"] >= 0
+    if not has_kategori.any():
+        return pd.DataFrame(columns=STOCK_CARD_COLUMNS)
+
+    kategori = inventory_store["kategori"][has_kategori]
+    tipe = inventory_store["tipe"][has_kategori]
+    is_in = np.isin(tipe, [INVENTORY_TYPES.index("SALDO AWAL"), INVENTORY_TYPES.index("Pembelian")])
+    is_out = tipe == INVENTORY_TYPES.index("Penjualan")
+
+    jumlah = inventory_store["jumlah"][has_kategori]
+    harga = inventory_store["harga"][has_kategori]
+    total = inventory_store["total"][has_kategori]
+
+    card = pd.DataFrame({
+        "Kategori": decode_codes(kategori, inventory_store["kategoris"]),
+        "Tanggal": np.datetime_as_string(inventory_store["waktu"][has_kategori], unit="D"),
+        "Tipe": decode_codes(tipe, inventory_store["tipes"]),
+        "IN Ekor": np.where(is_in, jumlah, 0),
+        "IN Harga": np.where(is_in, harga, 0),
+        "IN Total": np.where(is_in, total, 0),
+        "OUT Ekor": np.where(is_out, jumlah, 0),
+        "OUT Harga": np.where(is_out, harga, 0),
+        "OUT Total": np.where(is_out, total, 0),
+        "Row_Index": inventory_store["id"][has_kategori],
+    })
+
+    movements = pd.DataFrame({
+        "SALDO Ekor": card["IN Ekor"] - card["OUT Ekor"],
+        "SALDO Total": card["IN Total"] - card["OUT Total"],
+    })
+    running = movements.groupby(kategori, sort=False).cumsum()
+    if opening is not None:
+        running += opening.reindex(card["Kategori"]).fillna(0).to_numpy(dtype="int64")
+    card["SALDO Ekor"] = running["SALDO Ekor"]
+    card["SALDO Total"] = running["SALDO Total"]
+
+    has_stock = card["SALDO Ekor"] > 0
+    card["SALDO Harga Rata2"] = round_half_up_div(card["SALDO Total"], card["SALDO Ekor"].where(has_stock, 1)).where(has_stock, 0)
+
+    return card[STOCK_CARD_COLUMNS]
+
+def get_inventory_kategori(kategori_akun):
+    return kategori_akun.replace('Persediaan kambing ', '').title()
+
+def build_purchase_rows(waktu, deskripsi, metode, customer, kategori_akun, harga_satuan, jumlah):
+    total_nominal = harga_satuan * jumlah
+    kategori_bb = get_inventory_kategori(kategori_akun)
+    jurnal_row = [
+        str(waktu), deskripsi, metode,
+        kategori_akun, total_nominal, None, None,
+        "Kas" if metode == "Tunai" else "Utang usaha", total_nominal, None, None,
+        customer, kategori_bb,
+        harga_satuan,
+        jumlah,
+        total_nominal
+    ]
+    return [
+        ("Pembelian", jurnal_row),
+        ("Inventory_Data", [jurnal_row[0], "Pembelian", kategori_bb, harga_satuan, jumlah, total_nominal])
+    ]
+
+def build_sale_rows(waktu, deskripsi, metode, customer, kategori_akun, harga_satuan_jual, jumlah, saldo_ekor, saldo_total):
+    total_penjualan_bruto = to_rupiah(harga_satuan_jual * jumlah)
+    avg_cost = get_moving_average_hpp(saldo_ekor, saldo_total, 1)
+    total_hpp = get_moving_average_hpp(saldo_ekor, saldo_total, jumlah)
+    kategori_bb = get_inventory_kategori(kategori_akun)
+    jurnal_row = [
+        str(waktu), deskripsi, metode,
+        "Piutang usaha" if metode == "Kredit" else "Kas", total_penjualan_bruto, "HPP", total_hpp,
+        "Penjualan", total_penjualan_bruto, kategori_akun, total_hpp,
+        customer, kategori_bb,
+        harga_satuan_jual,
+        jumlah,
+        total_penjualan_bruto
+    ]
+    return [
+        ("Penjualan", jurnal_row),
+        ("Inventory_Data", [jurnal_row[0], "Penjualan", kategori_bb, avg_cost, jumlah, total_hpp])
+    ]
+
+def build_general_journal_rows(waktu, deskripsi, debit_akun, kredit_akun, harga_satuan, jumlah=1.0, customer=None):
+    total_nominal = harga_satuan * jumlah
+    return [
+        ("Lain-lain", [
+            str(waktu), deskripsi, "Jurnal Umum",
+            debit_akun, total_nominal, None, None,
+            kredit_akun, total_nominal, None, None,
+            customer, None,
+            harga_satuan,
+            jumlah,
+            total_nominal
+        ])
+    ]
+
+IMPORT_COLUMNS = [
+    "Tanggal", "Jenis", "Deskripsi", "Metode", "Customer_Supplier", "Kategori_Ternak",
+    "Debit_Akun", "Kredit_Akun", "Harga_Satuan", "Jumlah"
+]
+IMPORT_REQUIRED_COLUMNS = ["Tanggal", "Jenis", "Harga_Satuan"]
+IMPORT_METODE_CHOICES = ["Tunai", "Kredit"]
+IMPORT_FIRST_ROW = 2
+
+def get_import_column_name(header):
+    return re.sub(r"[\s/]+", "_", str(header if header is not None else "").strip()).lower()
+
+def read_import_file(source, filename):
+    if filename.lower().endswith(".csv"):
+        frame = pd.read_csv(source, dtype=str, keep_default_na=False, na_values=[""])
+    else:
+        import openpyxl
+        workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = next(rows, ())
+            frame = pd.DataFrame.from_records(rows, columns=range(len(header)))
+            frame.columns = list(header)
+        finally:
+            workbook.close()
+
+    known_columns = {column.lower(): column for column in IMPORT_COLUMNS}
+    frame.columns = [known_columns.get(get_import_column_name(column), column) for column in frame.columns]
+    missing = [column for column in IMPORT_REQUIRED_COLUMNS if column not in frame.columns]
+    if missing:
+        raise ValueError(f"Kolom wajib tidak ditemukan: {', '.join(missing)}. Kolom yang dikenali: {', '.join(IMPORT_COLUMNS)}.")
+
+    frame = frame.reindex(columns=IMPORT_COLUMNS).astype(object)
+    frame.index = range(IMPORT_FIRST_ROW, IMPORT_FIRST_ROW + len(frame))
+    return frame.dropna(how="all")
+
+def parse_import_text(values):
+    text = values.astype("string").str.strip()
+    return text.astype(object).where((text != "").fillna(False).astype(bool), None)
+
+def parse_import_choice(values, choices, aliases=None):
+    lookup = {choice.lower(): choice for choice in choices}
+    lookup.update({alias.lower(): choice for alias, choice in (aliases or {}).items()})
+    return parse_import_text(values).str.lower().map(lookup)
+
+def parse_import_numbers(values):
+    is_text = values.map(lambda value: isinstance(value, str)).astype(bool)
+    numbers = pd.to_numeric(values.where(~is_text), errors="coerce").astype("float64")
+    text = values[is_text].str.strip().str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+    numbers[is_text] = pd.to_numeric(text, errors="coerce")
+    return numbers
+
+def normalize_waktu_series(values):
+    waktu = {}
+    for value in values.dropna().unique():
+        try:
+            waktu[value] = normalize_waktu(value)
+        except ValueError:
+            continue
+    return values.map(waktu)
+
+def prepare_import_frame(frame):
+    jenis = parse_import_choice(frame["Jenis"], NON_SA_SHEETS)
+    is_lain = jenis == "Lain-lain"
+    jumlah = parse_import_numbers(frame["Jumlah"])
+    kategori_aliases = {get_inventory_kategori(akun): akun for akun in INVENTORY_ACCOUNT_CHOICES}
+    return pd.DataFrame({
+        "Waktu": normalize_waktu_series(frame["Tanggal"]),
+        "Jenis": jenis,
+        "Deskripsi": parse_import_text(frame["Deskripsi"]),
+        "Metode": parse_import_choice(frame["Metode"], IMPORT_METODE_CHOICES).mask(is_lain, "Jurnal Umum"),
+        "Customer_Supplier": parse_import_text(frame["Customer_Supplier"]),
+        "Kategori_Akun": parse_import_choice(frame["Kategori_Ternak"], INVENTORY_ACCOUNT_CHOICES, kategori_aliases),
+        "Debit_Akun": parse_import_choice(frame["Debit_Akun"], DEBIT_CHOICES),
+        "Kredit_Akun": parse_import_choice(frame["Kredit_Akun"], DEBIT_CHOICES),
+        "Harga_Satuan": parse_import_numbers(frame["Harga_Satuan"]),
+        "Jumlah": jumlah.mask(is_lain & jumlah.isna(), 1.0),
+    }, index=frame.index)
+
+def validate_import_frame(df, opening, closed_until=None, latest_inventory=None):
+    is_ternak = df["Jenis"].isin(["Penjualan", "Pembelian"])
+    is_lain = df["Jenis"] == "Lain-lain"
+    total_nominal = np.floor((df["Harga_Satuan"] * df["Jumlah"]).abs() + 0.5)
+    checks = [
+        (df["Waktu"].isna(), "Tanggal tidak valid"),
+        (df["Waktu"] <= closed_until if closed_until else pd.Series(False, index=df.index), f"Tanggal berada di periode yang sudah ditutup (s.d. {closed_until})"),
+        (df["Jenis"].isna(), f"Jenis harus salah satu dari {', '.join(NON_SA_SHEETS)}"),
+        (~(df["Harga_Satuan"] > 0), "Harga Satuan harus > 0"),
+        (~(df["Jumlah"] > 0), "Jumlah harus > 0"),
+        ((df["Harga_Satuan"] > 0) & (df["Jumlah"] > 0) & (total_nominal <= 0), "Total Nominal harus > 0"),
+        (is_ternak & (df["Jumlah"] > 0) & (df["Jumlah"] % 1 != 0), "Jumlah ekor harus bilangan bulat"),
+        (is_ternak & df["Metode"].isna(), f"Metode harus {' atau '.join(IMPORT_METODE_CHOICES)}"),
+        (is_ternak & df["Kategori_Akun"].isna(), f"Kategori Ternak harus salah satu dari {', '.join(INVENTORY_ACCOUNT_CHOICES)}"),
+        (is_ternak & (df["Metode"] == "Kredit") & df["Customer_Supplier"].isna(), "Transaksi Kredit WAJIB mengisi Customer/Supplier"),
+        (is_lain & df["Deskripsi"].isna(), "Deskripsi harus diisi"),
+        (is_lain & df["Debit_Akun"].isna(), "Debit Akun tidak dikenal"),
+        (is_lain & df["Kredit_Akun"].isna(), "Kredit Akun tidak dikenal"),
+        (is_lain & (df["Debit_Akun"] == df["Kredit_Akun"]), "Debit dan Kredit Akun tidak boleh sama"),
+    ]
+    messages = pd.Series("", index=df.index, dtype=object)
+    for mask, message in checks:
+        messages[mask.fillna(False).astype(bool)] += message + "; "
+
+    stok_terakhir = df["Kategori_Akun"].map(latest_inventory or {})
+    is_mundur = is_ternak & df["Waktu"].notna() & stok_terakhir.notna() & (df["Waktu"].fillna("") < stok_terakhir.fillna(""))
+    mundur = df.index[is_mundur]
+    if len(mundur):
+        messages[mundur] += (
+            "Tanggal sebelum mutasi stok terakhir " + df.loc[mundur, "Kategori_Akun"] + " (" + stok_terakhir[mundur]
+            + "); Penjualan/Pembelian tidak bisa dicatat mundur karena HPP memakai saldo stok terkini; "
+        )
+
+    ternak = df[(messages == "") & is_ternak].sort_values("Waktu", kind="stable")
+    mutasi = ternak["Jumlah"].where(ternak["Jenis"] == "Pembelian", -ternak["Jumlah"])
+    saldo_awal = ternak["Kategori_Akun"].map({akun: saldo[0] for akun, saldo in opening.items()}).fillna(0)
+    saldo = mutasi.groupby(ternak["Kategori_Akun"]).cumsum() + saldo_awal
+    kurang = ternak.index[(ternak["Jenis"] == "Penjualan") & (saldo < 0)]
+    if len(kurang):
+        messages[kurang] += (
+            "Ekor Penjualan (" + ternak.loc[kurang, "Jumlah"].map("{:,.0f}".format) + ") melebihi Saldo Ekor ("
+            + (saldo[kurang] - mutasi[kurang]).map("{:,.0f}".format) + ")"
+        )
+
+    return messages.str.rstrip("; ")
+
+def build_import_rows(df, opening):
+    stock = {akun: list(saldo) for akun, saldo in opening.items()}
+    rows = []
+    for row in df.sort_values("Waktu", kind="stable").itertuples():
+        customer = row.Customer_Supplier
+        if row.Jenis == "Lain-lain":
+            rows.extend(build_general_journal_rows(row.Waktu, row.Deskripsi, row.Debit_Akun, row.Kredit_Akun, row.Harga_Satuan, row.Jumlah, customer))
+        elif row.Jenis == "Pembelian":
+            jumlah = int(row.Jumlah)
+            purchase_rows = build_purchase_rows(row.Waktu, row.Deskripsi, row.Metode, customer, row.Kategori_Akun, row.Harga_Satuan, jumlah)
+            rows.extend(purchase_rows)
+            stock[row.Kategori_Akun][0] += jumlah
+            stock[row.Kategori_Akun][1] += to_rupiah(purchase_rows[1][1][5])
+        else:
+            jumlah = int(row.Jumlah)
+            sale_rows = build_sale_rows(row.Waktu, row.Deskripsi, row.Metode, customer, row.Kategori_Akun, row.Harga_Satuan, jumlah, *stock[row.Kategori_Akun])
+            rows.extend(sale_rows)
+            stock[row.Kategori_Akun][0] -= jumlah
+            stock[row.Kategori_Akun][1] -= sale_rows[1][1][5]
+    return rows
+
+def build_import_report(frame, df, messages, saved):
+    return pd.DataFrame({
+        "Baris": frame.index,
+        "Tanggal": df["Waktu"].fillna(frame["Tanggal"]),
+        "Jenis": df["Jenis"].fillna(frame["Jenis"]),
+        "Deskripsi": frame["Deskripsi"],
+        "Status": np.where(messages != "", "Gagal", "Tersimpan" if saved else "Valid"),
+        "Keterangan": messages,
+    })
+
+def build_trial_balance(balances):
+    rows = []
+    for akun in sorted(GENERAL_LEDGER_ACCOUNTS):
+        saldo = int(balances.get(akun, 0))
+        if saldo == 0:
+            continue
+        if (saldo > 0) != (akun in AKUN_SALDO_NORMAL_KREDIT):
+            rows.append({"Keterangan": akun, "Debit": abs(saldo), "Kredit": 0})
+        else:
+            rows.append({"Keterangan": akun, "Debit": 0, "Kredit": abs(saldo)})
+    return pd.DataFrame(rows, columns=["Keterangan", "Debit", "Kredit"])
+
+def build_laba_rugi_statement(balances):
+    saldo = lambda akun: int(balances.get(akun, 0))
+    lr_data = [{"Keterangan": "PENDAPATAN", "Nominal": None}]
+    total_pendapatan_pos = 0
+    for akun in AKUN_PENDAPATAN:
+        if saldo(akun) > 0:
+            lr_data.append({"Keterangan": f"    {akun}", "Nominal": saldo(akun)})
+            total_pendapatan_pos += saldo(akun)
+
+    hpp_val = saldo("HPP")
+    if hpp_val > 0:
+        lr_data.append({"Keterangan": "Beban Pokok Penjualan (HPP)", "Nominal": -hpp_val})
+        laba_bruto = total_pendapatan_pos - hpp_val
+    else:
+        laba_bruto = total_pendapatan_pos
+
+    lr_data.append({"Keterangan": "LABA BRUTO", "Nominal": laba_bruto, "Total": "Subtotal"})
+    lr_data.append({"Keterangan": "", "Nominal": None})
+
+    lr_data.append({"Keterangan": "BEBAN OPERASIONAL", "Nominal": None})
+    total_beban_ops = 0
+    for akun in [a for a in AKUN_BEBAN if a != "HPP"]:
+        if saldo(akun) > 0:
+            lr_data.append({"Keterangan": f"    {akun}", "Nominal": -saldo(akun)})
+            total_beban_ops += saldo(akun)
+
+    if total_beban_ops > 0:
+        lr_data.append({"Keterangan": "TOTAL BEBAN OPERASIONAL", "Nominal": -total_beban_ops, "Total": "Subtotal"})
+
+    laba_bersih = laba_bruto - total_beban_ops
+    lr_data.append({"Keterangan": "", "Nominal": None})
+    lr_data.append({"Keterangan": "LABA (RUGI) BERSIH", "Nominal": laba_bersih, "Total": "Final"})
+    return pd.DataFrame(lr_data), laba_bersih
+
+def build_balance_sheet(balances, balances_non_sa, balances_sa, laba_ditahan=0):
+    saldo = lambda akun: int(balances.get(akun, 0))
+    data = [{"Keterangan": "ASET", "Nominal": None, "Kategori": "A"}]
+
+    data.append({"Keterangan": "Aset Lancar:", "Nominal": None, "Kategori": "A"})
+    total_lancar = 0
+    for akun in [a for a in AKUN_ASET if a not in ["Bangunan kandang", "Kendaraan"]]:
+        if saldo(akun) > 0:
+            data.append({"Keterangan": f"    {akun}", "Nominal": saldo(akun), "Kategori": "A"})
+            total_lancar += saldo(akun)
+    data.append({"Keterangan": "Total Aset Lancar", "Nominal": total_lancar, "Total_Type": "Subtotal", "Kategori": "A"})
+
+    data.append({"Keterangan": "Aset Tidak Lancar:", "Nominal": None, "Kategori": "A"})
+    total_tetap_bruto = 0
+    for akun in ["Bangunan kandang", "Kendaraan"]:
+        if saldo(akun) > 0:
+            data.append({"Keterangan": f"    {akun} (Bruto)", "Nominal": saldo(akun), "Kategori": "A"})
+            total_tetap_bruto += saldo(akun)
+
+    akumulasi_penyusutan = saldo("Akumulasi penyusutan")
+    if akumulasi_penyusutan > 0:
+        data.append({"Keterangan": "    (Akumulasi Penyusutan)", "Nominal": -akumulasi_penyusutan, "Kategori": "A"})
+        total_tetap_bersih = total_tetap_bruto - akumulasi_penyusutan
+    else:
+        total_tetap_bersih = total_tetap_bruto
+    data.append({"Keterangan": "Total Aset Tidak Lancar (Neto)", "Nominal": total_tetap_bersih, "Total_Type": "Subtotal", "Kategori": "A"})
+
+    total_aset = total_lancar + total_tetap_bersih
+    data.append({"Keterangan": "TOTAL ASET", "Nominal": total_aset, "Total_Type": "Final", "Kategori": "A"})
+    data.append({"Keterangan": "", "Nominal": None, "Kategori": None})
+
+    data.append({"Keterangan": "LIABILITAS DAN EKUITAS", "Nominal": None, "Kategori": "L+E"})
+    data.append({"Keterangan": "Liabilitas:", "Nominal": None, "Kategori": "L+E"})
+    total_kewajiban = 0
+    for akun in AKUN_KEWAJIBAN:
+        if saldo(akun) > 0:
+            data.append({"Keterangan": f"    {akun}", "Nominal": saldo(akun), "Kategori": "L+E"})
+            total_kewajiban += saldo(akun)
+    data.append({"Keterangan": "Total Liabilitas", "Nominal": total_kewajiban, "Total_Type": "Subtotal", "Kategori": "L+E"})
+
+    data.append({"Keterangan": "Ekuitas:", "Nominal": None, "Kategori": "L+E"})
+    total_ekuitas_bersih = 0
+    modal_non_sa = int(balances_non_sa.get("Modal", 0))
+    total_aset_awal = int(balances_sa.reindex(AKUN_ASET, fill_value=0).sum())
+    total_liabilitas_awal = int(balances_sa.reindex(AKUN_KEWAJIBAN + AKUN_KONTRA, fill_value=0).sum())
+    saldo_modal_final = total_aset_awal - total_liabilitas_awal + modal_non_sa
+    if abs(saldo_modal_final) > 0:
+        data.append({"Keterangan": "    Modal Awal", "Nominal": saldo_modal_final, "Kategori": "L+E"})
+        total_ekuitas_bersih += saldo_modal_final
+
+    prive = saldo("Prive")
+    if prive > 0:
+        data.append({"Keterangan": "    (Prive)", "Nominal": -prive, "Kategori": "L+E"})
+        total_ekuitas_bersih -= prive
+
+    if laba_ditahan != 0:
+        data.append({"Keterangan": "    Saldo Laba Periode Sebelumnya", "Nominal": laba_ditahan, "Kategori": "L+E"})
+        total_ekuitas_bersih += laba_ditahan
+
+    total_pendapatan = int(balances.reindex(AKUN_PENDAPATAN, fill_value=0).sum())
+    total_beban = int(balances.reindex(AKUN_BEBAN, fill_value=0).sum())
+    laba_rugi = total_pendapatan - total_beban - laba_ditahan
+    if laba_rugi != 0:
+        data.append({"Keterangan": "    Laba (Rugi) Periode Berjalan", "Nominal": laba_rugi, "Kategori": "L+E"})
+        total_ekuitas_bersih += laba_rugi
+    data.append({"Keterangan": "Total Ekuitas", "Nominal": total_ekuitas_bersih, "Total_Type": "Subtotal", "Kategori": "L+E"})
+
+    total_liabilitas_ekuitas = total_kewajiban + total_ekuitas_bersih
+    data.append({"Keterangan": "TOTAL LIABILITAS DAN EKUITAS", "Nominal": total_liabilitas_ekuitas, "Total_Type": "Final", "Kategori": "L+E"})
+    return pd.DataFrame(data), total_aset, total_liabilitas_ekuitas
+
+def get_balance_sheet_export_frame(balance_sheet):
+    df = balance_sheet.copy()
+    df.insert(1, "ASET", df["Nominal"].where(df["Kategori"] == "A"))
+    df.insert(2, "LIABILITAS_EKUITAS", df["Nominal"].where(df["Kategori"] == "L+E"))
+    return df.drop(columns=["Nominal", "Total_Type", "Kategori"])
+
+class FarmRepository:
+    def __init__(self, db_path, on_warning=None):
+        self.db_path = db_path
+        self.on_warning = on_warning or logger.warning
+
+    def connect(self):
+        if not self.db_path:
+            raise ConnectionError("DB path tidak ditemukan.")
+        return get_db_connection(self.db_path)
+
+    def setup(self):
+        setup_user_database(self.db_path)
+
+    def data_version(self):
+        return get_data_version(self.db_path)
+
+    def invalidate(self):
+        if self.db_path:
+            bump_data_version(self.db_path)
+
+    def cached(self, cache_name, loader, empty, error_message=None):
+        if not self.db_path:
+            return empty()
+        try:
+            data = get_cached_data(self.db_path, cache_name, loader)
+        except Exception as e:
+            if error_message is None:
+                raise
+            self.on_warning(f"{error_message}: {e}")
+            data = None
+        return data if data is not None else empty()
+
+    def cached_excel(self, cache_name, builder):
+        if not self.db_path:
+            return builder()
+        return get_cached_excel_bytes(self.db_path, cache_name, builder)
+
+    @profiled
+    def transactions_frame(self, sheet_names, period=None):
+        return self.cached(
+            ("frame", tuple(sheet_names), period), lambda: fetch_transactions_frame(self.db_path, sheet_names, period),
+            empty_transactions_frame, "Gagal memuat data transaksi"
+        )
+
+    @profiled
+    def transactions_records(self, sheet_names, period=None):
+        return list(self.cached(
+            ("records", tuple(sheet_names), period), lambda: transactions_frame_to_records(self.transactions_frame(sheet_names, period)),
+            list
+        ))
+
+    @profiled
+    def transaction_store(self, sheet_names, period=None):
+        return self.cached(
+            ("store", tuple(sheet_names), period), lambda: fetch_transaction_store(self.db_path, sheet_names, period),
+            lambda: build_transaction_store(empty_transactions_frame()), "Gagal memuat data transaksi"
+        )
+
+    @profiled
+    def account_totals(self, sheet_names, period=None):
+        return self.cached(
+            ("account_totals", tuple(sheet_names), period), lambda: fetch_account_totals(self.db_path, sheet_names, period),
+            lambda: build_account_totals([]), "Gagal memuat saldo akun"
+        )
+
+    @profiled
+    def ledger_lines(self, akun_name, sheet_names=MAIN_SHEETS, period=None):
+        build = lambda: store_ledger_lines(self.transaction_store(sheet_names, period), akun_name)
+        return self.cached(("ledger_lines", akun_name, tuple(sheet_names), period), build, build)
+
+    @profiled
+    def daily_trends(self, period=None):
+        return self.cached(
+            ("daily_trends", period), lambda: fetch_daily_trends(self.db_path, period),
+            lambda: build_daily_trends(pd.DataFrame(columns=["account", "waktu", "debit", "kredit"]), pd.DataFrame(columns=["waktu", "ekor"])),
+            "Gagal memuat tren harian"
+        )
+
+    @profiled
+    def inventory_frame(self, kategori=None):
+        return fetch_inventory_frame(self.db_path, kategori)
+
+    @profiled
+    def inventory_balance(self, kategori_name):
+        if not self.db_path: return 0, 0
+
+        conn = self.connect()
+        try:
+            c = conn.cursor()
+            c.execute(f"SELECT saldo_ekor, saldo_total FROM {INVENTORY_STATE_TABLE_NAME} WHERE kategori = ?", (kategori_name,))
+            state = c.fetchone()
+        except Exception:
+            return 0, 0
+        finally:
+            conn.close()
+
+        if state and state['saldo_ekor'] > 0:
+            return state['saldo_ekor'], state['saldo_total']
+        return 0, 0
+
+    @profiled
+    def inventory_state_as_of(self, as_of):
+        return fetch_inventory_state_as_of(self.db_path, as_of)
+
+    @profiled
+    def period_closings(self):
+        return load_period_closings(self.db_path)
+
+    @profiled
+    def invalid_waktu_rows(self):
+        return self.cached(("invalid_waktu",), lambda: verify_waktu_columns(self.db_path), pd.DataFrame)
+
+class PostingEngine:
+    def __init__(self, repository):
+        self.repository = repository
+
+    @profiled
+    def append_rows(self, rows):
+        if not rows: return []
+
+        prepared_rows = [build_insert_row(sheet_name, row_data) for sheet_name, row_data in rows]
+        conn = self.repository.connect()
+        try:
+            c = conn.cursor()
+            c.execute("BEGIN IMMEDIATE")
+            assigned_ids = insert_prepared_rows(c, prepared_rows)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        self.repository.invalidate()
+        return assigned_ids
+
+    @profiled
+    def import_transactions(self, frame):
+        if frame.empty:
+            raise ValueError("File tidak berisi baris transaksi.")
+
+        df = prepare_import_frame(frame)
+        saved = False
+        conn = self.repository.connect()
+        try:
+            c = conn.cursor()
+            c.execute("BEGIN IMMEDIATE")
+            state = {row[0]: (row[1], row[2]) for row in c.execute(f"SELECT kategori, saldo_ekor, saldo_total FROM {INVENTORY_STATE_TABLE_NAME}")}
+            opening = {akun: state.get(get_inventory_kategori(akun), (0, 0)) for akun in INVENTORY_ACCOUNT_CHOICES}
+            latest = {row[0]: row[1] for row in c.execute(f"SELECT Kategori, MAX(Waktu) FROM {INVENTORY_TABLE_NAME} GROUP BY Kategori")}
+            latest_inventory = {akun: latest[get_inventory_kategori(akun)] for akun in INVENTORY_ACCOUNT_CHOICES if latest.get(get_inventory_kategori(akun))}
+            messages = validate_import_frame(df, opening, get_latest_period_closing(conn), latest_inventory)
+            if (messages == "").all():
+                rows = build_import_rows(df, opening)
+                insert_prepared_rows(c, [build_insert_row(sheet_name, row_data) for sheet_name, row_data in rows])
+                saved = True
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        if saved:
+            self.repository.invalidate()
+        return build_import_report(frame, df, messages, saved)
+
+    @profiled
+    def post_purchase(self, waktu, deskripsi, metode, customer, kategori_akun, harga_satuan, jumlah):
+        if harga_satuan * jumlah <= 0 or jumlah <= 0:
+            raise ValueError("Harga Satuan Beli dan Jumlah Ekor harus > 0.")
+        if metode == "Kredit" and not customer:
+            raise ValueError("Pembelian Kredit WAJIB mengisi Supplier.")
+        return self.append_rows(build_purchase_rows(waktu, deskripsi, metode, customer, kategori_akun, harga_satuan, jumlah))
+
+    @profiled
+    def post_sale(self, waktu, deskripsi, metode, customer, kategori_akun, harga_satuan_jual, jumlah):
+        if to_rupiah(harga_satuan_jual * jumlah) <= 0 or jumlah <= 0:
+            raise ValueError("Harga Satuan Jual dan Jumlah Ekor harus lebih besar dari 0.")
+        if metode == "Kredit" and not customer:
+            raise ValueError("Penjualan Kredit WAJIB mengisi Customer.")
+
+        saldo_ekor, saldo_total = self.repository.inventory_balance(get_inventory_kategori(kategori_akun))
+        if saldo_ekor < jumlah:
+            raise ValueError(f"Ekor Penjualan ({jumlah:,.0f}) melebihi Saldo Ekor ({saldo_ekor:,.0f}). Transaksi Dibatalkan.")
+        return self.append_rows(build_sale_rows(waktu, deskripsi, metode, customer, kategori_akun, harga_satuan_jual, jumlah, saldo_ekor, saldo_total))
+
+    @profiled
+    def delete_rows(self, sheet_name, ids_to_delete):
+        if not self.repository.db_path or not ids_to_delete: return 0
+
+        ids_to_delete_int = [int(i) for i in ids_to_delete]
+        table_name = INVENTORY_TABLE_NAME if sheet_name == "Inventory_Data" else TABLE_NAME
+
+        conn = self.repository.connect()
+        try:
+            c = conn.cursor()
+            c.execute("BEGIN IMMEDIATE")
+            deleted_count = delete_table_rows(c, table_name, ids_to_delete_int)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise sqlite3.DatabaseError(f"Gagal menghapus data dari {table_name}: {e}") from e
+        finally:
+            conn.close()
+            self.repository.invalidate()
+
+        return deleted_count
+
+    def get_linked_inventory_ids(self, row_ids):
+        conn = self.repository.connect()
+        try:
+            return fetch_linked_inventory_ids(conn.cursor(), [int(i) for i in row_ids])
+        finally:
+            conn.close()
+
+    @profiled
+    def delete_transactions(self, rows_to_delete_map):
+        if not self.repository.db_path: return 0, 0
+
+        deleted_count = 0
+        deleted_inventory_count = 0
+        conn = self.repository.connect()
+        try:
+            c = conn.cursor()
+            c.execute("BEGIN IMMEDIATE")
+            for sheet_name, row_ids in rows_to_delete_map.items():
+                row_ids_int = [int(i) for i in row_ids]
+                if not row_ids_int:
+                    continue
+                table_name = INVENTORY_TABLE_NAME if sheet_name == "Inventory_Data" else TABLE_NAME
+                if sheet_name in ["Penjualan", "Pembelian"]:
+                    rows_inv_to_delete = fetch_linked_inventory_ids(c, row_ids_int)
+                    if rows_inv_to_delete:
+                        deleted_inventory_count += delete_table_rows(c, INVENTORY_TABLE_NAME, rows_inv_to_delete)
+                deleted_count += delete_table_rows(c, table_name, row_ids_int)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise sqlite3.DatabaseError(f"Gagal menghapus transaksi: {e}") from e
+        finally:
+            conn.close()
+
+        self.repository.invalidate()
+        return deleted_count, deleted_inventory_count
+
+    @profiled
+    def close_period(self, period_end):
+        return close_period(self.repository.db_path, period_end)
+
+    @profiled
+    def reopen_period(self, period_end):
+        return reopen_period(self.repository.db_path, period_end)
+
+class ReportEngine:
+    def __init__(self, repository):
+        self.repository = repository
+
+    @profiled
+    def account_balances(self, sheet_names=MAIN_SHEETS, transactions=None, period=None):
+        if transactions is None:
+            totals = self.repository.account_totals(sheet_names, period)
+        else:
+            totals = build_account_totals(transactions)
+        return (totals["Debit"] - totals["Kredit"]) * get_saldo_normal_multiplier(totals.index)
+
+    @profiled
+    def account_balance(self, akun_name, balances=None):
+        if balances is None:
+            balances = self.account_balances(MAIN_SHEETS)
+        return int(balances.get(akun_name, 0))
+
+    @profiled
+    def account_balance_non_sa(self, akun_name, balances=None):
+        if balances is None:
+            balances = self.account_balances(NON_SA_SHEETS)
+        return int(balances.get(akun_name, 0))
+
+    @profiled
+    def laba_rugi(self, balances=None):
+        if balances is None:
+            balances = self.account_balances(MAIN_SHEETS)
+        total_pendapatan = int(balances.reindex(AKUN_PENDAPATAN, fill_value=0).sum())
+        total_beban = int(balances.reindex(AKUN_BEBAN, fill_value=0).sum())
+        laba_rugi = total_pendapatan - total_beban
+        return total_pendapatan, total_beban, laba_rugi
+
+    @profiled
+    def trial_balance(self, period=None):
+        return build_trial_balance(self.account_balances(MAIN_SHEETS, period=period))
+
+    @profiled
+    def laba_rugi_statement(self, period=None):
+        return build_laba_rugi_statement(self.account_balances(MAIN_SHEETS, period=period))
+
+    @profiled
+    def balance_sheet(self, period=None):
+        period_posisi = make_period(None, period[1]) if period else None
+        period_before = get_period_before(period)
+        laba_ditahan = self.laba_rugi(self.account_balances(MAIN_SHEETS, period=period_before))[2] if period_before else 0
+        return build_balance_sheet(
+            self.account_balances(MAIN_SHEETS, period=period_posisi),
+            self.account_balances(NON_SA_SHEETS, period=period_posisi),
+            self.account_balances(["Saldo_Awal"], period=period_posisi),
+            laba_ditahan
+        )
+
+    @profiled
+    def dashboard_kpis(self):
+        balances = self.account_balances(MAIN_SHEETS)
+        saldo_kas = self.account_balance("Kas", balances)
+        total_penjualan = self.account_balance("Penjualan", balances)
+        laba_rugi = self.laba_rugi(balances)[2]
+
+        total_stok_ekor = 0
+        total_stok_nilai = 0
+        for akun in INVENTORY_ACCOUNT_CHOICES:
+            ekor, saldo_total = self.repository.inventory_balance(get_inventory_kategori(akun))
+            total_stok_ekor += ekor
+            total_stok_nilai += saldo_total
+
+        return saldo_kas, total_penjualan, laba_rugi, total_stok_ekor, total_stok_nilai
+
+    @profiled
+    def customer_supplier_list(self):
+        transactions = self.repository.transactions_frame(MAIN_SHEETS)
+        all_parties = transactions["Customer"].dropna()
+        all_parties = all_parties[all_parties != ""]
+        return sorted(all_parties.unique().tolist())
+
+    @profiled
+    def formatted_journal(self, sheet_names, period=None):
+        return format_journal_entries(self.repository.transactions_records(sheet_names, period))
+
+    @profiled
+    def journal_page(self, sheet_names, period=None, key=None, direction="next", page_size=PAGE_SIZE_CHOICES[1]):
+        fetch = lambda key, direction, limit: fetch_journal_page(self.repository.db_path, sheet_names, period, key, direction, limit)
+        page = fetch_keyset_page(fetch, key, direction, page_size)
+        page["rows"] = format_journal_entries(transactions_frame_to_records(prepare_transactions_frame(page["rows"])))
+        return page
+
+    @profiled
+    def ledger_header(self, akun_name, period=None):
+        saldo_awal_lines = self.repository.ledger_lines(akun_name, ["Saldo_Awal"], period)
+        period_before = get_period_before(period)
+        opening_balances = None
+        if period_before:
+            opening_balances = self.account_balances(MAIN_SHEETS, period=period_before).reindex([akun_name], fill_value=0)
+
+        header = build_general_ledger(saldo_awal_lines.assign(Akun=akun_name), opening_balances, period_before).drop(columns=["Akun"])
+        opening = int(header["Saldo Akhir"].iloc[-1]) if not header.empty else 0
+        return header, opening
+
+    @profiled
+    def ledger_balance_before(self, akun_name, waktu, period=None):
+        _, opening = self.ledger_header(akun_name, period)
+        start_date = period[0] if period else None
+        debit, kredit = fetch_rollup_account_totals(self.repository.db_path, akun_name, start_date, waktu)
+
+        saldo_awal_lines = self.repository.ledger_lines(akun_name, ["Saldo_Awal"], period)
+        is_before = saldo_awal_lines["Waktu"].astype(str) < waktu
+        debit -= int(saldo_awal_lines["Debit"][is_before].sum())
+        kredit -= int(saldo_awal_lines["Kredit"][is_before].sum())
+        return opening + (debit - kredit) * int(get_saldo_normal_multiplier([akun_name]).iloc[0])
+
+    @profiled
+    def ledger_page(self, akun_name, period=None, key=None, direction="next", page_size=PAGE_SIZE_CHOICES[1], balance=0):
+        fetch = lambda key, direction, limit: fetch_ledger_page(self.repository.db_path, akun_name, period, key, direction, limit)
+        page = fetch_keyset_page(fetch, key, direction, page_size)
+        lines = page["rows"]
+        if direction == "prev":
+            balance -= int(((lines["Debit"] - lines["Kredit"]).sum()) * get_saldo_normal_multiplier([akun_name]).iloc[0])
+        page["rows"] = build_ledger_page_rows(lines, akun_name, balance)
+        page["opening"] = balance
+        page["closing"] = int(page["rows"]["Saldo Akhir"].iloc[-1]) if not page["rows"].empty else balance
+        return page
+
+    @profiled
+    def account_ledger(self, akun_name, ledger_lines=None, period=None):
+        if ledger_lines is None:
+            ledger_lines = self.repository.ledger_lines(akun_name, period=period)
+
+        period_before = get_period_before(period)
+        opening_balances = None
+        if period_before:
+            opening_balances = self.account_balances(MAIN_SHEETS, period=period_before).reindex([akun_name], fill_value=0)
+
+        ledger = build_general_ledger(ledger_lines.assign(Akun=akun_name), opening_balances, period_before)
+        return ledger.drop(columns=["Akun"]).to_dict(orient="records")
+
+    @profiled
+    def general_ledger(self, sheet_names=MAIN_SHEETS, period=None):
+        ledger_lines = self.repository.ledger_lines(None, sheet_names, period)
+        period_before = get_period_before(period)
+        opening_balances = self.account_balances(sheet_names, period=period_before) if period_before else None
+        return build_general_ledger(ledger_lines, opening_balances, period_before)
+
+    @profiled
+    def partner_subledgers(self, akun_type, period=None):
+        build = lambda: build_partner_subledgers(
+            self.repository.transactions_frame(MAIN_SHEETS, make_period(None, period[1]) if period else None), akun_type, period
+        )
+        return self.repository.cached(("subledger", akun_type, period), build, build)
+
+    @profiled
+    def stock_cards(self, kategori=None):
+        inventory = self.repository.inventory_frame(kategori).rename(columns={'id': 'Row_Index'})
+        return build_inventory_stock_cards(build_inventory_store(inventory))
+
+    @profiled
+    def daily_trends(self, period=None):
+        return self.repository.daily_trends(period)
+
+EXPORT_CHUNK_SIZE = 20_000
+EXCEL_MAX_ROWS = 1_048_576
+EXCEL_SHEET_NAME_LENGTH = 31
+EXPORT_COLUMN_WIDTHS = {"Keterangan": 45, "Deskripsi": 45, "Customer": 24, "Supplier": 24}
+LEDGER_EXPORT_COLUMNS = ["Waktu", "Deskripsi", "Debit", "Kredit", "Saldo Akhir"]
+
+def iter_sql_frames(db_path, query, params=(), chunksize=EXPORT_CHUNK_SIZE, group_column=None):
+    conn = get_db_connection(db_path)
+    try:
+        pending = None
+        for chunk in pd.read_sql_query(query, conn, params=list(params), chunksize=chunksize):
+            if chunk.empty:
+                continue
+            if group_column is None:
+                yield chunk
+                continue
+            if pending is not None:
+                chunk = pd.concat([pending, chunk], ignore_index=True)
+            is_last_group = chunk[group_column] == chunk[group_column].iloc[-1]
+            pending = chunk[is_last_group]
+            if not is_last_group.all():
+                yield chunk[~is_last_group]
+        if pending is not None:
+            yield pending
+    finally:
+        conn.close()
+
+def iter_keyset_frames(fetch, page_size=EXPORT_CHUNK_SIZE):
+    key = None
+    while True:
+        rows = fetch(key, "next", page_size)
+        if rows is None or rows.empty:
+            return
+        yield rows
+        if len(rows) < page_size:
+            return
+        key = (rows["Waktu"].iloc[-1], int(rows["id"].iloc[-1]))
+
+def get_partner_lines_query(akun, period=None):
+    placeholders = ', '.join(['?' for _ in MAIN_SHEETS])
+    period_until = make_period(None, period[1]) if period else None
+    lines_period_sql, lines_period_params = get_period_filter_sql(period_until, column="waktu")
+    period_sql, period_params = get_period_filter_sql(period_until, column="j.Waktu")
+    query = f"""
+        SELECT j.* FROM (
+            SELECT DISTINCT entry_id FROM {JOURNAL_LINES_TABLE_NAME} WHERE account = ?{lines_period_sql}
+        ) l CROSS JOIN {TABLE_NAME} j ON j.id = l.entry_id
+        WHERE j.Source_Sheet IN ({placeholders}) AND j.Customer_Supplier IS NOT NULL AND j.Customer_Supplier != ''{period_sql}
+        ORDER BY j.Customer_Supplier, j.Waktu, j.id
+    """
+    return query, [akun] + lines_period_params + list(MAIN_SHEETS) + period_params
+
+class StreamingSheetWriter:
+    def __init__(self, workbook, title, columns, formats):
+        self.workbook = workbook
+        self.title = title
+        self.columns = list(columns)
+        self.formats = formats
+        self.worksheet = None
+        self.part = 0
+        self.row = 0
+        self.rows_written = 0
+
+    def add_worksheet(self):
+        self.part += 1
+        suffix = f" ({self.part})" if self.part > 1 else ""
+        name = re.sub(r"[\[\]:*?/\\]", "-", self.title)[:EXCEL_SHEET_NAME_LENGTH - len(suffix)] + suffix
+        self.worksheet = self.workbook.add_worksheet(name)
+        for i, column in enumerate(self.columns):
+            self.worksheet.set_column(i, i, EXPORT_COLUMN_WIDTHS.get(column, 16), self.formats["money"])
+        self.worksheet.write_row(0, 0, self.columns, self.formats["header"])
+        self.worksheet.freeze_panes(1, 0)
+        self.row = 1
+
+    def write_frame(self, frame):
+        frame = frame[self.columns].astype(object)
+        for values in frame.where(frame.notna(), None).to_numpy().tolist():
+            if self.worksheet is None or self.row >= EXCEL_MAX_ROWS:
+                self.add_worksheet()
+            self.worksheet.write_row(self.row, 0, values)
+            self.row += 1
+        self.rows_written += len(frame)
+
+@profiled
+def write_full_books_workbook(reports, output, period=None, chunk_size=EXPORT_CHUNK_SIZE):
+    import xlsxwriter
+    db_path = reports.repository.db_path
+    workbook = xlsxwriter.Workbook(output, {"constant_memory": True})
+    formats = {"header": workbook.add_format({"bold": True, "bottom": 1}), "money": workbook.add_format({"num_format": "#,##0"})}
+    sheets = []
+
+    def add_sheet(title, columns):
+        sheets.append(StreamingSheetWriter(workbook, title, columns, formats))
+        return sheets[-1]
+
+    try:
+        with profile_section("laporan"):
+            trial_balance = reports.trial_balance(make_period(None, period[1]) if period else None)
+            total = pd.DataFrame([{"Keterangan": "TOTAL", "Debit": trial_balance["Debit"].sum(), "Kredit": trial_balance["Kredit"].sum()}])
+            add_sheet("Neraca Saldo", ["Keterangan", "Debit", "Kredit"]).write_frame(pd.concat([trial_balance, total], ignore_index=True))
+            add_sheet("Laba Rugi", ["Keterangan", "Nominal"]).write_frame(reports.laba_rugi_statement(period)[0])
+            balance_sheet = get_balance_sheet_export_frame(reports.balance_sheet(period)[0])
+            add_sheet("Posisi Keuangan", balance_sheet.columns).write_frame(balance_sheet)
+
+        with profile_section("jurnal"):
+            for sheet_name in MAIN_SHEETS:
+                writer = add_sheet(f"Jurnal {sheet_name.replace('_', ' ')}", ["Waktu", "Keterangan", "Debit", "Kredit"])
+                fetch = lambda key, direction, limit: fetch_journal_page(db_path, [sheet_name], period, key, direction, limit)
+                for rows in iter_keyset_frames(fetch, chunk_size):
+                    records = transactions_frame_to_records(prepare_transactions_frame(rows))
+                    writer.write_frame(pd.DataFrame(format_journal_entries(records, skip_saldo_awal=False), columns=writer.columns))
+
+        with profile_section("buku besar"):
+            for akun in GENERAL_LEDGER_ACCOUNTS:
+                writer = add_sheet(f"BB {akun}", LEDGER_EXPORT_COLUMNS)
+                header, balance = reports.ledger_header(akun, period)
+                writer.write_frame(header)
+                fetch = lambda key, direction, limit: fetch_ledger_page(db_path, akun, period, key, direction, limit)
+                for lines in iter_keyset_frames(fetch, chunk_size):
+                    rows = build_ledger_page_rows(lines, akun, balance)
+                    writer.write_frame(rows)
+                    balance = int(rows["Saldo Akhir"].iloc[-1])
+
+        with profile_section("kartu mitra"):
+            for akun_type, spec in SUBLEDGER_SPECS.items():
+                card_writer = add_sheet(f"Kartu {spec['label']}", [spec["mitra"]] + LEDGER_EXPORT_COLUMNS)
+                aging_writer = add_sheet(f"Umur {spec['label']}", [spec["mitra"]] + AGING_BUCKETS + ["Total", "Saldo Akhir"])
+                query, params = get_partner_lines_query(spec["akun"], period)
+                for rows in iter_sql_frames(db_path, query, params, chunk_size, group_column="Customer_Supplier"):
+                    subledgers = build_partner_subledgers(prepare_transactions_frame(rows), akun_type, period)
+                    for partner in subledgers["partners"]:
+                        if partner in subledgers["ledgers"]:
+                            card_writer.write_frame(subledgers["ledgers"][partner].assign(**{spec["mitra"]: partner}))
+                    aging_writer.write_frame(subledgers["aging"])
+
+        with profile_section("kartu stok"):
+            writer = add_sheet("Kartu Stok", STOCK_CARD_COLUMNS[:-1])
+            opening = None
+            for rows in iter_sql_frames(db_path, f"SELECT * FROM {INVENTORY_TABLE_NAME} ORDER BY Kategori, Waktu, id", (), chunk_size):
+                card = build_inventory_stock_cards(build_inventory_store(rows), opening)
+                writer.write_frame(card)
+                closing = card.groupby("Kategori", sort=False)[["SALDO Ekor", "SALDO Total"]].last()
+                opening = closing if opening is None else closing.combine_first(opening)
+    finally:
+        workbook.close()
+
+    return {writer.title: writer.rows_written for writer in sheets if writer.rows_written}
+
+def full_books_cli(args):
+    parser = argparse.ArgumentParser(prog="subuhjayafarm.py export-full-books", description="Ekspor jurnal, buku besar, kartu mitra, kartu stok, dan laporan keuangan ke satu file Excel.")
+    parser.add_argument("db_path", help="Database user yang diekspor.")
+    parser.add_argument("output", help="File .xlsx tujuan.")
+    parser.add_argument("--start", default=None, help="Tanggal awal periode (YYYY-MM-DD).")
+    parser.add_argument("--end", default=None, help="Tanggal akhir periode (YYYY-MM-DD).")
+    options = parser.parse_args(args)
+
+    setup_user_database(options.db_path)
+    reports = ReportEngine(FarmRepository(options.db_path))
+    for title, n_rows in write_full_books_workbook(reports, options.output, make_period(options.start, options.end)).items():
+        print(f"{title}: {n_rows:,} baris")
+    return 0
+
+RAW_EXPORT_TABLES = [TABLE_NAME, INVENTORY_TABLE_NAME]
+RAW_EXPORT_FORMATS = ["csv", "parquet"]
+RAW_RESTORE_TRIGGER_TABLES = [TABLE_NAME, INVENTORY_TABLE_NAME, JOURNAL_LINES_TABLE_NAME]
+
+def get_table_column_types(conn, table_name):
+    return {row[1]: row[2].upper() for row in conn.execute(f"PRAGMA table_info({table_name})")}
+
+def get_arrow_schema(column_types):
+    import pyarrow as pa
+    arrow_types = {"INTEGER": pa.int64(), "REAL": pa.float64()}
+    return pa.schema([(column, arrow_types.get(sql_type, pa.string())) for column, sql_type in column_types.items()])
+
+def get_raw_table_path(directory, table_name, fmt):
+    return os.path.join(directory, f"{table_name}.{fmt}")
+
+@profiled
+def export_raw_table(db_path, table_name, output, fmt="csv", chunksize=EXPORT_CHUNK_SIZE):
+    if isinstance(output, str):
+        with open(output, "wb") as f:
+            return export_raw_table(db_path, table_name, f, fmt, chunksize)
+
+    conn = get_db_connection(db_path)
+    try:
+        column_types = get_table_column_types(conn, table_name)
+    finally:
+        conn.close()
+
+    n_rows = 0
+    writer = None
+    if fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(output, get_arrow_schema(column_types))
+    try:
+        for chunk in iter_sql_frames(db_path, f"SELECT * FROM {table_name} ORDER BY id", (), chunksize):
+            if writer is not None:
+                writer.write_table(pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False))
+            else:
+                chunk.to_csv(output, header=n_rows == 0, index=False)
+            n_rows += len(chunk)
+        if writer is None and n_rows == 0:
+            pd.DataFrame(columns=list(column_types)).to_csv(output, index=False)
+    finally:
+        if writer is not None:
+            writer.close()
+    return n_rows
+
+def iter_raw_table_chunks(source, fmt, column_types, chunksize=EXPORT_CHUNK_SIZE):
+    if fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas(types_mapper={pa.int64(): pd.Int64Dtype()}.get)
+        return
+
+    dtypes = {column: {"INTEGER": "Int64", "REAL": "float64"}.get(sql_type, "string") for column, sql_type in column_types.items()}
+    yield from pd.read_csv(source, chunksize=chunksize, dtype=dtypes, keep_default_na=False, na_values=[""])
+
+@profiled
+def restore_raw_tables(db_path, sources, fmt="csv", chunksize=EXPORT_CHUNK_SIZE):
+    setup_user_database(db_path)
+    counts = {}
+    conn = get_db_connection(db_path)
+    try:
+        c = conn.cursor()
+        c.execute("PRAGMA temp_store=FILE")
+        c.execute("BEGIN IMMEDIATE")
+        for table_name in RAW_EXPORT_TABLES:
+            if c.execute(f"SELECT 1 FROM {table_name} LIMIT 1").fetchone():
+                raise ValueError(f"Tabel {table_name} sudah berisi data. Pemulihan hanya bisa ke database user yang masih kosong.")
+
+        placeholders = ', '.join(['?' for _ in RAW_RESTORE_TRIGGER_TABLES])
+        triggers = c.execute(f"SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name IN ({placeholders})", RAW_RESTORE_TRIGGER_TABLES).fetchall()
+        for name, _ in triggers:
+            c.execute(f"DROP TRIGGER {name}")
+
+        for table_name in RAW_EXPORT_TABLES:
+            if table_name not in sources:
+                continue
+            column_types = get_table_column_types(conn, table_name)
+            columns = list(column_types)
+            insert_sql = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({', '.join(['?' for _ in columns])})"
+            counts[table_name] = 0
+            for chunk in iter_raw_table_chunks(sources[table_name], fmt, column_types, chunksize):
+                if sorted(chunk.columns) != sorted(columns):
+                    raise ValueError(f"Kolom file {table_name} tidak sesuai tabel: {', '.join(map(str, chunk.columns))}")
+                chunk = chunk[columns].astype(object)
+                c.executemany(insert_sql, chunk.where(chunk.notna(), None).to_numpy().tolist())
+                counts[table_name] += len(chunk)
+
+        rebuild_journal_lines(c)
+        rebuild_account_balances(c)
+        rebuild_inventory_state(c)
+        rebuild_daily_rollup(c)
+        for _, sql in triggers:
+            c.execute(sql)
+        c.execute("ANALYZE")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.close()
+
+    bump_data_version(db_path)
+    return counts
+
+def export_raw_cli(args):
+    parser = argparse.ArgumentParser(prog="subuhjayafarm.py export-raw", description="Ekspor tabel jurnal dan inventory apa adanya ke CSV atau Parquet, dibaca bertahap per potongan.")
+    parser.add_argument("db_path", help="Database user yang diekspor.")
+    parser.add_argument("output_dir", help="Folder tujuan (jurnal.<format> dan inventory.<format>).")
+    parser.add_argument("--format", choices=RAW_EXPORT_FORMATS, default="csv")
+    parser.add_argument("--chunksize", type=int, default=EXPORT_CHUNK_SIZE)
+    options = parser.parse_args(args)
+
+    setup_user_database(options.db_path)
+    os.makedirs(options.output_dir, exist_ok=True)
+    for table_name in RAW_EXPORT_TABLES:
+        path = get_raw_table_path(options.output_dir, table_name, options.format)
+        n_rows = export_raw_table(options.db_path, table_name, path, options.format, options.chunksize)
+        print(f"{path}: {n_rows:,} baris")
+    return 0
+
+def import_raw_cli(args):
+    parser = argparse.ArgumentParser(prog="subuhjayafarm.py import-raw", description="Pulihkan hasil export-raw ke database user yang masih kosong dalam satu transaksi.")
+    parser.add_argument("db_path", help="Database user tujuan (dibuat jika belum ada).")
+    parser.add_argument("input_dir", help="Folder berisi jurnal.<format> dan/atau inventory.<format>.")
+    parser.add_argument("--format", choices=RAW_EXPORT_FORMATS, default="csv")
+    parser.add_argument("--chunksize", type=int, default=EXPORT_CHUNK_SIZE)
+    options = parser.parse_args(args)
+
+    paths = {table_name: get_raw_table_path(options.input_dir, table_name, options.format) for table_name in RAW_EXPORT_TABLES}
+    sources = {table_name: path for table_name, path in paths.items() if os.path.exists(path)}
+    if not sources:
+        print(f"Tidak ada file {', '.join(os.path.basename(path) for path in paths.values())} di {options.input_dir}")
+        return 1
+
+    try:
+        counts = restore_raw_tables(options.db_path, sources, options.format, options.chunksize)
+    except ValueError as e:
+        print(f"{options.db_path}: {e}")
+        return 1
+    for table_name, n_rows in counts.items():
+        print(f"{options.db_path}: {n_rows:,} baris {table_name} dipulihkan")
+    return 0
+
+def import_transactions_cli(args):
+    parser = argparse.ArgumentParser(prog="subuhjayafarm.py import-transactions", description="Impor transaksi Penjualan, Pembelian, dan Lain-lain dari file .xlsx/.csv dalam satu transaksi database.")
+    parser.add_argument("db_path", help="Database user tujuan.")
+    parser.add_argument("input_path", help=f"File .xlsx atau .csv dengan kolom {', '.join(IMPORT_COLUMNS)}.")
+    parser.add_argument("--report", default=None, help="Simpan laporan per baris ke file CSV ini.")
+    options = parser.parse_args(args)
+
+    repository = FarmRepository(options.db_path)
+    repository.setup()
+    try:
+        report = PostingEngine(repository).import_transactions(read_import_file(options.input_path, options.input_path))
+    except ValueError as e:
+        print(f"{options.input_path}: {e}")
+        return 1
+
+    if options.report:
+        report.to_csv(options.report, index=False)
+    failed = report[report["Status"] == "Gagal"]
+    for row in failed.head(20).itertuples():
+        print(f"Baris {row.Baris}: {row.Keterangan}")
+    if len(failed) > 20:
+        print(f"... dan {len(failed) - 20:,} baris gagal lainnya")
+
+    if len(failed):
+        print(f"{options.input_path}: {len(failed):,} dari {len(report):,} baris gagal. Tidak ada transaksi yang disimpan.")
+        return 1
+    print(f"{options.input_path}: {len(report):,} transaksi diimpor ke {options.db_path}")
+    return 0
+
+CLI_COMMANDS = {
+    "verify-balances": account_balances_cli,
+    "check-query-plans": query_plan_cli,
+    "export-full-books": full_books_cli,
+    "export-raw": export_raw_cli,
+    "import-raw": import_raw_cli,
+    "import-transactions": import_transactions_cli,
+}
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in CLI_COMMANDS:
+        print(f"Perintah: {', '.join(CLI_COMMANDS)}")
+        sys.exit(2)
+    sys.exit(CLI_COMMANDS[sys.argv[1]](sys.argv[2:]))
@@ -0,0 +1,43 @@
+import os
+import sys
+import shutil
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "benchmarks"))
+
+from subuhjayafarm_core import close_all_db_connections, setup_user_database
+from generate_farm_data import build_farm_database
+
+LEGACY_DB_NAME = "admin 2_transaksi.db"
+FARM_ROWS = 600
+
+@pytest.fixture
+def fresh_db(tmp_path):
+    db_path = str(tmp_path / "fresh_transaksi.db")
+    setup_user_database(db_path)
+    yield db_path
+    close_all_db_connections(db_path=db_path)
+
+@pytest.fixture
+def legacy_db(tmp_path):
+    db_path = str(tmp_path / "legacy_transaksi.db")
+    shutil.copy(os.path.join(ROOT_DIR, LEGACY_DB_NAME), db_path)
+    yield db_path
+    close_all_db_connections(db_path=db_path)
+
+@pytest.fixture(scope="session")
+def farm_db_template(tmp_path_factory):
+    db_path = str(tmp_path_factory.mktemp("farm") / "farm_transaksi.db")
+    build_farm_database(db_path, FARM_ROWS)
+    close_all_db_connections(db_path=db_path)
+    return db_path
+
+@pytest.fixture
+def farm_db(tmp_path, farm_db_template):
+    db_path = str(tmp_path / "farm_transaksi.db")
+    shutil.copy(farm_db_template, db_path)
+    yield db_path
+    close_all_db_connections(db_path=db_path)
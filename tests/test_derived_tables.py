@@ -0,0 +1,100 @@
+import sqlite3
+from datetime import date
+
+import pytest
+
+from subuhjayafarm_core import (
+    FarmRepository, PostingEngine, build_general_journal_rows, get_db_connection, verify_account_balances,
+    verify_daily_rollup, verify_inventory_state
+)
+
+def assert_derived_tables_match(db_path):
+    assert verify_account_balances(db_path).empty
+    assert verify_inventory_state(db_path).empty
+    assert verify_daily_rollup(db_path).empty
+
+    conn = sqlite3.connect(db_path)
+    try:
+        expected_lines = conn.execute("""
+            SELECT COUNT(*) FROM jurnal j, (SELECT 1 AS leg UNION ALL SELECT 2 UNION ALL SELECT 3 UNION ALL SELECT 4) legs
+            WHERE COALESCE(CASE leg WHEN 1 THEN D1_Akun WHEN 2 THEN D2_Akun WHEN 3 THEN K1_Akun ELSE K2_Akun END, '') != ''
+        """).fetchone()[0]
+        assert conn.execute("SELECT COUNT(*) FROM journal_lines").fetchone()[0] == expected_lines
+    finally:
+        conn.close()
+
+def count_rows(db_path, table_name):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+    finally:
+        conn.close()
+
+@pytest.fixture
+def posting(fresh_db):
+    posting = PostingEngine(FarmRepository(fresh_db))
+    posting.append_rows([
+        ("Inventory_Data", [date(2025, 1, 1), "SALDO AWAL", kategori, 2_000_000, 10, 20_000_000])
+        for kategori in ["Jantan", "Betina"]
+    ])
+    return posting
+
+def test_postings_keep_derived_tables_in_sync(posting):
+    db_path = posting.repository.db_path
+    posting.post_purchase(date(2025, 1, 5), "Beli bakalan", "Kredit", "Supplier A", "Persediaan kambing jantan", 2_500_000, 4)
+    posting.post_sale(date(2025, 1, 8), "Jual ke pasar", "Tunai", None, "Persediaan kambing jantan", 3_200_000, 3)
+    posting.append_rows(build_general_journal_rows(date(2025, 1, 9), "Beli pakan", "Beban pakan ternak", "Kas", 750_000))
+
+    assert_derived_tables_match(db_path)
+
+def test_updates_and_deletes_keep_derived_tables_in_sync(posting):
+    db_path = posting.repository.db_path
+    posting.post_purchase(date(2025, 1, 5), "Beli bakalan", "Tunai", None, "Persediaan kambing betina", 2_500_000, 4)
+    posting.append_rows(build_general_journal_rows(date(2025, 1, 9), "Beli pakan", "Beban pakan ternak", "Kas", 750_000))
+
+    conn = get_db_connection(db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("UPDATE jurnal SET D1_Nominal = 900000, K1_Nominal = 900000, Waktu = '2025-01-10' WHERE Deskripsi = 'Beli pakan'")
+        conn.execute("UPDATE inventory SET Jumlah = 5, Total = 12500000 WHERE Tipe = 'Pembelian'")
+        conn.commit()
+    finally:
+        conn.close()
+    assert_derived_tables_match(db_path)
+
+    conn = get_db_connection(db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM jurnal WHERE Deskripsi = 'Beli pakan'")
+        conn.execute("DELETE FROM inventory WHERE Tipe = 'Pembelian'")
+        conn.commit()
+    finally:
+        conn.close()
+    assert_derived_tables_match(db_path)
+
+def test_delete_transactions_removes_linked_inventory(posting):
+    db_path = posting.repository.db_path
+    sale_ids = posting.post_sale(date(2025, 1, 8), "Jual ke pasar", "Tunai", None, "Persediaan kambing jantan", 3_200_000, 3)
+    posting.append_rows(build_general_journal_rows(date(2025, 1, 9), "Beli pakan", "Beban pakan ternak", "Kas", 750_000))
+
+    deleted, deleted_inventory = posting.delete_transactions({"Penjualan": [sale_ids[0]]})
+
+    assert (deleted, deleted_inventory) == (1, 1)
+    assert count_rows(db_path, "inventory") == 2
+    assert_derived_tables_match(db_path)
+
+def test_delete_transactions_is_atomic(posting):
+    db_path = posting.repository.db_path
+    sale_ids = posting.post_sale(date(2025, 1, 8), "Jual ke pasar", "Tunai", None, "Persediaan kambing jantan", 3_200_000, 3)
+    conn = get_db_connection(db_path)
+    try:
+        conn.execute("CREATE TRIGGER trg_test_block_jurnal_delete BEFORE DELETE ON jurnal BEGIN SELECT RAISE(ABORT, 'diblokir'); END")
+    finally:
+        conn.close()
+
+    inventory_before = count_rows(db_path, "inventory")
+    with pytest.raises(sqlite3.DatabaseError):
+        posting.delete_transactions({"Penjualan": [sale_ids[0]]})
+
+    assert count_rows(db_path, "inventory") == inventory_before
+    assert_derived_tables_match(db_path)
@@ -0,0 +1,89 @@
+import re
+
+import pandas as pd
+import pytest
+
+import subuhjayafarm_core
+from subuhjayafarm_core import (
+    AGING_BUCKETS, EXCEL_SHEET_NAME_LENGTH, GENERAL_LEDGER_ACCOUNTS, LEDGER_EXPORT_COLUMNS, MAIN_SHEETS, STOCK_CARD_COLUMNS,
+    SUBLEDGER_SPECS, FarmRepository, ReportEngine, close_all_db_connections, format_journal_entries, make_period, write_full_books_workbook
+)
+
+CHUNK_SIZE = 7
+SHEET_ROWS = 40
+
+def get_sheet_name(title, part):
+    suffix = f" ({part})" if part > 1 else ""
+    return re.sub(r"[\[\]:*?/\\]", "-", title)[:EXCEL_SHEET_NAME_LENGTH - len(suffix)] + suffix
+
+def read_sheet(workbook, title):
+    rows = []
+    part = 1
+    while get_sheet_name(title, part) in workbook.sheetnames:
+        sheet_rows = list(workbook[get_sheet_name(title, part)].iter_rows(values_only=True))
+        rows.extend(sheet_rows[1:])
+        part += 1
+    return rows, part - 1
+
+def to_rows(frame, columns):
+    frame = pd.DataFrame(frame, columns=columns).astype(object)
+    frame = frame.where(frame.notna() & (frame != ""), None)
+    return [tuple(row) for row in frame.to_numpy().tolist()]
+
+PERIODS = [None, make_period("2024-04-01", "2025-03-31")]
+
+@pytest.fixture(scope="module", params=PERIODS, ids=["semua", "periode"])
+def books(request, farm_db_template, tmp_path_factory):
+    openpyxl = pytest.importorskip("openpyxl")
+    pytest.importorskip("xlsxwriter")
+    period = request.param
+    reports = ReportEngine(FarmRepository(farm_db_template))
+    output = str(tmp_path_factory.mktemp("buku") / "buku_lengkap.xlsx")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(subuhjayafarm_core, "EXCEL_MAX_ROWS", SHEET_ROWS)
+        write_full_books_workbook(reports, output, period, chunk_size=CHUNK_SIZE)
+
+    workbook = openpyxl.load_workbook(output, read_only=True)
+    yield reports, workbook, period
+    workbook.close()
+    close_all_db_connections(db_path=farm_db_template)
+
+def test_journal_sheets_match_report(books):
+    reports, workbook, period = books
+    for sheet_name in MAIN_SHEETS:
+        rows, _ = read_sheet(workbook, f"Jurnal {sheet_name.replace('_', ' ')}")
+        records = format_journal_entries(reports.repository.transactions_records([sheet_name], period), skip_saldo_awal=False)
+        assert rows == to_rows(records, ["Waktu", "Keterangan", "Debit", "Kredit"])
+
+def test_ledger_sheets_match_report(books):
+    reports, workbook, period = books
+    split_sheets = 0
+    for akun in GENERAL_LEDGER_ACCOUNTS:
+        rows, parts = read_sheet(workbook, f"BB {akun}")
+        assert rows == to_rows(reports.account_ledger(akun, period=period), LEDGER_EXPORT_COLUMNS), akun
+        split_sheets += parts > 1
+    assert split_sheets > 0
+    assert get_sheet_name("BB Kas", 2) in workbook.sheetnames
+
+def test_partner_sheets_match_report(books):
+    reports, workbook, period = books
+    for akun_type, spec in SUBLEDGER_SPECS.items():
+        subledgers = reports.partner_subledgers(akun_type, period)
+        expected_cards = []
+        for partner in subledgers["partners"]:
+            if partner in subledgers["ledgers"]:
+                expected_cards += [(partner,) + row for row in to_rows(subledgers["ledgers"][partner], LEDGER_EXPORT_COLUMNS)]
+
+        cards, parts = read_sheet(workbook, f"Kartu {spec['label']}")
+        assert cards == expected_cards
+        assert parts > 1
+        aging, _ = read_sheet(workbook, f"Umur {spec['label']}")
+        assert aging == to_rows(subledgers["aging"], [spec["mitra"]] + AGING_BUCKETS + ["Total", "Saldo Akhir"])
+
+def test_stock_card_sheet_matches_report(books):
+    reports, workbook, _ = books
+    stock_cards = reports.stock_cards().sort_values(["Kategori"], kind="stable")
+
+    rows, parts = read_sheet(workbook, "Kartu Stok")
+    assert rows == to_rows(stock_cards, STOCK_CARD_COLUMNS[:-1])
+    assert parts > 1
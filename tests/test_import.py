@@ -0,0 +1,177 @@
+import io
+import sqlite3
+from datetime import date, datetime
+
+import pandas as pd
+import pytest
+
+from subuhjayafarm_core import IMPORT_COLUMNS, FarmRepository, PostingEngine, build_general_journal_rows, close_period, read_import_file
+
+def make_import_file(rows):
+    output = io.StringIO()
+    pd.DataFrame(rows, columns=IMPORT_COLUMNS).to_csv(output, index=False)
+    return read_import_file(io.StringIO(output.getvalue()), "impor.csv")
+
+def make_xlsx_import_file(header, rows):
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    workbook.active.append(header)
+    for row in rows:
+        workbook.active.append(row)
+    output = io.BytesIO()
+    workbook.save(output)
+    output.seek(0)
+    return read_import_file(output, "impor.xlsx")
+
+def read_table(db_path, query):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(query).fetchall()
+    finally:
+        conn.close()
+
+@pytest.fixture
+def posting(fresh_db):
+    posting = PostingEngine(FarmRepository(fresh_db))
+    posting.append_rows([
+        ("Inventory_Data", [date(2025, 1, 1), "SALDO AWAL", kategori, 2_000_000, 10, 20_000_000])
+        for kategori in ["Jantan", "Betina"]
+    ])
+    return posting
+
+def test_import_matches_manual_postings(posting, tmp_path):
+    rows = [
+        ["2025-01-06", "Pembelian", "Beli bakalan", "Kredit", "Supplier A", "Jantan", None, None, 2_500_000, 4],
+        ["2025-01-08", "Penjualan", "Jual ke pasar", "Tunai", None, "Jantan", None, None, 3_200_000, 3],
+        ["2025-01-08", "Lain-lain", "Beli pakan", None, None, None, "Beban pakan ternak", "Kas", 750_000, 1],
+    ]
+    report = posting.import_transactions(make_import_file(rows))
+    assert (report["Status"] == "Tersimpan").all()
+
+    manual_db = str(tmp_path / "manual_transaksi.db")
+    manual = PostingEngine(FarmRepository(manual_db))
+    manual.repository.setup()
+    manual.append_rows([
+        ("Inventory_Data", [date(2025, 1, 1), "SALDO AWAL", kategori, 2_000_000, 10, 20_000_000])
+        for kategori in ["Jantan", "Betina"]
+    ])
+    manual.post_purchase(date(2025, 1, 6), "Beli bakalan", "Kredit", "Supplier A", "Persediaan kambing jantan", 2_500_000, 4)
+    manual.post_sale(date(2025, 1, 8), "Jual ke pasar", "Tunai", None, "Persediaan kambing jantan", 3_200_000, 3)
+    manual.append_rows(build_general_journal_rows(date(2025, 1, 8), "Beli pakan", "Beban pakan ternak", "Kas", 750_000))
+
+    for query in ["SELECT * FROM jurnal ORDER BY id", "SELECT * FROM inventory ORDER BY id", "SELECT * FROM inventory_state ORDER BY kategori"]:
+        assert read_table(posting.repository.db_path, query) == read_table(manual_db, query)
+
+def test_invalid_rows_are_reported_and_nothing_is_saved(posting):
+    db_path = posting.repository.db_path
+    close_period(db_path, "2025-01-02")
+    rows = [
+        ["2025-01-06", "Pembelian", "Beli bakalan", "Tunai", None, "Jantan", None, None, 2_500_000, 4],
+        ["bukan tanggal", "Lain-lain", "Beli pakan", None, None, None, "Beban pakan ternak", "Kas", 750_000, 1],
+        ["2025-01-02", "Lain-lain", "Beli obat", None, None, None, "Beban obat & vitamin", "Kas", 100_000, 1],
+        ["2025-01-07", "Penjualan", "Jual kredit", "Kredit", None, "Betina", None, None, 3_000_000, 1],
+        ["2025-01-07", "Penjualan", "Jual banyak", "Tunai", None, "Betina", None, None, 3_000_000, 11],
+        ["2025-01-07", "Lain-lain", "Akun sama", None, None, None, "Kas", "Kas", 100_000, 1],
+    ]
+    jurnal_before = read_table(db_path, "SELECT COUNT(*) FROM jurnal")
+
+    report = posting.import_transactions(make_import_file(rows)).set_index("Baris")
+
+    assert report.loc[2, "Status"] == "Valid"
+    assert "Tanggal tidak valid" in report.loc[3, "Keterangan"]
+    assert "periode yang sudah ditutup" in report.loc[4, "Keterangan"]
+    assert "WAJIB mengisi Customer/Supplier" in report.loc[5, "Keterangan"]
+    assert "melebihi Saldo Ekor (10)" in report.loc[6, "Keterangan"]
+    assert "tidak boleh sama" in report.loc[7, "Keterangan"]
+    assert read_table(db_path, "SELECT COUNT(*) FROM jurnal") == jurnal_before
+
+def test_backdated_stock_rows_are_rejected(posting):
+    db_path = posting.repository.db_path
+    posting.post_purchase(date(2025, 3, 1), "Beli bakalan", "Tunai", None, "Persediaan kambing jantan", 2_500_000, 4)
+    rows = [
+        ["2025-02-01", "Penjualan", "Jual mundur", "Tunai", None, "Jantan", None, None, 3_000_000, 2],
+        ["2025-02-01", "Penjualan", "Jual betina", "Tunai", None, "Betina", None, None, 3_000_000, 2],
+        ["2025-03-01", "Pembelian", "Beli hari yang sama", "Tunai", None, "Jantan", None, None, 2_500_000, 2],
+        ["2025-01-15", "Lain-lain", "Beli pakan", None, None, None, "Beban pakan ternak", "Kas", 750_000, 1],
+    ]
+
+    report = posting.import_transactions(make_import_file(rows)).set_index("Baris")
+
+    assert "mutasi stok terakhir Persediaan kambing jantan (2025-03-01)" in report.loc[2, "Keterangan"]
+    assert (report.loc[[3, 4, 5], "Status"] == "Valid").all()
+    assert read_table(db_path, "SELECT COUNT(*) FROM inventory") == [(3,)]
+
+def test_day_first_and_year_slash_dates(posting):
+    rows = [
+        ["2025/01/06", "Pembelian", "Beli bakalan", "Tunai", None, "Jantan", None, None, 2_500_000, 4],
+        ["05-01-2025", "Lain-lain", "Beli pakan", None, None, None, "Beban pakan ternak", "Kas", 750_000, 1],
+        ["15-01-2025", "Lain-lain", "Beli obat", None, None, None, "Beban obat & vitamin", "Kas", 100_000, 1],
+        ["16/01/2025", "Lain-lain", "Bayar listrik", None, None, None, "Beban listrik & air", "Kas", 200_000, 1],
+        ["17.01.2025", "Lain-lain", "Bayar gaji", None, None, None, "Beban gaji", "Kas", 300_000, 1],
+    ]
+
+    report = posting.import_transactions(make_import_file(rows))
+
+    assert (report["Status"] == "Tersimpan").all()
+    assert read_table(posting.repository.db_path, "SELECT Deskripsi, Waktu FROM jurnal WHERE Source_Sheet != 'Saldo Awal' ORDER BY Waktu, id") == [
+        ("Beli pakan", "2025-01-05"),
+        ("Beli bakalan", "2025-01-06"),
+        ("Beli obat", "2025-01-15"),
+        ("Bayar listrik", "2025-01-16"),
+        ("Bayar gaji", "2025-01-17"),
+    ]
+
+@pytest.mark.parametrize("tanggal", ["01/06/25", "25-01-06", "2025.01.06", "2025-01-06 10:00", "6 Jan 2025", "31/02/2025", "20250106"])
+def test_ambiguous_dates_are_invalid(posting, tanggal):
+    rows = [
+        ["2025-01-06", "Lain-lain", "Beli pakan", None, None, None, "Beban pakan ternak", "Kas", 750_000, 1],
+        [tanggal, "Lain-lain", "Beli obat", None, None, None, "Beban obat & vitamin", "Kas", 100_000, 1],
+    ]
+    jurnal_before = read_table(posting.repository.db_path, "SELECT COUNT(*) FROM jurnal")
+
+    report = posting.import_transactions(make_import_file(rows)).set_index("Baris")
+
+    assert report.loc[2, "Status"] == "Valid"
+    assert "Tanggal tidak valid" in report.loc[3, "Keterangan"]
+    assert read_table(posting.repository.db_path, "SELECT COUNT(*) FROM jurnal") == jurnal_before
+
+def test_xlsx_import_matches_csv(posting, tmp_path):
+    header = ["Tanggal", "Jenis", "Deskripsi", "Metode", "Customer / Supplier", "Kategori Ternak", "Debit Akun", "Kredit Akun", "Harga Satuan", "Jumlah"]
+    xlsx_rows = [
+        [datetime(2025, 1, 6), "Pembelian", "Beli bakalan", "Kredit", "Supplier A", "Jantan", None, None, 2_500_000, 4],
+        ["08/01/2025", "penjualan", "Jual ke pasar", "tunai", None, "Persediaan kambing jantan", None, None, 3_200_000.0, 3],
+        [datetime(2025, 1, 8, 14, 30), "Lain-lain", "Beli pakan", None, None, None, "Beban pakan ternak", "Kas", "750.000", None],
+        [None, None, None, None, None, None, None, None, None, None],
+        ["2025-01-09 10:00", "Lain-lain", "Beli obat", None, None, None, "Beban obat & vitamin", "Kas", 100_000, 1],
+    ]
+    csv_rows = [
+        ["2025-01-06", "Pembelian", "Beli bakalan", "Kredit", "Supplier A", "Jantan", None, None, 2_500_000, 4],
+        ["2025-01-08", "Penjualan", "Jual ke pasar", "Tunai", None, "Jantan", None, None, 3_200_000, 3],
+        ["2025-01-08", "Lain-lain", "Beli pakan", None, None, None, "Beban pakan ternak", "Kas", 750_000, 1],
+    ]
+
+    frame = make_xlsx_import_file(header, xlsx_rows)
+    assert list(frame.columns) == IMPORT_COLUMNS
+    assert list(frame.index) == [2, 3, 4, 6]
+
+    report = posting.import_transactions(frame).set_index("Baris")
+    assert "Tanggal tidak valid" in report.loc[6, "Keterangan"]
+
+    report = posting.import_transactions(frame.drop(index=6))
+    assert (report["Status"] == "Tersimpan").all()
+
+    csv_db = str(tmp_path / "csv_transaksi.db")
+    csv_posting = PostingEngine(FarmRepository(csv_db))
+    csv_posting.repository.setup()
+    csv_posting.append_rows([
+        ("Inventory_Data", [date(2025, 1, 1), "SALDO AWAL", kategori, 2_000_000, 10, 20_000_000])
+        for kategori in ["Jantan", "Betina"]
+    ])
+    csv_posting.import_transactions(make_import_file(csv_rows))
+
+    for query in ["SELECT * FROM jurnal ORDER BY id", "SELECT * FROM inventory ORDER BY id"]:
+        assert read_table(posting.repository.db_path, query) == read_table(csv_db, query)
+
+def test_missing_required_columns_are_rejected():
+    with pytest.raises(ValueError, match="Kolom wajib tidak ditemukan"):
+        read_import_file(io.StringIO("Tanggal,Jenis\n2025-01-06,Pembelian\n"), "impor.csv")
@@ -0,0 +1,91 @@
+import re
+import sqlite3
+
+from subuhjayafarm_core import (
+    INVENTORY_RUPIAH_COLUMNS, JURNAL_RUPIAH_COLUMNS, USER_DB_MIGRATIONS, get_db_connection, migrate_user_database,
+    setup_user_database, verify_account_balances, verify_daily_rollup, verify_inventory_state
+)
+
+def read_schema(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        objects = {
+            (row[0], row[1]): re.sub(r"\s+", " ", row[2]).strip()
+            for row in conn.execute("SELECT type, name, sql FROM sqlite_master WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%'")
+        }
+        columns = {
+            name: conn.execute(f"PRAGMA table_info({name})").fetchall()
+            for object_type, name in objects if object_type == "table"
+        }
+        return conn.execute("PRAGMA user_version").fetchone()[0], objects, columns
+    finally:
+        conn.close()
+
+def get_column_type(db_path, table_name, column):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {row[1]: row[2] for row in conn.execute(f"PRAGMA table_info({table_name})")}[column]
+    finally:
+        conn.close()
+
+def test_fresh_database_reaches_latest_version(fresh_db):
+    assert read_schema(fresh_db)[0] == len(USER_DB_MIGRATIONS)
+
+def test_legacy_database_upgrades_to_fresh_schema(fresh_db, legacy_db):
+    setup_user_database(legacy_db)
+
+    assert read_schema(legacy_db) == read_schema(fresh_db)
+
+def test_partially_migrated_database_upgrades_to_fresh_schema(fresh_db, tmp_path):
+    db_path = str(tmp_path / "partial_transaksi.db")
+    conn = get_db_connection(db_path)
+    try:
+        c = conn.cursor()
+        c.execute("BEGIN IMMEDIATE")
+        for migration in USER_DB_MIGRATIONS[:7]:
+            migration(c)
+        c.execute("PRAGMA user_version = 7")
+        conn.commit()
+        assert migrate_user_database(conn) == len(USER_DB_MIGRATIONS)
+    finally:
+        conn.close()
+
+    assert read_schema(db_path) == read_schema(fresh_db)
+
+def test_migration_is_idempotent(legacy_db):
+    setup_user_database(legacy_db)
+    before = read_schema(legacy_db)
+    setup_user_database(legacy_db)
+
+    assert read_schema(legacy_db) == before
+
+def test_legacy_rupiah_columns_become_integers(legacy_db):
+    setup_user_database(legacy_db)
+
+    for table_name, columns in [("jurnal", JURNAL_RUPIAH_COLUMNS), ("inventory", INVENTORY_RUPIAH_COLUMNS)]:
+        for column in columns:
+            assert get_column_type(legacy_db, table_name, column) == "INTEGER"
+    for table_name, column in [("journal_lines", "amount"), ("account_balances", "debit"), ("inventory_state", "saldo_total")]:
+        assert get_column_type(legacy_db, table_name, column) == "INTEGER"
+
+    conn = sqlite3.connect(legacy_db)
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM journal_lines WHERE typeof(amount) != 'integer'").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM jurnal WHERE typeof(D1_Nominal) NOT IN ('integer', 'null')").fetchone()[0] == 0
+    finally:
+        conn.close()
+
+def test_legacy_upgrade_backfills_derived_tables(legacy_db):
+    setup_user_database(legacy_db)
+
+    conn = sqlite3.connect(legacy_db)
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM journal_lines").fetchone()[0] > 0
+        assert conn.execute("""
+            SELECT COUNT(*) FROM journal_lines l JOIN jurnal j ON j.id = l.entry_id WHERE l.waktu != COALESCE(j.Waktu, '')
+        """).fetchone()[0] == 0
+    finally:
+        conn.close()
+    assert verify_account_balances(legacy_db).empty
+    assert verify_inventory_state(legacy_db).empty
+    assert verify_daily_rollup(legacy_db).empty
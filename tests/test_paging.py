@@ -0,0 +1,63 @@
+import sqlite3
+
+import pandas as pd
+
+from subuhjayafarm_core import LEDGER_PAGE_SHEETS, NON_SA_SHEETS, fetch_journal_page, fetch_keyset_page, fetch_ledger_page, make_period
+
+PAGE_SIZE = 25
+
+def walk_pages(fetch, direction="next", key=None):
+    pages = []
+    while True:
+        page = fetch_keyset_page(fetch, key, direction, PAGE_SIZE)
+        if page["rows"].empty:
+            return pages
+        pages.append(page)
+        if not page["has_next" if direction == "next" else "has_prev"]:
+            return pages
+        key = page["last_key" if direction == "next" else "first_key"]
+
+def test_journal_pages_cover_every_row_once_in_order(farm_db):
+    fetch = lambda key, direction, limit: fetch_journal_page(farm_db, NON_SA_SHEETS, None, key, direction, limit)
+    pages = walk_pages(fetch)
+    rows = pd.concat([page["rows"] for page in pages], ignore_index=True)
+
+    conn = sqlite3.connect(farm_db)
+    try:
+        expected = [row[0] for row in conn.execute("SELECT id FROM jurnal WHERE Source_Sheet IN ('Penjualan', 'Pembelian', 'Lain-lain') ORDER BY Waktu, id")]
+    finally:
+        conn.close()
+    assert rows["id"].tolist() == expected
+    assert not pages[0]["has_prev"] and pages[1]["has_prev"]
+    assert all(len(page["rows"]) == PAGE_SIZE for page in pages[:-1])
+
+def test_journal_pages_walk_back_to_the_start(farm_db):
+    fetch = lambda key, direction, limit: fetch_journal_page(farm_db, NON_SA_SHEETS, None, key, direction, limit)
+    forward = walk_pages(fetch)
+    backward = walk_pages(fetch, "prev", forward[-1]["first_key"])
+
+    assert [page["rows"]["id"].tolist() for page in backward] == [page["rows"]["id"].tolist() for page in forward[-2::-1]]
+
+def test_journal_pages_respect_period(farm_db):
+    period = make_period("2024-03-01", "2024-04-30")
+    fetch = lambda key, direction, limit: fetch_journal_page(farm_db, NON_SA_SHEETS, period, key, direction, limit)
+    rows = pd.concat([page["rows"] for page in walk_pages(fetch)], ignore_index=True)
+
+    assert rows["Waktu"].between(period[0], period[1]).all()
+
+def test_ledger_pages_add_up_to_journal_lines(farm_db):
+    fetch = lambda key, direction, limit: fetch_ledger_page(farm_db, "Kas", None, key, direction, limit)
+    rows = pd.concat([page["rows"] for page in walk_pages(fetch)], ignore_index=True)
+
+    conn = sqlite3.connect(farm_db)
+    try:
+        placeholders = ', '.join(['?' for _ in LEDGER_PAGE_SHEETS])
+        debit, kredit = conn.execute(f"""
+            SELECT SUM(CASE WHEN l.side = 'D' THEN l.amount ELSE 0 END), SUM(CASE WHEN l.side = 'K' THEN l.amount ELSE 0 END)
+            FROM journal_lines l JOIN jurnal j ON j.id = l.entry_id
+            WHERE l.account = 'Kas' AND j.Source_Sheet IN ({placeholders})
+        """, LEDGER_PAGE_SHEETS).fetchone()
+    finally:
+        conn.close()
+    assert (rows["Debit"].sum(), rows["Kredit"].sum()) == (debit, kredit)
+    assert list(zip(rows["Waktu"], rows["id"])) == sorted(zip(rows["Waktu"], rows["id"]))
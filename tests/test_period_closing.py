@@ -0,0 +1,112 @@
+import sqlite3
+from datetime import date
+
+import pytest
+
+from subuhjayafarm_core import (
+    FarmRepository, PostingEngine, account_balances_cli, build_general_journal_rows, close_period, fetch_inventory_state_as_of,
+    get_db_connection, get_inventory_totals_sql, load_period_closings, reopen_period, verify_waktu_columns
+)
+
+@pytest.fixture
+def posting(fresh_db):
+    posting = PostingEngine(FarmRepository(fresh_db))
+    posting.append_rows([("Inventory_Data", [date(2025, 1, 1), "SALDO AWAL", "Jantan", 2_000_000, 10, 20_000_000])])
+    posting.post_purchase(date(2025, 1, 20), "Beli bakalan", "Tunai", None, "Persediaan kambing jantan", 2_500_000, 4)
+    posting.post_sale(date(2025, 2, 3), "Jual ke pasar", "Tunai", None, "Persediaan kambing jantan", 3_200_000, 3)
+    return posting
+
+def test_closed_period_rejects_changes(posting):
+    db_path = posting.repository.db_path
+    close_period(db_path, "2025-01-31")
+
+    with pytest.raises(sqlite3.DatabaseError, match="Periode transaksi sudah ditutup"):
+        posting.append_rows(build_general_journal_rows(date(2025, 1, 15), "Beli pakan", "Beban pakan ternak", "Kas", 750_000))
+    with pytest.raises(sqlite3.DatabaseError, match="Periode transaksi sudah ditutup"):
+        posting.delete_rows("Inventory_Data", [1])
+
+    conn = get_db_connection(db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        with pytest.raises(sqlite3.DatabaseError, match="Periode transaksi sudah ditutup"):
+            conn.execute("UPDATE jurnal SET Waktu = '2025-01-30' WHERE Waktu = '2025-02-03'")
+        conn.rollback()
+    finally:
+        conn.close()
+
+    posting.append_rows(build_general_journal_rows(date(2025, 2, 4), "Beli pakan", "Beban pakan ternak", "Kas", 750_000))
+
+def test_reopen_period_allows_changes(posting):
+    db_path = posting.repository.db_path
+    close_period(db_path, "2025-01-31")
+
+    assert reopen_period(db_path, "2025-01-31") == 1
+    assert load_period_closings(db_path).empty
+    posting.append_rows(build_general_journal_rows(date(2025, 1, 15), "Beli pakan", "Beban pakan ternak", "Kas", 750_000))
+
+def test_close_period_must_move_forward(posting):
+    db_path = posting.repository.db_path
+    close_period(db_path, "2025-01-31")
+
+    with pytest.raises(ValueError):
+        close_period(db_path, "2025-01-15")
+
+def test_inventory_state_as_of_uses_closing_snapshot(posting):
+    db_path = posting.repository.db_path
+    close_period(db_path, "2025-01-31")
+    close_period(db_path, "2025-02-28")
+
+    conn = get_db_connection(db_path)
+    try:
+        for as_of in ["2025-01-20", "2025-01-31", "2025-02-03", "2025-03-31"]:
+            expected = conn.execute(get_inventory_totals_sql(" AND Waktu <= ?"), (as_of,)).fetchall()
+            state = fetch_inventory_state_as_of(db_path, as_of)
+            assert [(row["kategori"], row["saldo_ekor"], row["saldo_total"]) for row in expected] == list(state.itertuples(index=False, name=None))
+    finally:
+        conn.close()
+
+def test_closing_totals_match_account_balances(posting):
+    db_path = posting.repository.db_path
+    close_period(db_path, "2025-01-31")
+    close_period(db_path, "2025-02-28")
+
+    conn = get_db_connection(db_path)
+    try:
+        closing = conn.execute("SELECT account, source_sheet, debit, kredit FROM closing_account_balances WHERE period_end = '2025-02-28' ORDER BY account, source_sheet").fetchall()
+        balances = conn.execute("SELECT account, source_sheet, debit, kredit FROM account_balances WHERE debit != 0 OR kredit != 0 ORDER BY account, source_sheet").fetchall()
+    finally:
+        conn.close()
+    assert [tuple(row) for row in closing] == [tuple(row) for row in balances]
+
+def test_rows_without_valid_waktu_block_closing(posting, capsys):
+    db_path = posting.repository.db_path
+    conn = get_db_connection(db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(
+            "INSERT INTO jurnal (Waktu, Deskripsi, Metode, Source_Sheet, D1_Akun, D1_Nominal, K1_Akun, K1_Nominal) VALUES (?, ?, 'Jurnal Umum', 'Lain-lain', 'Beban pakan ternak', 100000, 'Kas', 100000)",
+            [(None, "Tanpa tanggal"), ("", "Tanggal kosong")]
+        )
+        conn.execute("INSERT INTO inventory (Waktu, Tipe, Kategori, Harga, Jumlah, Total) VALUES ('01/06/25', 'Pembelian', 'Jantan', 1000000, 1, 1000000)")
+        conn.commit()
+    finally:
+        conn.close()
+
+    invalid_waktu = verify_waktu_columns(db_path)
+    assert invalid_waktu[["tabel", "keterangan"]].values.tolist() == [["inventory", "Jantan"], ["jurnal", "Tanpa tanggal"], ["jurnal", "Tanggal kosong"]]
+    with pytest.raises(ValueError, match="3 baris jurnal/inventory tanpa tanggal yang valid"):
+        close_period(db_path, "2025-01-31")
+    assert load_period_closings(db_path).empty
+    assert account_balances_cli([db_path]) == 1
+    assert "3 baris tanpa tanggal yang valid" in capsys.readouterr().out
+
+    conn = get_db_connection(db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM jurnal WHERE Waktu IS NULL OR Waktu = ''")
+        conn.execute("DELETE FROM inventory WHERE Waktu = '01/06/25'")
+        conn.commit()
+    finally:
+        conn.close()
+    close_period(db_path, "2025-01-31")
+    assert account_balances_cli([db_path]) == 0
@@ -0,0 +1,15 @@
+import pytest
+
+from subuhjayafarm_core import REPORT_QUERY_PLAN_CHECKS, check_report_query_plans, setup_user_database
+
+@pytest.mark.parametrize("check_name", [check[0] for check in REPORT_QUERY_PLAN_CHECKS])
+def test_report_query_uses_index(farm_db, check_name):
+    results = {result["Query"]: result for result in check_report_query_plans(farm_db)}
+
+    assert results[check_name]["OK"], results[check_name]["Plan"]
+
+def test_upgraded_legacy_database_uses_indexes(legacy_db):
+    setup_user_database(legacy_db)
+
+    failed = [(result["Query"], result["Plan"]) for result in check_report_query_plans(legacy_db) if not result["OK"]]
+    assert failed == []
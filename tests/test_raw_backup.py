@@ -0,0 +1,66 @@
+import sqlite3
+
+import pytest
+
+from subuhjayafarm_core import (
+    ACCOUNT_BALANCES_TABLE_NAME, DAILY_INVENTORY_ROLLUP_TABLE_NAME, DAILY_ROLLUP_TABLE_NAME, INVENTORY_STATE_TABLE_NAME,
+    JOURNAL_LINES_TABLE_NAME, RAW_EXPORT_TABLES, export_raw_table, get_raw_table_path, restore_raw_tables, setup_user_database,
+    verify_account_balances, verify_daily_rollup, verify_inventory_state
+)
+
+DERIVED_TABLE_QUERIES = {
+    JOURNAL_LINES_TABLE_NAME: f"SELECT entry_id, line_no, account, side, amount, waktu FROM {JOURNAL_LINES_TABLE_NAME} ORDER BY entry_id, line_no",
+    ACCOUNT_BALANCES_TABLE_NAME: f"SELECT * FROM {ACCOUNT_BALANCES_TABLE_NAME} ORDER BY account, source_sheet",
+    INVENTORY_STATE_TABLE_NAME: f"SELECT * FROM {INVENTORY_STATE_TABLE_NAME} ORDER BY kategori",
+    DAILY_ROLLUP_TABLE_NAME: f"SELECT * FROM {DAILY_ROLLUP_TABLE_NAME} ORDER BY account, waktu",
+    DAILY_INVENTORY_ROLLUP_TABLE_NAME: f"SELECT * FROM {DAILY_INVENTORY_ROLLUP_TABLE_NAME} ORDER BY kategori, waktu",
+}
+
+def read_tables(db_path, table_names):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {
+            table_name: conn.execute(DERIVED_TABLE_QUERIES.get(table_name, f"SELECT * FROM {table_name} ORDER BY id")).fetchall()
+            for table_name in table_names
+        }
+    finally:
+        conn.close()
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet"])
+def test_export_and_restore_round_trip(farm_db, tmp_path, fmt):
+    if fmt == "parquet":
+        pytest.importorskip("pyarrow")
+    sources = {}
+    for table_name in RAW_EXPORT_TABLES:
+        sources[table_name] = get_raw_table_path(str(tmp_path), table_name, fmt)
+        export_raw_table(farm_db, table_name, sources[table_name], fmt, chunksize=97)
+
+    restored_db = str(tmp_path / "restored_transaksi.db")
+    counts = restore_raw_tables(restored_db, sources, fmt, chunksize=97)
+
+    original = read_tables(farm_db, RAW_EXPORT_TABLES + list(DERIVED_TABLE_QUERIES))
+    assert counts == {table_name: len(original[table_name]) for table_name in RAW_EXPORT_TABLES}
+    assert read_tables(restored_db, RAW_EXPORT_TABLES + list(DERIVED_TABLE_QUERIES)) == original
+    assert verify_account_balances(restored_db).empty
+    assert verify_inventory_state(restored_db).empty
+    assert verify_daily_rollup(restored_db).empty
+
+def test_restore_refuses_non_empty_database(farm_db, tmp_path):
+    source = get_raw_table_path(str(tmp_path), "jurnal", "csv")
+    export_raw_table(farm_db, "jurnal", source)
+    before = read_tables(farm_db, ["jurnal"])
+
+    with pytest.raises(ValueError, match="sudah berisi data"):
+        restore_raw_tables(farm_db, {"jurnal": source})
+
+    assert read_tables(farm_db, ["jurnal"]) == before
+
+def test_restore_rolls_back_on_bad_columns(fresh_db, tmp_path):
+    source = tmp_path / "jurnal.csv"
+    source.write_text("id,Waktu,Salah\n1,2025-01-01,x\n")
+
+    with pytest.raises(ValueError, match="Kolom file jurnal tidak sesuai"):
+        restore_raw_tables(fresh_db, {"jurnal": str(source)})
+
+    setup_user_database(fresh_db)
+    assert read_tables(fresh_db, ["jurnal"]) == {"jurnal": []}
@@ -0,0 +1,107 @@
+import sqlite3
+
+import pandas as pd
+
+from subuhjayafarm_core import STOCK_CARD_COLUMNS, build_inventory_stock_cards, build_inventory_store, iter_sql_frames
+
+INVENTORY_COLUMNS = ["id", "Waktu", "Tipe", "Kategori", "Harga", "Jumlah", "Total"]
+
+def build_card(rows, opening=None):
+    return build_inventory_stock_cards(build_inventory_store(pd.DataFrame(rows, columns=INVENTORY_COLUMNS)), opening)
+
+def build_reference_card(inventory_df):
+    saldo = {}
+    rows = []
+    for row in inventory_df.itertuples(index=False):
+        if not row.Kategori:
+            continue
+        is_in = row.Tipe in ("SALDO AWAL", "Pembelian")
+        is_out = row.Tipe == "Penjualan"
+        saldo_ekor, saldo_total = saldo.get(row.Kategori, (0, 0))
+        saldo_ekor += (row.Jumlah if is_in else 0) - (row.Jumlah if is_out else 0)
+        saldo_total += (row.Total if is_in else 0) - (row.Total if is_out else 0)
+        saldo[row.Kategori] = (saldo_ekor, saldo_total)
+        rows.append((
+            row.Kategori, row.Waktu, row.Tipe,
+            row.Jumlah if is_in else 0, row.Harga if is_in else 0, row.Total if is_in else 0,
+            row.Jumlah if is_out else 0, row.Harga if is_out else 0, row.Total if is_out else 0,
+            saldo_ekor, (2 * saldo_total + saldo_ekor) // (2 * saldo_ekor) if saldo_ekor > 0 else 0, saldo_total,
+            row.id,
+        ))
+    return rows
+
+def to_rows(card):
+    return [tuple(row) for row in card[STOCK_CARD_COLUMNS].astype(object).to_numpy().tolist()]
+
+def read_inventory(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return pd.read_sql_query("SELECT * FROM inventory ORDER BY Kategori, Waktu, id", conn)
+    finally:
+        conn.close()
+
+def test_running_balance_per_kategori():
+    rows = [
+        [1, "2025-01-01", "SALDO AWAL", "Jantan", 2_000_000, 10, 20_000_000],
+        [2, "2025-01-01", "SALDO AWAL", "Betina", 1_500_000, 4, 6_000_000],
+        [3, "2025-01-05", "Pembelian", "Jantan", 2_500_000, 2, 5_000_000],
+        [4, "2025-01-06", "Penjualan", "Betina", 1_500_000, 1, 1_500_000],
+        [5, "2025-01-07", "Penjualan", "Jantan", 2_083_333, 3, 6_250_000],
+        [6, "2025-01-08", "Pembelian", "Betina", 1_000_000, 3, 3_000_000],
+        [7, "2025-01-09", "Pembelian", None, 1_000_000, 1, 1_000_000],
+    ]
+
+    card = build_card(rows)
+
+    assert card[["Kategori", "Row_Index", "SALDO Ekor", "SALDO Total", "SALDO Harga Rata2"]].values.tolist() == [
+        ["Jantan", 1, 10, 20_000_000, 2_000_000],
+        ["Betina", 2, 4, 6_000_000, 1_500_000],
+        ["Jantan", 3, 12, 25_000_000, 2_083_333],
+        ["Betina", 4, 3, 4_500_000, 1_500_000],
+        ["Jantan", 5, 9, 18_750_000, 2_083_333],
+        ["Betina", 6, 6, 7_500_000, 1_250_000],
+    ]
+    assert card[["IN Ekor", "IN Total", "OUT Ekor", "OUT Total"]].values.tolist()[3:5] == [[0, 0, 1, 1_500_000], [0, 0, 3, 6_250_000]]
+    assert to_rows(card) == build_reference_card(pd.DataFrame(rows, columns=INVENTORY_COLUMNS))
+
+def test_average_cost_is_zero_without_stock():
+    rows = [
+        [1, "2025-01-01", "SALDO AWAL", "Jantan", 2_000_000, 2, 4_000_000],
+        [2, "2025-01-05", "Penjualan", "Jantan", 2_000_000, 2, 4_000_000],
+        [3, "2025-01-06", "Pembelian", "Jantan", 2_600_000, 3, 7_800_000],
+    ]
+
+    card = build_card(rows)
+
+    assert card[["SALDO Ekor", "SALDO Total", "SALDO Harga Rata2"]].values.tolist() == [
+        [2, 4_000_000, 2_000_000],
+        [0, 0, 0],
+        [3, 7_800_000, 2_600_000],
+    ]
+
+def test_empty_inventory_has_stock_card_columns():
+    card = build_card([[1, "2025-01-01", "SALDO AWAL", None, 0, 0, 0]])
+
+    assert card.empty
+    assert list(card.columns) == STOCK_CARD_COLUMNS
+
+def test_farm_stock_card_matches_reference(farm_db):
+    inventory = read_inventory(farm_db)
+
+    card = build_inventory_stock_cards(build_inventory_store(inventory))
+
+    assert to_rows(card) == build_reference_card(inventory)
+
+def test_chunks_with_opening_match_single_pass(farm_db):
+    single_pass = build_inventory_stock_cards(build_inventory_store(read_inventory(farm_db)))
+
+    for chunksize in [3, 7, 50]:
+        cards = []
+        opening = None
+        for rows in iter_sql_frames(farm_db, "SELECT * FROM inventory ORDER BY Kategori, Waktu, id", (), chunksize):
+            card = build_inventory_stock_cards(build_inventory_store(rows), opening)
+            cards.append(card)
+            closing = card.groupby("Kategori", sort=False)[["SALDO Ekor", "SALDO Total"]].last()
+            opening = closing if opening is None else closing.combine_first(opening)
+
+        assert to_rows(pd.concat(cards, ignore_index=True)) == to_rows(single_pass), chunksize
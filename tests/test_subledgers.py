@@ -0,0 +1,104 @@
+from datetime import date
+
+import pytest
+
+from subuhjayafarm_core import AGING_BUCKETS, FarmRepository, PostingEngine, ReportEngine, build_general_journal_rows, format_period_date, make_period
+
+def build_saldo_awal_piutang_row(waktu, customer, nominal):
+    return ("Saldo_Awal", [waktu, f"Saldo Awal Piutang dari {customer}", "SALDO AWAL PIUTANG", "Piutang usaha", nominal, None, None, None, None, None, None, customer, None, None, None, nominal])
+
+def read_aging(subledgers, mitra="Customer"):
+    return {row[mitra]: row for row in subledgers["aging"].to_dict(orient="records")}
+
+def read_ledger(subledgers, partner, columns=("Waktu", "Tipe_Entry", "Debit", "Kredit", "Saldo Akhir")):
+    return [tuple(row) for row in subledgers["ledgers"][partner][list(columns)].itertuples(index=False, name=None)]
+
+@pytest.fixture
+def posting(fresh_db):
+    posting = PostingEngine(FarmRepository(fresh_db))
+    posting.append_rows([("Inventory_Data", [date(2025, 1, 1), "SALDO AWAL", "Jantan", 1_000_000, 20, 20_000_000])])
+    return posting
+
+@pytest.fixture
+def reports(posting):
+    return ReportEngine(posting.repository)
+
+def test_partial_payment_settles_oldest_invoices_first(posting, reports):
+    posting.post_sale(date(2025, 1, 15), "Jual A1", "Kredit", "Customer A", "Persediaan kambing jantan", 1_000_000, 1)
+    posting.post_sale(date(2025, 2, 10), "Jual A2", "Kredit", "Customer A", "Persediaan kambing jantan", 3_200_000, 1)
+    posting.append_rows(build_general_journal_rows(date(2025, 2, 20), "Pelunasan A", "Kas", "Piutang usaha", 2_500_000, customer="Customer A"))
+    posting.post_sale(date(2025, 3, 20), "Jual A3", "Kredit", "Customer A", "Persediaan kambing jantan", 2_000_000, 1)
+
+    subledgers = reports.partner_subledgers("BB_PIUTANG", make_period(None, "2025-03-31"))
+
+    assert subledgers["partners"] == ["Customer A"]
+    assert read_aging(subledgers)["Customer A"] == {
+        "Customer": "Customer A", "0-30 hari": 2_000_000, "31-60 hari": 1_700_000, "61-90 hari": 0, ">90 hari": 0,
+        "Total": 3_700_000, "Saldo Akhir": 3_700_000,
+    }
+    assert read_ledger(subledgers, "Customer A") == [
+        ("2025-01-15", "Transaksi Normal", 1_000_000, 0, 1_000_000),
+        ("2025-02-10", "Transaksi Normal", 3_200_000, 0, 4_200_000),
+        ("2025-02-20", "Transaksi Normal", 0, 2_500_000, 1_700_000),
+        ("2025-03-20", "Transaksi Normal", 2_000_000, 0, 3_700_000),
+    ]
+
+def test_aging_buckets_are_counted_to_period_end(posting, reports):
+    for waktu, harga in [(date(2025, 3, 1), 100_000), (date(2025, 2, 28), 200_000), (date(2025, 1, 29), 300_000), (date(2025, 1, 28), 400_000), (date(2024, 12, 29), 500_000)]:
+        posting.post_sale(waktu, "Jual B", "Kredit", "Customer B", "Persediaan kambing jantan", harga, 1)
+    posting.post_sale(date(2025, 4, 1), "Jual B setelah periode", "Kredit", "Customer B", "Persediaan kambing jantan", 600_000, 1)
+
+    aging = read_aging(reports.partner_subledgers("BB_PIUTANG", make_period(None, "2025-03-30")))["Customer B"]
+
+    assert [aging[bucket] for bucket in AGING_BUCKETS] == [100_000 + 200_000, 300_000, 400_000, 500_000]
+    assert aging["Total"] == aging["Saldo Akhir"] == 1_500_000
+
+def test_period_start_folds_earlier_mutations(posting, reports):
+    posting.append_rows([build_saldo_awal_piutang_row(date(2025, 1, 1), "Customer A", 1_000_000)])
+    posting.post_sale(date(2025, 1, 15), "Jual Januari", "Kredit", "Customer A", "Persediaan kambing jantan", 3_000_000, 1)
+    posting.append_rows(build_general_journal_rows(date(2025, 2, 5), "Pelunasan Februari", "Kas", "Piutang usaha", 3_500_000, customer="Customer A"))
+    posting.post_sale(date(2025, 3, 10), "Jual Maret", "Kredit", "Customer A", "Persediaan kambing jantan", 2_000_000, 1)
+    posting.append_rows(build_general_journal_rows(date(2025, 3, 25), "Pelunasan Maret", "Kas", "Piutang usaha", 1_000_000, customer="Customer A"))
+    posting.append_rows(build_general_journal_rows(date(2025, 4, 2), "Pelunasan April", "Kas", "Piutang usaha", 500_000, customer="Customer A"))
+
+    subledgers = reports.partner_subledgers("BB_PIUTANG", make_period("2025-03-01", "2025-03-31"))
+
+    assert read_ledger(subledgers, "Customer A", ("Waktu", "Deskripsi", "Tipe_Entry", "Debit", "Kredit", "Saldo Akhir")) == [
+        ("Awal Periode", "Saldo Awal", "Saldo Awal Total", 1_000_000, 0, 1_000_000),
+        ("Awal Periode", f"Mutasi s.d. {format_period_date('2025-02-28')}", "Saldo Periode Sebelumnya", 3_000_000, 3_500_000, 500_000),
+        ("2025-03-10", "Jual Maret", "Transaksi Normal", 2_000_000, 0, 2_500_000),
+        ("2025-03-25", "Pelunasan Maret", "Transaksi Normal", 0, 1_000_000, 1_500_000),
+    ]
+    aging = read_aging(subledgers)["Customer A"]
+    assert [aging[bucket] for bucket in AGING_BUCKETS] == [1_500_000, 0, 0, 0]
+    assert aging["Saldo Akhir"] == 1_500_000
+
+def test_overpaid_partner_keeps_credit_balance(posting, reports):
+    posting.post_sale(date(2025, 1, 10), "Jual C", "Kredit", "Customer C", "Persediaan kambing jantan", 1_000_000, 1)
+    posting.append_rows(build_general_journal_rows(date(2025, 1, 20), "Pelunasan C", "Kas", "Piutang usaha", 1_500_000, customer="Customer C"))
+    posting.post_sale(date(2025, 1, 12), "Jual D", "Kredit", "Customer D", "Persediaan kambing jantan", 800_000, 1)
+
+    subledgers = reports.partner_subledgers("BB_PIUTANG", make_period(None, "2025-01-31"))
+
+    assert subledgers["partners"] == ["Customer C", "Customer D"]
+    aging = read_aging(subledgers)
+    assert [aging["Customer C"][bucket] for bucket in AGING_BUCKETS] == [0, 0, 0, 0]
+    assert (aging["Customer C"]["Total"], aging["Customer C"]["Saldo Akhir"]) == (0, -500_000)
+    assert (aging["Customer D"]["0-30 hari"], aging["Customer D"]["Saldo Akhir"]) == (800_000, 800_000)
+    assert read_ledger(subledgers, "Customer C")[-1] == ("2025-01-20", "Transaksi Normal", 0, 1_500_000, -500_000)
+
+def test_utang_settles_on_the_debit_side(posting, reports):
+    posting.post_purchase(date(2025, 1, 5), "Beli E1", "Kredit", "Supplier E", "Persediaan kambing jantan", 1_200_000, 1)
+    posting.post_purchase(date(2025, 3, 5), "Beli E2", "Kredit", "Supplier E", "Persediaan kambing jantan", 900_000, 1)
+    posting.append_rows(build_general_journal_rows(date(2025, 3, 10), "Bayar E", "Utang usaha", "Kas", 1_500_000, customer="Supplier E"))
+
+    subledgers = reports.partner_subledgers("BB_UTANG", make_period(None, "2025-03-31"))
+
+    aging = read_aging(subledgers, "Supplier")["Supplier E"]
+    assert [aging[bucket] for bucket in AGING_BUCKETS] == [600_000, 0, 0, 0]
+    assert aging["Saldo Akhir"] == 600_000
+    assert read_ledger(subledgers, "Supplier E") == [
+        ("2025-01-05", "Transaksi Normal", 0, 1_200_000, 1_200_000),
+        ("2025-03-05", "Transaksi Normal", 0, 900_000, 2_100_000),
+        ("2025-03-10", "Transaksi Normal", 1_500_000, 0, 600_000),
+    ]
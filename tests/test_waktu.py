@@ -0,0 +1,52 @@
+from datetime import date, datetime
+
+import pandas as pd
+import pytest
+
+from subuhjayafarm_core import USER_DB_MIGRATIONS, get_db_connection, migrate_user_database, normalize_waktu, normalize_waktu_columns
+
+@pytest.mark.parametrize("value, expected", [
+    ("2025-01-06", "2025-01-06"),
+    ("2025/01/06", "2025-01-06"),
+    ("06/01/2025", "2025-01-06"),
+    ("06-01-2025", "2025-01-06"),
+    ("06.01.2025", "2025-01-06"),
+    ("15-01-2025", "2025-01-15"),
+    ("5/1/2025", "2025-01-05"),
+    (" 2025-01-06 ", "2025-01-06"),
+])
+def test_text_formats(value, expected):
+    assert normalize_waktu(value) == expected
+
+@pytest.mark.parametrize("value", [date(2025, 1, 6), datetime(2025, 1, 6, 13, 30), pd.Timestamp("2025-01-06 13:30")])
+def test_date_values(value):
+    assert normalize_waktu(value) == "2025-01-06"
+
+@pytest.mark.parametrize("value", [
+    "01/06/25", "25-01-06", "2025.01.06", "06 Jan 2025", "20250106", "2025-01-06 10:00:00", "31/02/2025", "13-13-2025",
+    "", None, pd.NaT, 45658,
+])
+def test_other_values_are_rejected(value):
+    with pytest.raises(ValueError, match="Format tanggal tidak valid"):
+        normalize_waktu(value)
+
+def test_migration_rewrites_legacy_text_dates(tmp_path):
+    db_path = str(tmp_path / "legacy_waktu_transaksi.db")
+    waktu_version = USER_DB_MIGRATIONS.index(normalize_waktu_columns)
+    legacy_waktu = ["2025-01-06 08:15:00", "2025/01/06", "05-01-2025", "15.01.2025", "01/06/25"]
+    conn = get_db_connection(db_path)
+    try:
+        c = conn.cursor()
+        c.execute("BEGIN IMMEDIATE")
+        for migration in USER_DB_MIGRATIONS[:waktu_version]:
+            migration(c)
+        c.executemany("INSERT INTO inventory (Waktu, Tipe, Kategori, Harga, Jumlah, Total) VALUES (?, 'Pembelian', 'Jantan', 1, 1, 1)", [(waktu,) for waktu in legacy_waktu])
+        c.execute(f"PRAGMA user_version = {waktu_version}")
+        conn.commit()
+        migrate_user_database(conn)
+
+        waktu = [row[0] for row in conn.execute("SELECT Waktu FROM inventory ORDER BY id")]
+    finally:
+        conn.close()
+
+    assert waktu == ["2025-01-06", "2025-01-06", "2025-01-05", "2025-01-15", "01/06/25"]